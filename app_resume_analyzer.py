@@ -7,6 +7,7 @@ Only shows optimization option if match score < 70%.
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import os
+from itertools import islice
 from utils.groq_optimizer import GroqResumeOptimizer
 
 app = Flask(__name__)
@@ -247,6 +248,7 @@ def create_optimized_resume(resume_text, job_description, suggestions):
         return get_dummy_optimized_resume(resume_text, job_description, suggestions)
     
     try:
+        suggestions_block = "\n".join(islice(suggestions, 10))
         prompt = f"""Based on the analysis and suggestions, create an optimized version of this resume.
 
 ORIGINAL RESUME:
@@ -256,7 +258,7 @@ JOB DESCRIPTION:
 {job_description}
 
 SUGGESTIONS TO IMPLEMENT:
-{chr(10).join(suggestions[:10])}
+{suggestions_block}
 
 Create a complete, optimized resume that:
 1. Implements the content suggestions naturally
@@ -3,11 +3,13 @@ Resume Analyzer Web Application
 Full web app with UI for analyzing and optimizing resumes.
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 import os
+import json
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(
@@ -42,7 +44,7 @@ except ImportError:
 
 from utils.groq_optimizer import GroqResumeOptimizer
 from utils.file_parser import parse_resume
-from utils.ai_providers import get_ai_provider, get_provider_info
+from utils.ai_providers import get_ai_provider, get_provider_info, MAX_ANALYSIS_BATCH_SIZE
 from utils.ats_compliance import get_ats_engine
 from utils.suggestion_engine import get_suggestion_engine
 from utils.link_extractor import extract_social_links
@@ -91,6 +93,10 @@ MAX_JOB_DESCRIPTION_LENGTH = 20000  # 20K characters max
 MIN_RESUME_LENGTH = 50  # Minimum resume length
 MIN_JOB_DESCRIPTION_LENGTH = 20  # Minimum job description length
 
+# Runs provider calls that do not depend on each other (e.g. scoring the original
+# resume while it is optimized) concurrently; each is an I/O-bound network round trip
+background_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="provider-call")
+
 # Template-specific section ordering configuration
 TEMPLATE_CONFIGS = {
     'professional_modern': {
@@ -440,7 +446,7 @@ def analyze_resume_match(resume_text, job_description, provider_name="groq", api
             }
         
         analysis_text = result.get("raw_analysis", "")
-        parsed = parse_analysis(analysis_text, resume_text, job_description)
+        parsed = parse_analysis(analysis_text, resume_text, job_description, result.get("analysis"))
         parsed["provider"] = result.get("provider", provider_name)
         return parsed
         
@@ -448,8 +454,36 @@ def analyze_resume_match(resume_text, job_description, provider_name="groq", api
         return {"error": f"Error analyzing resume with {provider_name}: {str(e)}"}
 
 
-def parse_analysis(analysis_text, resume_text, job_description):
-    """Parse the Groq analysis response into structured format."""
+# Match score formats, compiled once: the requested "MATCH_SCORE: 85", then
+# looser phrasings ("Match Score: 85", "85%", "85 out of 100") in order
+_MATCH_SCORE_RE = re.compile(r'MATCH_SCORE[:\s]+(\d+)', re.IGNORECASE)
+_FALLBACK_SCORE_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'match\s+score[:\s]+(\d+)',
+    r'score[:\s]+(\d+)',
+    r'(\d+)\s*%',
+    r'(\d+)\s+out\s+of\s+100',
+))
+# Section headers of the analysis response, found in a single scan
+_ANALYSIS_HEADER_RE = re.compile(r'STRENGTHS:|IMPROVEMENTS_NEEDED:|CONTENT_SUGGESTIONS:')
+
+
+def _split_analysis_sections(analysis_text):
+    """Map each section header to its text, from its first occurrence up to the next header."""
+    sections = {}
+    matches = list(_ANALYSIS_HEADER_RE.finditer(analysis_text))
+    for match, following in zip(matches, matches[1:] + [None]):
+        end = following.start() if following else len(analysis_text)
+        sections.setdefault(match.group(), analysis_text[match.end():end])
+    return sections
+
+
+def parse_analysis(analysis_text, resume_text, job_description, structured=None):
+    """
+    Parse the Groq analysis response into structured format.
+
+    Providers that return structured output pass its fields as structured,
+    which are used directly instead of parsing the text.
+    """
     result = {
         "match_score": 0,
         "strengths": [],
@@ -459,40 +493,37 @@ def parse_analysis(analysis_text, resume_text, job_description):
         "raw_analysis": analysis_text
     }
     
+    if structured:
+        result["match_score"] = float(structured["match_score"])
+        result["strengths"] = structured["strengths"][:10]
+        result["improvements_needed"] = structured["improvements_needed"][:10]
+        suggestions = [suggestion for suggestion in structured["content_suggestions"] if len(suggestion) > 20][:15]
+        result["content_suggestions"] = [
+            _format_suggestion_enhanced(suggestion, resume_text, job_description) for suggestion in suggestions
+        ]
+        result["show_optimization"] = result["match_score"] < 70
+        return result
+    
     # Extract match score - try multiple formats
     score_found = False
     
     # Try format: MATCH_SCORE: 85 or MATCH_SCORE:85
-    if "MATCH_SCORE" in analysis_text.upper():
-        try:
-            import re
-            # Look for MATCH_SCORE: followed by a number
-            pattern = r'MATCH_SCORE[:\s]+(\d+)'
-            match = re.search(pattern, analysis_text, re.IGNORECASE)
-            if match:
-                score = float(match.group(1))
-                # Ensure score is in valid range and not inflated
-                if 0 <= score <= 100:
-                    result["match_score"] = score
-                    score_found = True
-        except Exception as e:
-            pass
+    match = _MATCH_SCORE_RE.search(analysis_text)
+    if match:
+        score = float(match.group(1))
+        # Ensure score is in valid range and not inflated
+        if 0 <= score <= 100:
+            result["match_score"] = score
+            score_found = True
     
     # Try format: Match Score: 85% or match score is 85
     if not score_found:
         try:
-            import re
             # Look for patterns like "85%", "score: 85", "85 percent", etc.
-            patterns = [
-                r'match\s+score[:\s]+(\d+)',
-                r'score[:\s]+(\d+)',
-                r'(\d+)\s*%',
-                r'(\d+)\s+out\s+of\s+100',
-            ]
-            for pattern in patterns:
-                matches = re.findall(pattern, analysis_text, re.IGNORECASE)
-                if matches:
-                    score = float(matches[0])
+            for pattern in _FALLBACK_SCORE_RES:
+                match = pattern.search(analysis_text)
+                if match:
+                    score = float(match.group(1))
                     if 0 <= score <= 100:
                         result["match_score"] = score
                         score_found = True
@@ -545,12 +576,11 @@ def parse_analysis(analysis_text, resume_text, job_description):
         
         result["match_score"] = max(5, min(95, base_score))
     
+    sections = _split_analysis_sections(analysis_text)
+    
     # Extract strengths
-    if "STRENGTHS:" in analysis_text:
-        strengths_section = analysis_text.split("STRENGTHS:")[1]
-        if "IMPROVEMENTS_NEEDED:" in strengths_section:
-            strengths_section = strengths_section.split("IMPROVEMENTS_NEEDED:")[0]
-        
+    strengths_section = sections.get("STRENGTHS:")
+    if strengths_section is not None:
         strengths = [
             line.strip().lstrip("- ").strip()
             for line in strengths_section.split("\n")
@@ -559,11 +589,8 @@ def parse_analysis(analysis_text, resume_text, job_description):
         result["strengths"] = strengths[:10]
     
     # Extract improvements needed
-    if "IMPROVEMENTS_NEEDED:" in analysis_text:
-        improvements_section = analysis_text.split("IMPROVEMENTS_NEEDED:")[1]
-        if "CONTENT_SUGGESTIONS:" in improvements_section:
-            improvements_section = improvements_section.split("CONTENT_SUGGESTIONS:")[0]
-        
+    improvements_section = sections.get("IMPROVEMENTS_NEEDED:")
+    if improvements_section is not None:
         improvements = [
             line.strip().lstrip("- ").strip()
             for line in improvements_section.split("\n")
@@ -572,8 +599,8 @@ def parse_analysis(analysis_text, resume_text, job_description):
         result["improvements_needed"] = improvements[:10]
     
     # Extract content suggestions with enhanced formatting
-    if "CONTENT_SUGGESTIONS:" in analysis_text:
-        suggestions_section = analysis_text.split("CONTENT_SUGGESTIONS:")[1]
+    suggestions_section = sections.get("CONTENT_SUGGESTIONS:")
+    if suggestions_section is not None:
         
         suggestions = []
         for line in suggestions_section.split("\n"):
@@ -594,7 +621,6 @@ def parse_analysis(analysis_text, resume_text, job_description):
 
 def _format_suggestion_enhanced(suggestion_text, resume_text, job_description):
     """Format suggestion with icons, impact, and better structure."""
-    import re
     
     # Detect suggestion type and add appropriate icon
     icon = "💡"
@@ -666,7 +692,6 @@ def enhance_analysis_for_dashboard(analysis, resume_text, job_description):
     - Point potential
     - Time estimates
     """
-    import re
 
     current_score = analysis.get('match_score', 0)
 
@@ -832,7 +857,6 @@ def enhance_analysis_for_dashboard(analysis, resume_text, job_description):
 
 def get_dummy_analysis(resume_text, job_description):
     """Generate realistic dummy analysis for testing when Groq API is not available."""
-    import re
     import time
     time.sleep(0.5)  # Simulate processing time for smooth UX
     
@@ -985,7 +1009,6 @@ def get_dummy_analysis(resume_text, job_description):
 
 def analyze_section_improvements(original_resume, optimized_resume, job_description):
     """Analyze which sections improved between original and optimized resume."""
-    import re
     
     sections = {
         'SUMMARY': {'original': '', 'optimized': '', 'improved': False},
@@ -1174,7 +1197,6 @@ def create_optimized_resume(resume_text, job_description, suggestions, provider_
 
 def get_dummy_optimized_resume(resume_text, job_description, suggestions):
     """Generate realistic optimized resume for testing."""
-    import re
     import time
     time.sleep(0.8)  # Simulate processing time
     
@@ -1325,6 +1347,215 @@ def analyze():
         }), 500
 
 
+# MATCH_SCORE as soon as the full number has streamed (a non-digit follows it)
+_STREAM_SCORE_RE = re.compile(r'MATCH_SCORE[:\s]+(\d+)\D')
+
+
+def _sse(payload, event=None):
+    """Format one server-sent event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload)}\n\n"
+
+
+@app.route('/api/analyze/stream', methods=['POST'])
+@conditional_limit("20 per minute")
+def analyze_stream():
+    """
+    Analyze resume against job description, streamed as server-sent events.
+
+    Events: unnamed {"delta": text} chunks as the model writes, "score" with
+    the match score once it has streamed, then "done" with the parsed
+    analysis (or "error").
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({'success': False, 'error': 'No data provided'}), 400
+    
+    resume_text = data.get('resume_text', '')
+    job_description = data.get('job_description', '')
+    provider_name = data.get('provider', 'groq').lower()
+    api_key = data.get('api_key')  # Optional API key override
+    
+    if not resume_text or not job_description:
+        return jsonify({
+            'success': False,
+            'error': 'resume_text and job_description are required'
+        }), 400
+    if not MIN_RESUME_LENGTH <= len(resume_text) <= MAX_RESUME_LENGTH:
+        return jsonify({'success': False, 'error': 'Resume text length is out of range.'}), 400
+    if not MIN_JOB_DESCRIPTION_LENGTH <= len(job_description) <= MAX_JOB_DESCRIPTION_LENGTH:
+        return jsonify({'success': False, 'error': 'Job description length is out of range.'}), 400
+    
+    provider = get_ai_provider(provider_name, api_key)
+    if not provider or not provider.is_available():
+        return jsonify({
+            'success': False,
+            'error': f"AI provider '{provider_name}' not found or not available."
+        }), 400
+    
+    def events():
+        chunks = []
+        score_sent = False
+        try:
+            if hasattr(provider, 'analyze_resume_stream'):
+                stream = provider.analyze_resume_stream(resume_text, job_description)
+            else:
+                # Providers without streaming send the whole analysis as one chunk
+                result = provider.analyze_resume(resume_text, job_description)
+                if 'error' in result:
+                    raise RuntimeError(result['error'])
+                stream = [result.get('raw_analysis', '')]
+            
+            for delta in stream:
+                chunks.append(delta)
+                yield _sse({'delta': delta})
+                if not score_sent:
+                    match = _STREAM_SCORE_RE.search(''.join(chunks))
+                    if match:
+                        score_sent = True
+                        yield _sse({'match_score': int(match.group(1))}, 'score')
+            
+            analysis = parse_analysis(''.join(chunks), resume_text, job_description)
+            analysis = enhance_analysis_for_dashboard(analysis, resume_text, job_description)
+            yield _sse({
+                'success': True,
+                'match_score': analysis['match_score'],
+                'show_optimization': analysis['show_optimization'],
+                'strengths': analysis['strengths'],
+                'improvements_needed': analysis['improvements_needed'],
+                'content_suggestions': analysis['content_suggestions'],
+                'score_breakdown': analysis.get('score_breakdown', {}),
+                'categorized_actions': analysis.get('categorized_actions', []),
+                'potential_score': analysis.get('potential_score', analysis['match_score']),
+                'current_score': analysis.get('current_score', analysis['match_score'])
+            }, 'done')
+        except Exception as e:
+            logger.error(f"Error in analyze stream endpoint: {str(e)}", exc_info=True)
+            yield _sse({
+                'success': False,
+                'error': 'An error occurred while analyzing the resume. Please try again.'
+            }, 'error')
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/score-batch', methods=['POST'])
+@conditional_limit("5 per minute")
+def score_batch():
+    """
+    Submit up to MAX_ANALYSIS_BATCH_SIZE resumes for scoring against one job
+    description through the provider's batch API (OpenAI or Claude): half
+    the token price, finished within 24 hours. Poll
+    /api/score-batch/<provider>/<batch_id> for the results, sending any
+    api_key override in the X-API-Key header.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'success': False, 'error': 'No data provided'}), 400
+        
+        resumes = data.get('resumes') or []
+        job_description = data.get('job_description', '')
+        provider_name = data.get('provider', 'openai').lower()
+        api_key = data.get('api_key')  # Optional API key override
+        
+        # Input validation
+        if not isinstance(resumes, list) or not resumes or not job_description:
+            return jsonify({
+                'success': False,
+                'error': 'resumes (a list) and job_description are required'
+            }), 400
+        if len(resumes) > MAX_ANALYSIS_BATCH_SIZE:
+            return jsonify({
+                'success': False,
+                'error': f'At most {MAX_ANALYSIS_BATCH_SIZE} resumes per batch.'
+            }), 400
+        if len(job_description) > MAX_JOB_DESCRIPTION_LENGTH or any(
+                not isinstance(resume_text, str) or not MIN_RESUME_LENGTH <= len(resume_text) <= MAX_RESUME_LENGTH
+                for resume_text in resumes):
+            return jsonify({
+                'success': False,
+                'error': f'Each resume must be {MIN_RESUME_LENGTH}-{MAX_RESUME_LENGTH} characters and the job '
+                         f'description at most {MAX_JOB_DESCRIPTION_LENGTH}.'
+            }), 400
+        
+        provider = get_ai_provider(provider_name, api_key)
+        if not provider or not provider.is_available():
+            return jsonify({
+                'success': False,
+                'error': f"AI provider '{provider_name}' not found or not available."
+            }), 400
+        
+        if not hasattr(provider, 'analysis_batch_available') or not provider.analysis_batch_available():
+            return jsonify({
+                'success': False,
+                'error': f"AI provider '{provider_name}' does not support batch scoring."
+            }), 400
+        
+        batch_id = provider.submit_analysis_batch([(resume_text, job_description) for resume_text in resumes])
+        
+        return jsonify({'success': True, 'provider': provider_name, 'batch_id': batch_id}), 202
+        
+    except Exception as e:
+        logger.error(f"Error in score batch endpoint: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': 'An error occurred while submitting the batch. Please try again.'
+        }), 500
+
+
+@app.route('/api/score-batch/<provider_name>/<batch_id>', methods=['GET'])
+@conditional_limit("30 per minute")
+def score_batch_results(provider_name, batch_id):
+    """Status of a scoring batch, with one result per resume once it has ended."""
+    try:
+        # Optional API key override; a header keeps it out of URLs and access logs
+        provider = get_ai_provider(provider_name.lower(), request.headers.get('X-API-Key'))
+        if not provider or not provider.is_available():
+            return jsonify({
+                'success': False,
+                'error': f"AI provider '{provider_name}' not found or not available."
+            }), 400
+        
+        if not hasattr(provider, 'analysis_batch_available') or not provider.analysis_batch_available():
+            return jsonify({
+                'success': False,
+                'error': f"AI provider '{provider_name}' does not support batch scoring."
+            }), 400
+        
+        results = provider.analysis_batch_results(batch_id)
+        if results is None:
+            return jsonify({'success': True, 'status': 'in_progress', 'batch_id': batch_id})
+        
+        scores = []
+        for result in results:
+            if 'error' in result:
+                scores.append({'error': result['error']})
+                continue
+            # Batch analyses are structured output, so their fields are used as-is
+            analysis = result['analysis']
+            scores.append({
+                'match_score': analysis['match_score'],
+                'show_optimization': analysis['match_score'] < 70,
+                'strengths': analysis['strengths'][:10],
+                'improvements_needed': analysis['improvements_needed'][:10],
+                'content_suggestions': analysis['content_suggestions'][:15]
+            })
+        return jsonify({'success': True, 'status': 'ended', 'batch_id': batch_id, 'results': scores})
+        
+    except Exception as e:
+        logger.error(f"Error in score batch results endpoint: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': 'An error occurred while reading the batch. Please try again.'
+        }), 500
+
+
 @app.route('/api/ats-analysis', methods=['POST'])
 @conditional_limit("30 per minute")
 def ats_analysis():
@@ -1664,6 +1895,13 @@ def optimize():
             if original_score is None:
                 original_score = analysis.get('match_score', 0)
         
+        original_score_future = None
+        if original_score is None:
+            # Only the score is needed, so the analysis runs alongside the optimization
+            original_score_future = background_executor.submit(
+                analyze_resume_match, resume_text, job_description, provider_name, api_key
+            )
+        
         # Create optimized resume
         try:
             logger.info(f"Creating optimized resume with provider: {provider_name}")
@@ -1687,6 +1925,10 @@ def optimize():
         
         optimized_resume = result['optimized_resume']
         download_resume = result.get('download_resume', optimized_resume)
+        
+        if original_score_future is not None:
+            original_analysis = original_score_future.result()
+            original_score = original_analysis.get('match_score', 0) if 'error' not in original_analysis else 0
 
         # REORDER SECTIONS according to template configuration
         logger.info(f"Applying section reordering for template: {template_name}")
@@ -1957,6 +2199,16 @@ def is_project_section(section_text):
     return 'PROJECT' in section_text.upper()
 
 
+# Date patterns marking an experience entry, compiled once since every resume line is checked
+_DATE_PATTERN_RE = re.compile('|'.join([
+    r'\d{4}',  # Years like 2022, 2025
+    r'\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}',  # "Mar 2022", "January 2022"
+    r'\b(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}',
+    r'\d{1,2}[/-]\d{4}',  # "03/2022", "3-2022"
+    r'Current|Present'  # Current employment indicators
+]), re.IGNORECASE)
+
+
 def format_resume_line(line, prev_line_type=None, line_index=0, header_processed=False):
     """Parse and categorize a resume line for proper formatting."""
     line = line.strip()
@@ -2027,19 +2279,9 @@ def format_resume_line(line, prev_line_type=None, line_index=0, header_processed
     
     # Experience entry detection: Contains "|" and date patterns (e.g., "Company, Location | Jan 2020 - Dec 2022 | Job Title")
     # Check if it looks like an experience entry (has pipe separator and date patterns)
-    import re
     has_pipe = '|' in line
     
-    # More comprehensive date pattern matching
-    date_patterns = [
-        r'\d{4}',  # Years like 2022, 2025
-        r'\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}',  # "Mar 2022", "January 2022"
-        r'\b(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}',
-        r'\d{1,2}[/-]\d{4}',  # "03/2022", "3-2022"
-        r'Current|Present'  # Current employment indicators
-    ]
-    
-    has_date_pattern = any(re.search(pattern, line, re.IGNORECASE) for pattern in date_patterns)
+    has_date_pattern = _DATE_PATTERN_RE.search(line) is not None
     
     # Project entry detection: Check if we're in PROJECTS section
     # We need to track the current section - this will be done by the caller
@@ -2280,7 +2522,6 @@ def download_resume():
                 from reportlab.pdfbase import pdfmetrics
                 from reportlab.pdfbase.ttfonts import TTFont
                 from reportlab.lib.colors import black, white
-                import re
                 
                 buffer = io.BytesIO()
                 doc = SimpleDocTemplate(buffer, pagesize=letter,
@@ -2580,7 +2821,6 @@ def download_resume():
         elif file_format == 'docx':
             # Generate DOCX
             try:
-                import re
                 from docx import Document
                 from docx.shared import Pt, RGBColor, Inches
                 from docx.enum.text import WD_ALIGN_PARAGRAPH
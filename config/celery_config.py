@@ -70,6 +70,10 @@ celery_app.conf.update(
             'task': 'services.optimization_tasks.cleanup_old_results',
             'schedule': 3600.0,  # Every hour
         },
+        'clean-response-cache': {
+            'task': 'services.optimization_tasks.clean_response_cache_task',
+            'schedule': 86400.0,  # Daily
+        },
     },
 )
 
@@ -11,6 +11,23 @@ from utils.file_parser import parse_resume, parse_pdf, parse_docx
 from utils.groq_optimizer import GroqResumeOptimizer
 from docx import Document
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _write_json(path: str, data: Dict):
+    """Write data to path as indented JSON, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+
 
 class ResumeEditor:
     """Advanced resume editor for job-specific optimizations."""
@@ -94,8 +111,7 @@ class ResumeEditor:
             }
             
             metadata_path = output_path.replace('.txt', '_metadata.json').replace('.docx', '_metadata.json')
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
+            _write_json(metadata_path, metadata)
             
             return {
                 "success": True,
@@ -190,8 +206,7 @@ class ResumeEditor:
         }
         
         summary_path = os.path.join(output_dir, "batch_summary.json")
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2)
+        _write_json(summary_path, summary)
         
         print(f"\n📊 Summary saved to: {summary_path}")
         print(f"   Successful: {summary['successful']}/{summary['total_jobs']}")
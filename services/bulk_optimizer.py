@@ -48,12 +48,15 @@ class BulkOptimizer:
         """
         total = len(candidates)
         results = []
+        # Keyword set for match scores, built once instead of per candidate
+        job_words = self._keywords(job_description)
         
         def optimize_single(candidate: Dict, index: int) -> Dict:
             """Optimize a single candidate."""
             try:
                 # Convert candidate data to resume text format
                 resume_text = self._candidate_to_resume_text(candidate)
+                match_score = self._match_score(resume_text, job_words)
                 
                 # Optimize using Groq (if available)
                 if self.use_groq and self.groq_optimizer:
@@ -75,7 +78,7 @@ class BulkOptimizer:
                     'status': 'success',
                     'original_data': candidate,
                     'optimized_data': optimization_result.get('optimized_resume', ''),
-                    'match_score': self._calculate_match_score(candidate, job_description),
+                    'match_score': match_score,
                     'error': None
                 }
             
@@ -157,18 +160,20 @@ class BulkOptimizer:
     
     def _calculate_match_score(self, candidate: Dict, job_description: str) -> float:
         """Calculate match score between candidate and job."""
+        return self._match_score(self._candidate_to_resume_text(candidate), self._keywords(job_description))
+    
+    @staticmethod
+    def _keywords(text: str) -> set:
+        """Lower-cased words longer than 3 characters."""
+        return set(word for word in text.lower().split() if len(word) > 3)
+    
+    def _match_score(self, resume_text: str, job_words: set) -> float:
+        """Share (0-100) of the job's keywords found in the resume text."""
         # Simple keyword matching
         # Can be enhanced with more sophisticated algorithm
-        candidate_text = self._candidate_to_resume_text(candidate).lower()
-        job_lower = job_description.lower()
-        
-        # Extract keywords from job description
-        job_words = set(word for word in job_lower.split() if len(word) > 3)
-        candidate_words = set(word for word in candidate_text.split() if len(word) > 3)
-        
         if not job_words:
             return 0.0
         
-        matching = len(job_words.intersection(candidate_words))
+        matching = len(job_words.intersection(self._keywords(resume_text)))
         return (matching / len(job_words)) * 100
 
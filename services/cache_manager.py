@@ -83,6 +83,26 @@ import redis
 import json
 import os
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(data: Dict):
+    """Serialize a cached result (orjson bytes when installed, else a json str)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data)
+
+
+def _loads(raw):
+    """Deserialize a cached result written by _dumps."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 class RedisCache:
     """Production Redis cache implementation."""
     
@@ -125,7 +145,7 @@ class RedisCache:
             key = self._generate_key(candidate_id, job_id, job_version)
             data = self.redis_client.get(key)
             if data:
-                return json.loads(data)
+                return _loads(data)
             return None
         except Exception as e:
             print(f"Redis get error: {e}")
@@ -142,7 +162,7 @@ class RedisCache:
             self.redis_client.setex(
                 key,
                 self.ttl,
-                json.dumps(data)
+                _dumps(data)
             )
         except Exception as e:
             print(f"Redis set error: {e}")
@@ -257,6 +257,19 @@ def cleanup_old_results():
         return {'status': 'error', 'error': str(e)}
 
 
+@celery_app.task
+def clean_response_cache_task():
+    """Periodic task to evict expired AI provider responses and bound the cache on disk."""
+    try:
+        from utils.ai_providers import clean_response_cache
+        removed = clean_response_cache()
+        logger.info(f"Removed {removed} AI response cache entries")
+        return {'status': 'success', 'removed': removed}
+    except Exception as e:
+        logger.error(f"Error cleaning AI response cache: {str(e)}")
+        return {'status': 'error', 'error': str(e)}
+
+
 def _candidate_to_resume_text(candidate: Dict) -> str:
     """Convert candidate data to resume text format."""
     lines = []
@@ -0,0 +1,439 @@
+"""
+Tests for the AI providers (utils/ai_providers.py), run against fake SDK
+clients so that no API keys or network access are needed.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from utils import ai_providers
+
+ANALYSIS = {
+    "match_score": 72,
+    "strengths": ["Python"],
+    "improvements_needed": ["Kubernetes"],
+    "content_suggestions": ["Skills: Add Kubernetes - required by the job - list the clusters you ran"],
+}
+TEXT_ANALYSIS = "MATCH_SCORE: 64\nSTRENGTHS:\n- Python\n\nIMPROVEMENTS_NEEDED:\n- Kubernetes\n"
+RESUME = "Python developer with five years of Django and PostgreSQL experience."
+JOB = "Backend engineer: Python, Django, Kubernetes."
+
+
+@pytest.fixture(autouse=True)
+def no_disk_cache(monkeypatch):
+    monkeypatch.setattr(ai_providers, "DISKCACHE_AVAILABLE", False)
+    monkeypatch.setattr(ai_providers, "HYBRID_SCORE", False)
+    ai_providers._provider_response_cache.cache_clear()
+
+
+# ---------- Cohere ----------
+
+class Cohere4Client:
+    """chat() as in the pinned cohere==4.47: no response_format or preamble."""
+
+    def __init__(self):
+        self.calls = []
+
+    def chat(self, message=None, conversation_id="", model=None, return_chat_history=False,
+             return_prompt=False, return_preamble=False, chat_history=None, preamble_override=None,
+             user_name=None, temperature=0.8, max_tokens=None, stream=False, p=None, k=None,
+             logit_bias=None, search_queries_only=None, documents=None, citation_quality=None,
+             prompt_truncation=None, connectors=None):
+        self.calls.append(dict(message=message, model=model, preamble_override=preamble_override,
+                               temperature=temperature, max_tokens=max_tokens))
+        return SimpleNamespace(text=TEXT_ANALYSIS)
+
+
+class Cohere5Client:
+    """chat() as in cohere>=5, with JSON mode and preamble."""
+
+    def __init__(self):
+        self.calls = []
+
+    def chat(self, *, message, model=None, preamble=None, temperature=None, max_tokens=None,
+             response_format=None, request_options=None):
+        self.calls.append(dict(message=message, model=model, preamble=preamble,
+                               temperature=temperature, max_tokens=max_tokens, response_format=response_format))
+        return SimpleNamespace(text=json.dumps(ANALYSIS) if response_format else "Optimized resume")
+
+
+def cohere_provider(client):
+    provider = ai_providers.CohereProvider(api_key="test-key")
+    provider.client = client
+    return provider
+
+
+def test_cohere_4_analysis_uses_the_text_prompt():
+    client = Cohere4Client()
+    result = cohere_provider(client).analyze_resume(RESUME, JOB)
+
+    assert "error" not in result
+    assert result["raw_analysis"] == TEXT_ANALYSIS
+    assert "analysis" not in result
+
+
+def test_cohere_5_analysis_uses_json_mode():
+    client = Cohere5Client()
+    result = cohere_provider(client).analyze_resume(RESUME, JOB)
+
+    assert client.calls[0]["response_format"] == ai_providers._COHERE_ANALYSIS_FORMAT
+    assert result["analysis"]["match_score"] == 72
+    assert result["raw_analysis"].startswith("MATCH_SCORE: 72\n")
+
+
+def test_cohere_json_mode_prompt_has_no_text_format():
+    client4, client5 = Cohere4Client(), Cohere5Client()
+    cohere_provider(client4).analyze_resume(RESUME, JOB)
+    cohere_provider(client5).analyze_resume(RESUME, JOB)
+
+    assert "MATCH_SCORE:" in client4.calls[0]["message"]
+    assert "MATCH_SCORE" not in client5.calls[0]["message"]
+    assert "match_score" in client5.calls[0]["message"]
+
+
+def test_cohere_4_optimize_sends_preamble_override():
+    client = Cohere4Client()
+    result = cohere_provider(client).optimize_resume(RESUME, JOB, ["Add Kubernetes"])
+
+    assert not result.startswith("Error")
+    assert client.calls[0]["preamble_override"] == ai_providers._optimize_rules()
+
+
+def test_cohere_5_optimize_sends_preamble():
+    client = Cohere5Client()
+    result = cohere_provider(client).optimize_resume(RESUME, JOB, ["Add Kubernetes"])
+
+    assert result == "Optimized resume"
+    assert client.calls[0]["preamble"] == ai_providers._optimize_rules()
+
+
+# ---------- Batch scoring ----------
+
+PAIRS = [(RESUME, JOB), ("Data analyst skilled in SQL, Tableau and Excel reporting.", JOB), (RESUME, "Site reliability engineer: Kubernetes, Terraform.")]
+
+
+def openai_output_line(custom_id, analysis=ANALYSIS, status_code=200):
+    body = {"choices": [{"message": {"content": json.dumps(analysis)}}]}
+    return json.dumps({"custom_id": custom_id, "response": {"status_code": status_code, "body": body}})
+
+
+class FakeOpenAIBatchClient:
+    """The files and batches resources of an openai SDK with the Batch API."""
+
+    def __init__(self, status="completed", output_lines=()):
+        self.uploads = []
+        self.created = []
+        self.output = "\n".join(output_lines).encode()
+        self.status = status
+        self.files = SimpleNamespace(create=self._upload, content=lambda file_id: SimpleNamespace(content=self.output))
+        self.batches = SimpleNamespace(create=self._create, retrieve=self._retrieve)
+
+    def _upload(self, file, purpose):
+        self.uploads.append((file, purpose))
+        return SimpleNamespace(id="file-1")
+
+    def _create(self, **kwargs):
+        self.created.append(kwargs)
+        return SimpleNamespace(id="batch-1")
+
+    def _retrieve(self, batch_id):
+        return SimpleNamespace(status=self.status, output_file_id="file-2",
+                               request_counts=SimpleNamespace(total=len(PAIRS)))
+
+
+def openai_provider(client):
+    provider = ai_providers.OpenAIProvider(api_key="test-key")
+    provider.client = client
+    return provider
+
+
+def test_openai_batch_file_has_one_request_per_pair():
+    client = FakeOpenAIBatchClient()
+    assert openai_provider(client).submit_analysis_batch(PAIRS) == "batch-1"
+
+    (name, content), purpose = client.uploads[0]
+    lines = [json.loads(line) for line in content.decode().splitlines()]
+    assert (name, purpose) == ("analyses.jsonl", "batch")
+    assert [line["custom_id"] for line in lines] == ["0", "1", "2"]
+    assert all(line["method"] == "POST" and line["url"] == "/v1/chat/completions" for line in lines)
+    assert all(line["body"]["response_format"] == ai_providers._OPENAI_ANALYSIS_FORMAT for line in lines)
+    assert PAIRS[1][0] in lines[1]["body"]["messages"][-1]["content"]
+    assert client.created[0] == {"input_file_id": "file-1", "endpoint": "/v1/chat/completions",
+                                 "completion_window": "24h"}
+
+
+def test_openai_structured_request_has_no_text_format():
+    provider = openai_provider(None)
+    structured = provider._analyze_request(RESUME, JOB, structured=True)
+    text = provider._analyze_request(RESUME, JOB)
+
+    assert structured["response_format"] == ai_providers._OPENAI_ANALYSIS_FORMAT
+    assert all("MATCH_SCORE" not in message["content"] for message in structured["messages"])
+    assert "response_format" not in text
+    assert "MATCH_SCORE:" in text["messages"][-1]["content"]
+
+
+def test_openai_batch_results_follow_custom_ids():
+    client = FakeOpenAIBatchClient(output_lines=[
+        openai_output_line("2", {**ANALYSIS, "match_score": 30}),
+        openai_output_line("1", status_code=500),
+        openai_output_line("0"),
+    ])
+    results = openai_provider(client).analysis_batch_results("batch-1")
+
+    assert results[0]["analysis"]["match_score"] == 72
+    assert "error" in results[1]
+    assert results[2]["analysis"]["match_score"] == 30
+
+
+def test_openai_batch_results_none_while_running():
+    client = FakeOpenAIBatchClient(status="in_progress")
+    assert openai_provider(client).analysis_batch_results("batch-1") is None
+
+
+def test_batch_unsupported_by_pinned_sdks():
+    openai = openai_provider(SimpleNamespace(chat=None, files=None))
+    claude = ai_providers.ClaudeProvider(api_key="test-key")
+    claude.client = SimpleNamespace(messages=SimpleNamespace(create=None), beta=SimpleNamespace())
+
+    for provider in (openai, claude):
+        assert not provider.analysis_batch_available()
+        with pytest.raises(RuntimeError):
+            provider.submit_analysis_batch(PAIRS)
+    assert not hasattr(cohere_provider(Cohere5Client()), "analysis_batch_available")
+
+
+def claude_entry(custom_id, analysis=ANALYSIS, result_type="succeeded"):
+    message = SimpleNamespace(content=[SimpleNamespace(type="tool_use", input=analysis)])
+    return SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(type=result_type, message=message))
+
+
+class FakeMessageBatches:
+    def __init__(self, entries=()):
+        self.created = []
+        self.entries = list(entries)
+
+    def create(self, requests):
+        self.created.append(requests)
+        return SimpleNamespace(id="msgbatch-1")
+
+    def retrieve(self, batch_id):
+        counts = SimpleNamespace(processing=0, succeeded=len(PAIRS), errored=0, canceled=0, expired=0)
+        return SimpleNamespace(processing_status="ended", request_counts=counts)
+
+    def results(self, batch_id):
+        return iter(self.entries)
+
+
+def test_claude_batch_uses_beta_message_batches(monkeypatch):
+    monkeypatch.setattr(ai_providers, "_resolve_claude_model", lambda client, api_key: "claude-test")
+    batches = FakeMessageBatches([
+        claude_entry("1", {**ANALYSIS, "match_score": 45}),
+        claude_entry("2", result_type="errored"),
+        claude_entry("0"),
+    ])
+    provider = ai_providers.ClaudeProvider(api_key="test-key")
+    provider.client = SimpleNamespace(messages=SimpleNamespace(), beta=SimpleNamespace(messages=SimpleNamespace(batches=batches)))
+
+    assert provider.analysis_batch_available()
+    assert provider.submit_analysis_batch(PAIRS) == "msgbatch-1"
+    requests = batches.created[0]
+    assert [request["custom_id"] for request in requests] == ["0", "1", "2"]
+    assert all(request["params"]["model"] == "claude-test" for request in requests)
+    assert all(request["params"]["tool_choice"] == {"type": "tool", "name": "record_analysis"} for request in requests)
+
+    results = provider.analysis_batch_results("msgbatch-1")
+    assert [result.get("analysis", {}).get("match_score") for result in results] == [72, 45, None]
+    assert "error" in results[2]
+
+
+def test_claude_tool_call_request_has_no_text_format():
+    provider = ai_providers.ClaudeProvider(api_key="test-key")
+    structured = provider._analyze_request(RESUME, JOB, structured=True)
+    text = provider._analyze_request(RESUME, JOB)
+
+    assert structured["tool_choice"] == {"type": "tool", "name": "record_analysis"}
+    assert "MATCH_SCORE" not in structured["system"]
+    assert "MATCH_SCORE" not in structured["messages"][-1]["content"]
+    assert "tools" not in text
+    assert "MATCH_SCORE:" in text["system"] and "MATCH_SCORE:" in text["messages"][-1]["content"]
+
+
+
+class FakeProbeMessages:
+    """messages.create() failing with the given error for some models."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.probed = []
+
+    def create(self, model, **kwargs):
+        self.probed.append(model)
+        if model in self.errors:
+            raise Exception(self.errors[model])
+        return SimpleNamespace(content=[])
+
+
+@pytest.fixture
+def model_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(ai_providers, "MODEL_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(ai_providers, "_claude_models", {})
+    return tmp_path
+
+
+def test_claude_model_probe_stops_at_the_first_success(model_cache):
+    models = ai_providers.CLAUDE_MODELS
+    messages = FakeProbeMessages({models[0]: "Error code: 404 - not_found_error"})
+    client = SimpleNamespace(messages=messages)
+
+    assert ai_providers._resolve_claude_model(client, "key-a") == models[1]
+    assert messages.probed == list(models[:2])
+    assert ai_providers._read_cached_model("claude", "key-a") == models[1]
+    assert ai_providers._resolve_claude_model(client, "key-a") == models[1]
+    assert messages.probed == list(models[:2])
+
+
+def test_claude_model_probe_skips_rate_limits_without_persisting(model_cache):
+    models = ai_providers.CLAUDE_MODELS
+    client = SimpleNamespace(messages=FakeProbeMessages({models[0]: "Error code: 429 - rate_limit_error"}))
+
+    assert ai_providers._resolve_claude_model(client, "key-a") == models[1]
+    assert ai_providers._read_cached_model("claude", "key-a") is None
+
+
+def test_claude_model_is_resolved_per_api_key(model_cache):
+    models = ai_providers.CLAUDE_MODELS
+    ai_providers._resolve_claude_model(SimpleNamespace(messages=FakeProbeMessages({})), "key-a")
+    limited = FakeProbeMessages({models[0]: "404 not found"})
+
+    assert ai_providers._resolve_claude_model(SimpleNamespace(messages=limited), "key-b") == models[1]
+    assert limited.probed == list(models[:2])
+
+    ai_providers._forget_claude_model("key-b")
+    assert ai_providers._read_cached_model("claude", "key-a") == models[0]
+    assert ai_providers._read_cached_model("claude", "key-b") is None
+
+def test_score_batch_polls_until_the_batch_ends(monkeypatch):
+    monkeypatch.setattr(ai_providers.time, "sleep", lambda seconds: None)
+    client = FakeOpenAIBatchClient(status="in_progress", output_lines=[openai_output_line(str(i)) for i in range(3)])
+    polls = []
+    retrieve = client._retrieve
+
+    def retrieve_third_time_done(batch_id):
+        polls.append(batch_id)
+        if len(polls) == 3:
+            client.status = "completed"
+        return retrieve(batch_id)
+
+    client.batches.retrieve = retrieve_third_time_done
+    results = ai_providers.score_batch(openai_provider(client), PAIRS)
+
+    assert [result["analysis"]["match_score"] for result in results] == [72] * 3
+    assert polls == ["batch-1"] * 3
+
+
+# ---------- Groq pre-screen ----------
+
+def test_groq_prescreen_is_off_by_default():
+    provider = ai_providers.GroqProvider(api_key="test-key")
+
+    assert (provider.skip_llm_threshold, provider.skip_llm_high_threshold) == (0, 1)
+    assert provider._prescreen("Pastry chef with ten years in French bakeries.", JOB) is None
+    assert provider._prescreen(RESUME, RESUME) is None
+
+
+# ---------- Provider cache ----------
+
+def test_provider_cache_keeps_the_most_recent_keys(monkeypatch):
+    class FakeProvider(ai_providers.CohereProvider):
+        def __init__(self, api_key=None):
+            self.api_key = api_key
+            self.client = object()
+
+    monkeypatch.setattr(ai_providers, "_PROVIDER_CLASSES", {"fake": FakeProvider})
+    monkeypatch.setattr(ai_providers, "_PROVIDER_CACHE", ai_providers.OrderedDict())
+    monkeypatch.setattr(ai_providers, "CLIENT_CACHE_SIZE", 2)
+
+    first = ai_providers.get_ai_provider("fake", "key-1")
+    second = ai_providers.get_ai_provider("fake", "key-2")
+    assert ai_providers.get_ai_provider("fake", "key-1") is first
+    ai_providers.get_ai_provider("fake", "key-3")
+
+    assert len(ai_providers._PROVIDER_CACHE) == 2
+    assert ai_providers.get_ai_provider("fake", "key-1") is first
+    assert ai_providers.get_ai_provider("fake", "key-2") is not second
+
+
+# ---------- Rate limiter ----------
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(ai_providers, "time", fake)
+    return fake
+
+
+def test_rate_limiter_waits_for_the_oldest_request(clock):
+    limiter = ai_providers._RateLimiter(rpm=2, tpm=10_000, window=60)
+    assert limiter._reserve(10) == 0
+    clock.now = 1
+    assert limiter._reserve(10) == 0
+    clock.now = 2
+    assert limiter._reserve(10) == 58
+
+    clock.now = 60
+    assert limiter._reserve(10) == 0
+
+
+def test_rate_limiter_waits_for_token_budget(clock):
+    limiter = ai_providers._RateLimiter(rpm=100, tpm=100, window=60)
+    assert limiter._reserve(60) == 0
+    clock.now = 10
+    assert limiter._reserve(50) == 50
+    assert limiter._reserve(40) == 0
+
+
+def test_rate_limiter_lets_an_oversized_call_through_on_an_empty_window(clock):
+    limiter = ai_providers._RateLimiter(rpm=100, tpm=100, window=60)
+    assert limiter._reserve(500) == 0
+    assert limiter._reserve(1) == 60
+
+
+def test_rate_limiter_acquire_sleeps_then_reserves(clock):
+    limiter = ai_providers._RateLimiter(rpm=1, tpm=10_000, window=60)
+    limiter.acquire(10)
+    clock.now = 15
+    limiter.acquire(10)
+
+    assert clock.sleeps == [45]
+    assert list(limiter._requests) == [60]
+
+
+def test_rate_limiter_acquire_async_sleeps_then_reserves(clock, monkeypatch):
+    async def sleep(seconds):
+        clock.sleep(seconds)
+
+    monkeypatch.setattr(ai_providers.asyncio, "sleep", sleep)
+    limiter = ai_providers._RateLimiter(rpm=1, tpm=10_000, window=60)
+
+    async def acquire_twice():
+        await limiter.acquire_async(10)
+        await limiter.acquire_async(10)
+
+    ai_providers.asyncio.run(acquire_twice())
+    assert clock.sleeps == [60]
@@ -0,0 +1,40 @@
+"""
+Tests for the local TF-IDF keyword score (utils/fast_score.py).
+"""
+
+import pytest
+
+from utils.fast_score import keyword_score
+
+RESUME = "Senior Python engineer building Django REST services on AWS with PostgreSQL and Redis."
+JOB = "Backend engineer: Python, Django, PostgreSQL, AWS, Kubernetes."
+
+
+@pytest.mark.parametrize("resume_text, job_description", [
+    (RESUME, JOB),
+    (JOB, JOB),
+    (RESUME, RESUME),
+    ("", JOB),
+    (RESUME, ""),
+    ("", ""),
+    ("the and of", "a an the"),
+    ("C++ C# .NET node.js ci/cd", "c++ c# .net node.js ci/cd"),
+])
+def test_score_is_between_0_and_1(resume_text, job_description):
+    score = keyword_score(resume_text, job_description)
+
+    assert isinstance(score, float)
+    assert 0.0 <= score <= 1.0
+
+
+def test_identical_texts_score_1():
+    assert keyword_score(JOB, JOB) == pytest.approx(1.0)
+
+
+def test_unrelated_texts_score_0():
+    assert keyword_score("Pastry chef, French bakeries, sourdough.", JOB) == 0.0
+
+
+def test_overlap_scores_between():
+    assert 0.0 < keyword_score(RESUME, JOB) < 1.0
+    assert keyword_score(RESUME, JOB) > keyword_score("Python scripting for spreadsheets.", JOB)
@@ -0,0 +1,59 @@
+"""
+Tests for the multi-stage Groq optimizer (utils/groq_optimizer.py), run
+against a fake streaming client.
+"""
+
+from types import SimpleNamespace
+
+from utils.groq_optimizer import GroqResumeOptimizer
+
+RESUME = """JANE DOE
+Software Engineer
+SUMMARY
+Backend engineer whose open-source work effectively showcases distributed-systems depth.
+I recommend her for staff roles, says her manager.
+EXPERIENCE
+ACME CORP, Remote | SENIOR ENGINEER | Jan 2020 - Present
+- Built a consensus layer serving 2M requests per second
+EDUCATION
+BS Computer Science, State University, 2016
+"""
+
+
+class FakeStream:
+    def __init__(self, text, chunk_size=7):
+        self.chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        self.read = 0
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))])
+
+    def close(self):
+        self.closed = True
+
+
+def stream_resume(text):
+    """_stream_resume's result for a response streaming text, and the fake stream."""
+    stream = FakeStream(text)
+    optimizer = GroqResumeOptimizer(api_key=None)
+    optimizer.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: stream)))
+    return optimizer._stream_resume(model="test"), stream
+
+
+def test_commentary_like_phrases_inside_the_resume_do_not_truncate_it():
+    text, stream = stream_resume(RESUME)
+
+    assert text == RESUME.strip()
+    assert stream.closed
+
+
+def test_stream_stops_at_changes_made():
+    text, stream = stream_resume(RESUME + "\nChanges made:\n- Tightened the summary\n" + "- More notes\n" * 50)
+
+    assert text == RESUME.strip()
+    assert stream.read < len(stream.chunks)
+    assert stream.closed
@@ -0,0 +1,205 @@
+"""
+Tests for the semantic response cache (utils/semantic_cache.py).
+
+A small bag-of-words model stands in for sentence-transformers. Like MiniLM,
+it only reads the start of its input.
+"""
+
+import hashlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils import semantic_cache
+from utils.semantic_cache import SemanticCache, pair_key
+
+MODEL_MAX_WORDS = 256
+DIMENSIONS = 64
+
+
+class FakeModel:
+    """Hashed bag-of-words embeddings of the first MODEL_MAX_WORDS words."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, normalize_embeddings=True):
+        self.encoded.extend(texts)
+        vectors = np.zeros((len(texts), DIMENSIONS), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split()[:MODEL_MAX_WORDS]:
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % DIMENSIONS] += 1
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setattr(semantic_cache, "np", np, raising=False)
+    monkeypatch.setattr(semantic_cache, "EMBEDDINGS_AVAILABLE", True)
+    monkeypatch.setattr(semantic_cache, "get_embedding_model", lambda model_name=None: fake)
+    monkeypatch.setattr(semantic_cache, "_embedding_store", lambda: None)
+    return fake
+
+
+RESUME = " ".join(["Senior Python engineer building Django services on AWS with PostgreSQL."] * 40)
+JOB_A = "Backend engineer: Python, Django, PostgreSQL, AWS."
+JOB_B = "Frontend engineer: React, TypeScript, CSS, accessibility."
+
+
+def test_same_resume_and_job_hits(model):
+    cache = SemanticCache(enabled=True)
+    _, vector = cache.lookup("analyze", RESUME, pair_key(RESUME, JOB_A))
+    cache.store("analyze", vector, {"raw_analysis": "MATCH_SCORE: 80"}, pair_key(RESUME, JOB_A))
+
+    cached, _ = cache.lookup("analyze", RESUME + " ", pair_key(RESUME + " ", JOB_A + "\n"))
+    assert cached == {"raw_analysis": "MATCH_SCORE: 80"}
+
+
+def test_same_resume_different_job_misses(model):
+    cache = SemanticCache(enabled=True)
+    _, vector = cache.lookup("analyze", RESUME, pair_key(RESUME, JOB_A))
+    cache.store("analyze", vector, {"raw_analysis": "MATCH_SCORE: 80"}, pair_key(RESUME, JOB_A))
+
+    cached, _ = cache.lookup("analyze", RESUME, pair_key(RESUME, JOB_B))
+    assert cached is None
+
+
+def test_different_resume_misses(model):
+    cache = SemanticCache(enabled=True)
+    _, vector = cache.lookup("analyze", RESUME, pair_key(RESUME, JOB_A))
+    cache.store("analyze", vector, {"raw_analysis": "MATCH_SCORE: 80"}, pair_key(RESUME, JOB_A))
+
+    other = "Pastry chef with ten years in French bakeries."
+    cached, _ = cache.lookup("analyze", other, pair_key(other, JOB_A))
+    assert cached is None
+
+
+def test_namespaces_are_separate(model):
+    cache = SemanticCache(enabled=True)
+    _, vector = cache.lookup("analyze", RESUME, pair_key(RESUME, JOB_A))
+    cache.store("analyze", vector, {"raw_analysis": "MATCH_SCORE: 80"}, pair_key(RESUME, JOB_A))
+
+    cached, _ = cache.lookup("ats_score", RESUME, pair_key(RESUME, JOB_A))
+    assert cached is None
+
+
+def test_lookup_many_keys_each_resume_to_the_job(model):
+    cache = SemanticCache(enabled=True)
+    [(_, vector)] = cache.lookup_many("analyze", [RESUME], [pair_key(RESUME, JOB_A)])
+    cache.store("analyze", vector, {"raw_analysis": "MATCH_SCORE: 80"}, pair_key(RESUME, JOB_A))
+
+    assert cache.lookup_many("analyze", [RESUME], [pair_key(RESUME, JOB_A)])[0][0] is not None
+    assert cache.lookup_many("analyze", [RESUME], [pair_key(RESUME, JOB_B)])[0][0] is None
+
+
+def test_resumes_sharing_the_embedded_prefix_miss(model):
+    cache = SemanticCache(enabled=True)
+    edited = RESUME + " Education: MSc Computer Science, added after the model's 256-word limit."
+    assert len(RESUME.split()) >= MODEL_MAX_WORDS
+    _, vector = cache.lookup("optimize", RESUME, pair_key(RESUME, JOB_A))
+    cache.store("optimize", vector, "Rewrite of the old resume", pair_key(RESUME, JOB_A))
+
+    cached, edited_vector = cache.lookup("optimize", edited, pair_key(edited, JOB_A))
+    assert float(edited_vector @ vector) == pytest.approx(1.0)
+    assert cached is None
+
+
+def test_disabled_by_default(model):
+    cache = SemanticCache()
+    _, vector = cache.lookup("analyze", RESUME, pair_key(RESUME, JOB_A))
+    cache.store("analyze", vector, {"raw_analysis": "MATCH_SCORE: 80"}, pair_key(RESUME, JOB_A))
+
+    assert vector is None
+    assert cache.lookup("analyze", RESUME, pair_key(RESUME, JOB_A)) == (None, None)
+    assert model.encoded == []
+
+
+def test_repeated_texts_are_embedded_once(model):
+    cache = SemanticCache(enabled=True)
+    cache.embed_many([RESUME, JOB_A])
+    cache.embed_many([RESUME, JOB_A, JOB_B])
+
+    assert model.encoded == [RESUME, JOB_A, JOB_B]
+    assert cache.stats()["embedding_cache"] == {"entries": 3, "hits": 2, "misses": 3}
+
+
+def test_unavailable_embeddings_always_miss(monkeypatch):
+    monkeypatch.setattr(semantic_cache, "EMBEDDINGS_AVAILABLE", False)
+    cache = SemanticCache(enabled=True)
+
+    assert cache.lookup("analyze", RESUME, pair_key(RESUME, JOB_A)) == (None, None)
+
+
+def test_ats_score_is_not_reused_for_another_job_or_resume(model, monkeypatch):
+    from utils import ai_providers
+
+    class FakeGroq(ai_providers.GroqProvider):
+        calls = 0
+
+        def _complete(self, **kwargs):
+            FakeGroq.calls += 1
+            return f"KEYWORD_MATCH: {60 + FakeGroq.calls}\nFORMAT_SCORE: 90\nSECTION_SCORE: 80\nOVERALL_SCORE: 75"
+
+    monkeypatch.setattr(ai_providers, "DISKCACHE_AVAILABLE", False)
+    provider = FakeGroq(api_key="test-key")
+    provider.client = object()
+    provider.semantic_cache.enabled = True
+
+    first = provider.calculate_ats_score(RESUME, JOB_A)
+    assert provider.calculate_ats_score(RESUME, JOB_A) == first
+    assert FakeGroq.calls == 1
+
+    provider.calculate_ats_score(RESUME, JOB_B)
+    assert FakeGroq.calls == 2
+
+    # A second resume with the same opening is scored on its own
+    provider.calculate_ats_score(RESUME + " Certifications: AWS Solutions Architect.", JOB_A)
+    assert FakeGroq.calls == 3
+
+
+def test_store_appends_to_the_cache_file(model, tmp_path):
+    path = str(tmp_path / "semantic_cache.jsonl")
+    cache = SemanticCache(cache_path=path, enabled=True)
+    for job in (JOB_A, JOB_B):
+        _, vector = cache.lookup("analyze", RESUME, pair_key(RESUME, job))
+        cache.store("analyze", vector, {"job": job}, pair_key(RESUME, job))
+    first_line = open(path, "rb").readline()
+
+    _, vector = cache.lookup("optimize", RESUME)
+    cache.store("optimize", vector, "Optimized resume")
+
+    lines = open(path, "rb").readlines()
+    assert len(lines) == 3 and lines[0] == first_line
+
+    reloaded = SemanticCache(cache_path=path, enabled=True)
+    assert reloaded.lookup("analyze", RESUME, pair_key(RESUME, JOB_B))[0] == {"job": JOB_B}
+    assert reloaded.lookup("optimize", RESUME)[0] == "Optimized resume"
+
+
+def test_cache_file_is_compacted_after_evictions(model, tmp_path):
+    path = str(tmp_path / "semantic_cache.jsonl")
+    cache = SemanticCache(cache_path=path, max_entries=2, enabled=True)
+    _, vector = cache.lookup("analyze", RESUME)
+    for i in range(10):
+        cache.store("analyze", vector, i, str(i))
+
+    assert len(open(path, "rb").readlines()) <= 2 * semantic_cache.LOG_COMPACTION_RATIO
+    reloaded = SemanticCache(cache_path=path, max_entries=2, enabled=True)
+    assert [reloaded.lookup("analyze", RESUME, str(i))[0] for i in (7, 8, 9)] == [None, 8, 9]
+
+
+def test_truncated_cache_line_is_dropped(model, tmp_path):
+    path = str(tmp_path / "semantic_cache.jsonl")
+    cache = SemanticCache(cache_path=path, enabled=True)
+    _, vector = cache.lookup("analyze", RESUME, pair_key(RESUME, JOB_A))
+    cache.store("analyze", vector, "kept", pair_key(RESUME, JOB_A))
+    with open(path, "ab") as f:
+        f.write(b'{"namespace": "analyze", "key": "cut sh')
+
+    reloaded = SemanticCache(cache_path=path, enabled=True)
+    assert reloaded.lookup("analyze", RESUME, pair_key(RESUME, JOB_A))[0] == "kept"
+    assert open(path, "rb").read().endswith(b"\n")
+    assert len(open(path, "rb").readlines()) == 1
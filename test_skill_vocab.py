@@ -0,0 +1,35 @@
+"""
+Tests for the skill matcher (utils/skill_vocab.py), in particular the word
+boundaries around skills that start or end with symbols.
+"""
+
+import pytest
+
+from utils.skill_vocab import find_skills
+
+
+@pytest.mark.parametrize("text, skills", [
+    ("Shipped C++ and C# services on .NET", {"c++", "c#", ".net"}),
+    ("c++, c#, .net", {"c++", "c#", ".net"}),
+    ("(C++/C#)", {"c++", "c#"}),
+    ("ASP.NET Core APIs", {"asp.net"}),
+    ("Objective-C and Swift", {"objective-c", "swift"}),
+    ("Java and JavaScript on Node.js", {"java", "javascript", "node.js"}),
+])
+def test_symbol_skills_are_found(text, skills):
+    assert find_skills(text) == skills
+
+
+@pytest.mark.parametrize("text", [
+    "Graded C+ in chemistry",
+    "Wrote C and some C++++ jokes",
+    "Visited the site example.network",
+    "Fluent in C#x",
+    "Skill: javas",
+])
+def test_partial_matches_are_not_skills(text):
+    assert not find_skills(text) & {"c++", "c#", ".net", "java"}
+
+
+def test_case_insensitive():
+    assert find_skills("PYTHON, python, Python") == {"python"}
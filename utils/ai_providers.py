@@ -4,742 +4,346 @@ Supports multiple AI models: Groq, OpenAI, Claude, Gemini, Cohere, etc.
 """
 
 import os
-from typing import Dict, Optional, List
+import re
+import json
+import mmap
+import string
+import time
+import asyncio
+import random
+import hashlib
+import logging
+import importlib
+import inspect
+import functools
+import threading
+import concurrent.futures
+from collections import OrderedDict, deque
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, List, Tuple, Mapping, Type, Iterator, Set, ClassVar
 from abc import ABC, abstractmethod
 
-
-class AIProvider(ABC):
-    """Base class for AI providers."""
-    
-    @abstractmethod
-    def is_available(self) -> bool:
-        """Check if provider is available."""
-        pass
-    
-    @abstractmethod
-    def analyze_resume(self, resume_text: str, job_description: str) -> Dict:
-        """Analyze resume against job description."""
-        pass
-    
-    @abstractmethod
-    def optimize_resume(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None) -> str:
-        """Create optimized resume."""
-        pass
-
-
-class GroqProvider(AIProvider):
-    """Groq AI Provider - Fast and cost-effective."""
-    
-    def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or os.getenv('GROQ_API_KEY')
-        self.client = None
-        self.model = "llama-3.3-70b-versatile"
-        
-        try:
-            from groq import Groq
-            if self.api_key:
-                self.client = Groq(api_key=self.api_key)
-        except ImportError:
-            pass
-    
-    def is_available(self) -> bool:
-        return self.client is not None
-    
-    def analyze_resume(self, resume_text: str, job_description: str) -> Dict:
-        if not self.is_available():
-            return {"error": "Groq API not available. Set GROQ_API_KEY."}
-        
-        prompt = f"""You are a resume analyst. Analyze this resume against the job description and provide a strict, accurate match score.
-
-JOB DESCRIPTION:
-{job_description}
-
-RESUME:
-{resume_text}
-
-SCORING CRITERIA - Evaluate the resume using these specific factors:
-
-1. REQUIRED SKILLS MATCH (50 points - 50% of total score):
-   - CRITICAL: This is the most important factor - it accounts for half of the total score
-   - Identify ALL required technical skills, tools, technologies, and competencies mentioned in the job description
-   - Count how many required skills are present in the resume
-   - Score: (skills_found / skills_required) × 50
-   - Example: If job requires 10 skills and resume has 6, score = (6/10) × 50 = 30 points
-   - Example: If job requires 8 skills and resume has 8, score = (8/8) × 50 = 50 points
-   - Be thorough in identifying skills - include programming languages, frameworks, tools, methodologies, soft skills, certifications, etc.
-
-2. EXPERIENCE LEVEL MATCH (20 points):
-   - Check if experience level matches (Junior, Mid-level, Senior, Lead, Principal, etc.)
-   - Perfect match: 20 points
-   - One level off (e.g., Mid applying to Senior): 12 points
-   - Two+ levels off (e.g., Junior applying to Senior): 5 points
-   - No clear level in resume: 8 points
-
-3. YEARS OF EXPERIENCE (12 points):
-   - Compare required years of experience vs. candidate's total experience
-   - Meets or exceeds requirement: 12 points
-   - Within 1-2 years: 8 points
-   - Within 3-4 years: 4 points
-   - More than 4 years short: 0 points
-   - No requirement specified: 6 points (neutral)
-
-4. JOB TITLE RELEVANCE (10 points):
-   - Check if candidate's current/past job titles are relevant to the target role
-   - Exact or very similar title: 10 points
-   - Related title in same field: 7 points
-   - Different field but transferable skills: 3 points
-   - Completely unrelated: 0 points
-
-5. EDUCATION REQUIREMENTS (5 points):
-   - Check if education level matches (Bachelor's, Master's, PhD, etc.)
-   - Meets requirement: 5 points
-   - One level below: 3 points
-   - Two+ levels below: 0 points
-   - No requirement specified: 2.5 points (neutral)
-
-6. INDUSTRY/DOMAIN EXPERIENCE (3 points):
-   - Check if candidate has experience in the same or related industry
-   - Same industry: 3 points
-   - Related industry: 2 points
-   - Different industry: 0 points
-   - No industry specified in job: 1.5 points (neutral)
-
-TOTAL SCORE CALCULATION:
-- Add up all 6 factors (max 100 points)
-- Required Skills Match = 50 points (50% of total)
-- Other factors = 50 points combined (50% of total)
-- Round to nearest whole number
-- This is your MATCH_SCORE
-
-SCORING GUIDELINES:
-- 0-40%: Missing most required skills, significant experience level mismatch, or major gaps
-- 40-70%: Has some required skills and relevant experience, but missing key requirements
-- 70-100%: Meets most/all requirements, strong skill match, appropriate experience level
-
-Be STRICT - only give 70+ if the candidate truly meets most requirements.
-
-Provide your analysis in this EXACT format:
-
-MATCH_SCORE: [number between 0-100 - be strict!]
-STRENGTHS:
-- [strength 1]
-- [strength 2]
-- ...
-
-IMPROVEMENTS_NEEDED:
-- [specific content change 1]
-- [specific content change 2]
-- ...
-
-CONTENT_SUGGESTIONS:
-1. [Section/Area]: [What to change] - [Why] - [How to improve it]
-2. [Section/Area]: [What to change] - [Why] - [How to improve it]
-...
-
-Start your response with "MATCH_SCORE:" immediately."""
-
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a strict resume analyst. Evaluate resumes using a structured scoring framework: 1. Required Skills Match (50 points - 50% of total) - CRITICAL, count ALL skills found vs required (technical skills, tools, technologies, competencies). 2. Experience Level Match (20 points) - check if levels align. 3. Years of Experience (12 points) - compare required vs actual. 4. Job Title Relevance (10 points) - assess title similarity. 5. Education Requirements (5 points) - check education level match. 6. Industry/Domain Experience (3 points) - evaluate industry alignment. Calculate total (max 100) and round to nearest whole number. Skills match is 50% of score - be thorough in identifying and matching skills. Be STRICT: 0-40% = missing most requirements, 40-70% = some requirements met, 70-100% = most/all requirements met. Always provide score in format: MATCH_SCORE: [number]."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,  # Lower temperature for more strict scoring
-                max_tokens=3000
-            )
-            return {"raw_analysis": response.choices[0].message.content, "provider": "Groq"}
-        except Exception as e:
-            return {"error": f"Groq API error: {str(e)}"}
-    
-    def optimize_resume(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None) -> str:
-        if not self.is_available():
-            return "Groq API not available."
-        
-        # Prepare social links information for the prompt
-        social_links_info = ""
-        if social_links:
-            if social_links.get('linkedin'):
-                social_links_info += f"\nLinkedIn URL from original resume: {social_links['linkedin']}"
-            if social_links.get('github'):
-                social_links_info += f"\nGitHub URL from original resume: {social_links['github']}"
-        
-        prompt = f"""You are an expert resume writer. Create an optimized version of this resume that is specifically tailored to match the job description.
-
-ORIGINAL RESUME:
-{resume_text}
-
-JOB DESCRIPTION:
-{job_description}
-
-SUGGESTIONS TO IMPLEMENT:
-{chr(10).join(suggestions[:10])}
-{social_links_info}
-
-CRITICAL: If the original resume contains LinkedIn or GitHub links, you MUST preserve them in the header contact line with their full URLs.
-
-🚨 CRITICAL MANDATORY REQUIREMENT FOR EXPERIENCE SECTION 🚨
-YOU MUST COMPLETELY REWRITE EVERY EXPERIENCE BULLET POINT. DO NOT just add keywords or make minor edits.
-EACH BULLET MUST BE TRANSFORMED with actual content improvements, metrics, and job-relevant achievements.
-
-EXPERIENCE SECTION RULES (MANDATORY - APPLY TO EVERY BULLET):
-1. MANDATORY REWRITE: You MUST rewrite each bullet point from scratch. DO NOT copy-paste or make minor edits.
-   - If original says "Worked on projects" → Rewrite to "Designed and deployed 3 microservices using Python and Docker, reducing API response time by 45% and handling 50K+ requests daily"
-   - If original says "Managed team" → Rewrite to "Led cross-functional team of 5 engineers, implementing Agile practices that increased sprint velocity by 30% and reduced bug reports by 25%"
-   - Transform vague statements into specific, measurable achievements
-
-2. STRUCTURE (MANDATORY): Every bullet MUST use Problem → Action → Result OR Task → Tools → Impact format
-   - Example: "Addressed [specific problem] by implementing [specific solution] using [technologies], resulting in [quantifiable improvement]"
-   - Example: "Developed [specific feature/system] using [tools/tech], improving [metric] by [percentage/amount] and [business impact]"
-
-3. ACTION VERBS (MANDATORY): Use strong, varied verbs - DO NOT repeat verbs across bullets
-   - Use: Designed, Built, Implemented, Led, Automated, Analyzed, Developed, Optimized, Increased, Reduced, Managed, Created, Deployed, Architected, Streamlined, Accelerated, Transformed, etc.
-   - Vary verbs: If first bullet uses "Developed", second should use "Architected" or "Built", not "Developed" again
-
-4. QUANTITATIVE METRICS (BALANCED APPROACH):
-   - AIM for metrics in ~50-60% of bullet points, NOT every single one.
-   - QUALITY OVER QUANTITY: Only use metrics where they feel natural and credible.
-   - Avoid "data stuffing" (e.g., don't force a % into a task where it doesn't belong).
-   - Good metrics: "Reduced latency by 40%", "Managed $50k budget", "Led team of 5"
-   - Bad metrics: "Wrote 100% of code", "Attended 5 meetings", "Used 3 keyboards"
-   - If a metric feels forced, focus on the QUALITATIVE impact instead (e.g., "Enabled new capabilities," "Solved critical bug").
-
-5. JOB RELEVANCE (MANDATORY): Every bullet MUST connect to job description requirements:
-   - Identify key technologies/tools from job description
-   - Identify key responsibilities/outcomes from job description
-   - Rewrite bullets to demonstrate experience with those technologies/responsibilities
-   - Example: If job requires "cloud deployment" and original says "deployed applications", rewrite to "Deployed scalable applications on AWS using EC2, S3, and Lambda, achieving 99.9% uptime and reducing infrastructure costs by 35%"
-
-6. SPECIFIC STRUCTURES (Use when relevant):
-   - "Addressed [specific problem] by using [technology/tool] to [specific action], improving [metric] by [%/amount] and [business impact]"
-   - "Collaborated with [specific teams/stakeholders] to [specific action], resulting in [quantifiable outcome] and [business value]"
-   - "Designed and implemented [specific solution] using [technologies], reducing [metric] by [amount] and enabling [business outcome]"
-
-7. TONE: Natural, business-professional, real resume writing style - NO generic/AI-style language
-
-8. AVOID filler phrases: NO 'leveraged cutting-edge', 'utilized synergistic', 'dynamic environment', 'synergistic solutions', 'passionate about', or vague wording
-
-9. CONTENT: Specific, measurable, aligned with industry expectations and job requirements
-
-10. VARIETY: Do NOT repeat sentence structures - vary your approach across bullets
-
-11. QUANTITY: Provide 4-6 bullet points per position (expand if original has fewer, consolidate if original has too many)
-
-12. BALANCE (CRITICAL): Maintain a natural balance between quantifiable and technical points:
-    - ~50% QUANTIFIABLE: Focus on metrics, numbers, percentages, measurable results (where natural)
-    - ~50% TECHNICAL/QUALITATIVE: Focus on technical skills, architectures, complex problem solving (without forced numbers)
-    - Example of quantifiable: "Designed and deployed 3 microservices using Python and Docker, reducing API response time by 45%"
-    - Example of technical/qualitative: "Architected microservices infrastructure using Docker and Kubernetes, implementing service mesh patterns for improved scalability"
-    - DO NOT include soft skills (leadership, collaboration) unless tied to a specific technical outcome.
-
-13. KEYWORDS: Include relevant keywords from job description NATURALLY within the rewritten content - NO keyword stuffing
-
-14. LEARNING: Extract and incorporate skills/technologies from BOTH job description AND candidate's resume
-
-15. TECHNICAL NON-QUANTIFIABLE BULLETS: For the 50% technical bullets (without metrics), focus on:
-    - Technical implementations and architectures (microservices, APIs, data pipelines, etc.)
-    - Technologies and tools from job description (Docker, Kubernetes, AWS services, frameworks, etc.)
-    - Technical patterns and best practices (RESTful design, event-driven architecture, etc.)
-    - System design and technical solutions
-    - Integration with specific technologies or platforms
-    - DO NOT include soft skills, leadership, collaboration, or strategic thinking
-    - These bullets should demonstrate technical depth and job-relevant technical expertise
-
-EXPERIENCE REWRITING EXAMPLES (MANDATORY TRANSFORMATION):
-
-BEFORE: "Worked on software development projects"
-AFTER: "Designed and built 3 enterprise applications using Python, React, and PostgreSQL, reducing API processing time by 40%, serving 10,000+ daily active users, and improving system reliability to 99.9% uptime"
-
-BEFORE: "Managed database operations"
-AFTER: "Addressed performance bottlenecks by implementing database indexing strategies and query optimization techniques, improving average query response time by 60% (from 2.5s to 1s), reducing server infrastructure costs by $50K annually, and enabling real-time analytics for 5K+ concurrent users"
-
-BEFORE: "Responsible for team coordination"
-AFTER: "Led cross-functional team of 8 engineers and 3 product managers, implementing Agile/Scrum methodologies that increased sprint velocity by 35%, reduced production bugs by 28%, and accelerated feature delivery from 4 weeks to 2.5 weeks average"
-
-BEFORE: "Used machine learning for data analysis"
-AFTER: "Developed and deployed machine learning models using Python, scikit-learn, and TensorFlow, improving prediction accuracy from 72% to 89%, processing 2M+ data points daily, and enabling automated decision-making that saved 20 hours/week of manual analysis"
-
-BEFORE: "Worked on backend systems"
-AFTER (TECHNICAL NON-QUANTIFIABLE - 50%): "Architected microservices infrastructure using Docker, Kubernetes, and AWS ECS, implementing service mesh patterns with Istio and container orchestration best practices for scalable distributed systems"
-
-BEFORE: "Developed APIs"
-AFTER (TECHNICAL NON-QUANTIFIABLE - 50%): "Designed and implemented RESTful APIs following OpenAPI 3.0 specifications, integrating OAuth 2.0 authentication, JWT token management, and rate limiting middleware for secure and scalable API architecture"
-
-⚠️ CRITICAL: Notice how each "AFTER" example:
-- Completely rewrites the content (not just adds keywords)
-- Includes specific technologies from job description (for quantifiable bullets)
-- Adds multiple quantitative metrics (for 70% of bullets)
-- Shows clear business impact (for 50% quantifiable bullets) or demonstrates technical depth and job-relevant technologies (for 50% technical bullets)
-- Uses varied, strong action verbs
-- Follows Problem → Action → Result structure
-- Maintains 50/50 balance: Half the bullets are quantifiable with metrics, half focus on technical implementations and technologies without metrics
-
-CRITICAL FORMATTING REQUIREMENTS - Follow this EXACT structure:
-
-1. HEADER (First Line):
-   [Full Name]
-   [Job Title/Position]
-   Location: [City, State] | Email: [email] | Phone: [phone] | LinkedIn: [linkedin_url] | GitHub: [github_url]
-   
-   IMPORTANT: If the original resume contains LinkedIn or GitHub links, you MUST include them in the contact line with their full URLs.
-   - Extract the actual URLs from the original resume (they are provided above if found)
-   - Format: "LinkedIn: https://linkedin.com/in/username" or "GitHub: https://github.com/username"
-   - Only include links that exist in the original resume
-   - If no LinkedIn/GitHub in original, omit them
-
-2. SUMMARY Section:
-   SUMMARY
-   [2-3 sentences summarizing experience and key qualifications relevant to the job]
-
-3. SKILLS Section:
-   SKILLS
-   [Category 1]: [skill1], [skill2], [skill3]
-   [Category 2]: [skill1], [skill2], [skill3]
-   [Category 3]: [skill1], [skill2], [skill3]
-
-   Common categories: Methodologies, Languages, IDEs, Packages/Libraries, Visualization Tools, Database, Other Skills, Operating System
-
-   CRITICAL SKILLS SECTION OPTIMIZATION (MANDATORY):
-   - ADD missing job-relevant skills from the job description to the SKILLS section (e.g., programming languages, tools, technologies, frameworks, methodologies)
-   - REORGANIZE skills to put most relevant skills for the job first within each category
-   - GROUP related skills together using appropriate categories (e.g., "Programming Languages:", "Tools & Technologies:", "Frameworks & Libraries:", "Methodologies:")
-   - REMOVE outdated or irrelevant skills that don't match the job requirements
-   - Include ALL key technical requirements mentioned in the job description
-   - Make the SKILLS section comprehensive and keyword-rich for ATS optimization while keeping it natural and credible
-   - DO NOT include skills that the candidate clearly doesn't have based on their experience
-
-4. EXPERIENCE Section:
-   EXPERIENCE
-   [Company Name], [Location] | [Start Date] - [End Date or Current] | [Job Title]
-   • [Bullet point describing achievement with metrics if possible]
-   • [Bullet point describing achievement with metrics if possible]
-   • [Bullet point describing achievement with metrics if possible]
-   
-   [Next Company], [Location] | [Start Date] - [End Date] | [Job Title]
-   • [Bullet point]
-   • [Bullet point]
-
-
-5. EDUCATION Section (ONLY if original resume has education):
-   EDUCATION
-   [Degree Name]: [University Name], [Location]
-   [Degree Name]: [University Name], [Location]
-   
-   ⚠️ CRITICAL: ONLY include education entries that exist in the original resume. 
-   - DO NOT add any education (Bachelor's, Master's, PhD, etc.) if it is NOT mentioned in the original resume
-   - Copy and paste education information exactly as it appears in the original resume
-   - If the original resume has no education section, DO NOT create one
-   - If the original resume only has a Master's degree, DO NOT add a Bachelor's degree
-   - Only include what is explicitly stated in the original resume
-
-6. PROJECTS Section (ONLY if original resume has projects):
-   PROJECTS
-   [Project Name] | [Technologies Used] | [Date or Duration]
-   • [Description of project and achievements]
-   • [Key features or results]
-   
-   [Next Project Name] | [Technologies Used] | [Date or Duration]
-   • [Description]
-   • [Key features or results]
-   
-   ⚠️ CRITICAL: Check for project sections using these common names (case-insensitive):
-   - "PROJECTS", "ACADEMIC PROJECTS", "SCHOOL PROJECTS", "PERSONAL PROJECTS"
-   - "SIDE PROJECTS", "PORTFOLIO PROJECTS", "CAPSTONE PROJECTS", "RESEARCH PROJECTS"
-   - "INDIVIDUAL PROJECTS", "TEAM PROJECTS", "GROUP PROJECTS", "COURSE PROJECTS"
-   - "UNIVERSITY PROJECTS", "COLLEGE PROJECTS", or any section containing the word "PROJECT"
-   - If ANY of these exist in the original resume, include the PROJECTS section
-   - If NONE of these exist, do NOT add a PROJECTS section
-
-IMPORTANT INSTRUCTIONS:
-- Maintain ALL original information - only enhance and optimize, don't remove truthful content
-- Use the EXACT section headers: SUMMARY, SKILLS, EXPERIENCE, EDUCATION (all caps)
-- Include EDUCATION section ONLY if the original resume has an education section - do NOT add education if it doesn't exist in the original
-- Include PROJECTS section ONLY if the original resume has a projects section (check for: "PROJECTS", "ACADEMIC PROJECTS", "SCHOOL PROJECTS", "PERSONAL PROJECTS", "SIDE PROJECTS", "PORTFOLIO PROJECTS", "CAPSTONE PROJECTS", "RESEARCH PROJECTS", "INDIVIDUAL PROJECTS", "TEAM PROJECTS", "GROUP PROJECTS", "COURSE PROJECTS", "UNIVERSITY PROJECTS", "COLLEGE PROJECTS", or any section containing "PROJECT") - do NOT add projects if they don't exist in the original
-- CRITICAL: For EDUCATION section, ONLY copy education entries that are explicitly mentioned in the original resume. DO NOT add Bachelor's, Master's, or any other degree if it is not in the original resume
-- For experience entries, use format: "Company, Location | Date Range | Position"
-- For projects, use format: "Project Name | Technologies | Date/Duration"
-- Use bullet points (•) for experience and project descriptions
-
-⚠️ REMINDER: For EXPERIENCE section bullets, apply the rules specified at the top of this prompt (Problem → Action → Result format, varied action verbs, specific structures, natural tone, no filler phrases, 4-6 bullets, metrics, etc.)
-
-- Reorder experience to highlight most relevant positions first
-- Keep formatting clean and professional
-
-OUTPUT FORMAT - RETURN ONLY VALID JSON (NO OTHER TEXT):
-Return the optimized resume as a JSON object with this EXACT structure:
-
-{{
-  "name": "Full Name",
-  "title": "Job Title/Position",
-  "contact": ["Location: City, State", "Email: email@example.com", "Phone: (123) 456-7890", "LinkedIn: https://linkedin.com/in/username", "GitHub: https://github.com/username"],
-  "summary": "Complete summary paragraph as single string",
-  "skills": {{
-    "Category 1": ["skill1", "skill2", "skill3"],
-    "Category 2": ["skill1", "skill2", "skill3"]
-  }},
-  "experience": [
-    {{
-      "company": "Company Name",
-      "location": "City, State",
-      "dates": "Start Date - End Date",
-      "title": "Job Title",
-      "bullets": [
-        "First bullet point with achievements and metrics",
-        "Second bullet point with achievements and metrics"
-      ]
-    }}
-  ],
-  "education": [
-    {{
-      "degree": "Degree Name",
-      "institution": "University Name",
-      "location": "City, State"
-    }}
-  ],
-  "certifications": [
-    "Certification exactly as written in original resume (e.g., AWS Certified Solutions Architect, 2023)",
-    "Another certification"
-  ],
-  "projects": [
-    {{
-      "name": "Project Name",
-      "technologies": "Tech stack used",
-      "date": "Date or Duration",
-      "bullets": [
-        "Project description and achievements",
-        "Key features or results"
-      ]
-    }}
-  ],
-  "awards": [
-    "Award exactly as written in original resume",
-    "Another award or honor"
-  ],
-  "publications": [
-    "Publication exactly as written in original resume",
-    "Another publication"
-  ],
-  "volunteer": [
-    "Volunteer work exactly as written in original resume",
-    "Another volunteer experience"
-  ]
-}}
-
-CRITICAL JSON RULES:
-- Return ONLY valid JSON - no markdown, no explanations, no code blocks
-- Include sections ONLY if they exist in original resume:
-  * "education" - Check for: EDUCATION, ACADEMIC BACKGROUND, QUALIFICATIONS, ACADEMIC QUALIFICATIONS
-  * "certifications" - Check for: CERTIFICATIONS, CERTIFICATES, PROFESSIONAL CERTIFICATIONS, LICENSES, LICENSE & CERTIFICATIONS
-  * "projects" - Check for: PROJECTS, ACADEMIC PROJECTS, PERSONAL PROJECTS, SIDE PROJECTS, PORTFOLIO
-  * "awards" - Check for: AWARDS, HONORS, ACHIEVEMENTS, HONORS & AWARDS, RECOGNITION
-  * "publications" - Check for: PUBLICATIONS, RESEARCH, PAPERS, PUBLISHED WORK
-  * "volunteer" - Check for: VOLUNTEER, VOLUNTEER WORK, VOLUNTEER EXPERIENCE, COMMUNITY SERVICE
-- If a section doesn't exist in original resume, DO NOT include it in JSON
-- Preserve original formatting for certifications, awards, publications, volunteer (copy exactly as written)
-- All strings must be properly escaped
-- Contact array MUST include ALL contact info from original: Location, Email, Phone, LinkedIn, GitHub (include all that are present)
-- Experience bullets must follow all the rules specified above (metrics, rewriting, etc.)
-- Section order in output: summary → skills → experience → education → certifications → projects → awards → publications → volunteer"""
-
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert resume writer specializing in tailoring resumes to specific job descriptions. 🚨 CRITICAL MANDATORY REQUIREMENT: You MUST completely rewrite every experience bullet point from scratch. DO NOT just add keywords or make minor edits. Each bullet must be transformed with: (1) Specific quantitative metrics (numbers, percentages, time, money, scale) for 50% of bullets, (2) Job-relevant technologies/tools from the job description, (3) Problem → Action → Result structure, (4) Strong, varied action verbs (never repeat verbs), (5) Clear business impact. CRITICAL BALANCE: Maintain 50% quantifiable bullets (heavy on metrics) and 50% technical bullets (technical implementations, architectures, technologies matching job description, but WITHOUT metrics). DO NOT include soft skills like leadership, collaboration, or strategic thinking. For 4 bullets: 2 quantifiable, 2 technical. For 5 bullets: 2-3 quantifiable, 2-3 technical. For 6 bullets: 3 quantifiable, 3 technical. If original bullet says 'Worked on projects', rewrite to 'Designed and deployed 3 microservices using Python and Docker, reducing API response time by 45% and handling 50K+ requests daily'. Transform vague statements into specific, measurable achievements that directly connect to job requirements. Use natural, business-professional tone - NO generic/AI-style language. Provide 4-6 bullets per position. Maintain truthfulness while making content significantly more compelling and job-relevant."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=4000
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"Error: {str(e)}"
-
-    # ========== ENHANCED MULTI-STAGE OPTIMIZATION METHODS ==========
-
-    def analyze_job_description(self, job_description: str) -> Dict:
-        """
-        Analyze job description to extract key requirements before optimization.
-
-        Returns:
-            Dictionary with extracted requirements, skills, experience level, industry
-        """
-        if not self.is_available():
-            return {"error": "Groq API not available."}
-
-        try:
-            prompt = f"""Analyze this job description and extract key information:
-
-JOB DESCRIPTION:
-{job_description}
-
-Please provide a structured analysis in this exact format:
-
-REQUIRED_SKILLS:
-- [skill 1]
-- [skill 2]
-...
-
-YEARS_OF_EXPERIENCE:
-[number] years (specify if entry-level, mid-level, senior, or executive)
-
-INDUSTRY:
-[industry name - e.g., Technology, Finance, Healthcare, etc.]
-
-SENIORITY_LEVEL:
-[entry-level, mid-level, senior, or executive]
-
-CRITICAL_KEYWORDS:
-- [keyword 1]
-- [keyword 2]
-...
-
-ATS_KEYWORDS:
-- [keyword 1]
-- [keyword 2]
-...
-
-Keep responses concise and focused on what's most important for resume optimization."""
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert job description analyst. Extract structured information that will help optimize resumes for this role."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=1500
-            )
-
-            result = response.choices[0].message.content
-            return self._parse_job_analysis(result)
-
-        except Exception as e:
-            return {"error": f"Error analyzing job description: {str(e)}"}
-
-    def _parse_job_analysis(self, analysis_text: str) -> Dict:
-        """Parse job analysis text into structured format."""
-        result = {
-            'required_skills': [],
-            'years_of_experience': '',
-            'industry': '',
-            'seniority_level': '',
-            'critical_keywords': [],
-            'ats_keywords': []
-        }
-
-        current_section = None
-        for line in analysis_text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-
-            if 'REQUIRED_SKILLS:' in line:
-                current_section = 'required_skills'
-            elif 'YEARS_OF_EXPERIENCE:' in line:
-                current_section = 'years_of_experience'
-            elif 'INDUSTRY:' in line:
-                current_section = 'industry'
-            elif 'SENIORITY_LEVEL:' in line:
-                current_section = 'seniority_level'
-            elif 'CRITICAL_KEYWORDS:' in line:
-                current_section = 'critical_keywords'
-            elif 'ATS_KEYWORDS:' in line:
-                current_section = 'ats_keywords'
-            elif line.startswith('-') and current_section in ['required_skills', 'critical_keywords', 'ats_keywords']:
-                result[current_section].append(line.lstrip('- ').strip())
-            elif current_section in ['years_of_experience', 'industry', 'seniority_level'] and not line.endswith(':'):
-                result[current_section] = line
-
-        return result
-
-    def multi_stage_optimize(self, resume_text: str, job_description: str, job_analysis: Dict) -> Dict:
-        """
-        Perform multi-stage optimization:
-        Stage 1: Content improvement
-        Stage 2: ATS keyword optimization
-        Stage 3: Format and consistency check
-
-        Returns:
-            Dictionary with final optimized resume and stage details
-        """
-        if not self.is_available():
-            return {"error": "Groq API not available."}
-
-        try:
-            # Stage 1: Content Improvement
-            stage1_prompt = f"""STAGE 1: CONTENT IMPROVEMENT
-
-JOB DESCRIPTION:
-{job_description[:2000]}
-
-RESUME:
-{resume_text[:4000]}
-
-JOB ANALYSIS:
-- Seniority: {job_analysis.get('seniority_level', 'Not specified')}
-- Industry: {job_analysis.get('industry', 'Not specified')}
-- Required Skills: {', '.join(job_analysis.get('required_skills', [])[:10])}
-
-Improve the resume content by:
-1. Emphasizing relevant experience for {job_analysis.get('seniority_level', 'this')} level
-2. Creating authentic, human-sounding bullet points (NOT generic AI language)
-3. Highlighting skills that match the job requirements
-4. Reordering experience to put most relevant first
-5. Optimizing the summary/objective for this specific role
-
-CRITICAL BULLET POINT WRITING RULES (EXPERIENCE SECTION):
-
-1. **50/50 QUANTITATIVE/QUALITATIVE BALANCE**:
-   - 50% of bullets MUST include specific metrics (numbers, percentages, timeframes)
-   - 50% of bullets should be qualitative (impact, outcomes, responsibilities) without forcing numbers
-
-2. **HUMAN TOUCH - AVOID AI LANGUAGE**:
-   ❌ NEVER use these generic AI phrases:
-   - "Spearheaded" or "spearheading"
-   - "Leveraged" or "leveraging"
-   - "Utilized" or "utilizing"
-   - "Implemented robust solutions"
-   - "Streamlined processes"
-   - "Drove results"
-   - "Instrumental in"
-
-   ✅ USE natural, authentic action verbs instead:
-   - Built, Created, Designed, Developed, Engineered
-   - Led, Managed, Coordinated, Guided
-   - Improved, Optimized, Enhanced, Reduced
-   - Launched, Shipped, Delivered, Released
-   - Collaborated, Partnered, Worked with
-   - Solved, Fixed, Resolved, Debugged
-   - Automated, Integrated, Migrated
-
-3. **VARY SENTENCE STRUCTURE**:
-   - Don't start every bullet with the same verb
-   - Mix short punchy bullets with more detailed ones
-   - Use different constructions (not just "Verb + object + metric")
-
-4. **BE SPECIFIC AND AUTHENTIC**:
-   - Use real technical details from the original resume
-   - Don't exaggerate or add accomplishments that aren't there
-   - Make metrics realistic (not always "increased by 50%" or "reduced by 40%")
-   - Include context that makes accomplishments believable
-
-5. **ATS-OPTIMIZED BULLETS** (CRITICAL - Must pass ATS keyword matching first):
-   - Bullets can be 2-3 lines if needed to include relevant keywords and technical details
-   - PRIORITIZE keyword density and job description matching over strict brevity
-   - Include specific technologies, tools, frameworks, and methodologies from job description
-   - Lead with impact, but include comprehensive technical details for ATS scoring
-   - Remove only truly unnecessary filler, but keep ALL technical terminology and relevant details
-
-6. **LEAD WITH IMPACT** (Put the important stuff FIRST, then add technical details):
-   ✅ GOOD: "Reduced deployment time 40% by implementing Docker and Kubernetes microservices architecture with automated CI/CD pipeline using Jenkins, GitHub Actions, and AWS CodeDeploy"
-   ❌ BAD: "Implemented a comprehensive Docker and Kubernetes based microservices architecture that resulted in deployment time reduction of 40%"
-
-   ✅ GOOD: "Increased system reliability to 99.9% uptime through Datadog monitoring, PagerDuty alerting, automated incident response workflows, and Prometheus metrics collection"
-   ❌ BAD: "Developed comprehensive monitoring and alerting system infrastructure which increased reliability to 99.9% uptime"
-
-7. **MAXIMIZE JOB DESCRIPTION KEYWORD MATCHING**:
-   - Extract ALL relevant keywords from job description (technologies, skills, methodologies, tools, frameworks)
-   - Incorporate keywords naturally into bullets even if it makes them 2-3 lines long
-   - Focus on matching exact technical requirements and qualifications from job posting
-   - Add relevant technical details and tools to maximize ATS score
-   - Most recent role: 6-7 bullets maximum
-   - Previous roles: 4-5 bullets maximum
-   - Older roles: 3-4 bullets maximum
-
-QUANTITATIVE Examples (ATS-optimized with comprehensive technical details):
-- Reduced API response time 75% (800ms to 200ms) by implementing Redis distributed caching layer with cache invalidation strategies, improving system performance and user experience for 500K+ daily active users
-- Cut deployment time 3 hours per release through automated CI/CD pipeline using Jenkins, Docker containerization, Kubernetes orchestration, GitHub Actions workflows, and infrastructure-as-code with Terraform
-- Managed cross-functional team of 6 engineers across 3 time zones to deliver enterprise software projects on schedule using Agile/Scrum methodologies, Jira project tracking, and Confluence documentation
-
-QUALITATIVE Examples (ATS-optimized with comprehensive technical details):
-- Architected scalable microservices platform handling 10M daily users using Node.js, Express, MongoDB, RabbitMQ message queuing, and AWS cloud infrastructure (EC2, S3, RDS, Lambda)
-- Led cross-functional collaboration with product managers, designers, and stakeholders to define technical requirements, system architecture, and implementation roadmap for enterprise applications
-- Mentored 5 junior developers on software engineering best practices including code review processes, unit testing with Jest, integration testing, design patterns, SOLID principles, and system design
-
-CRITICAL EXPERIENCE SECTION FORMATTING:
-For EVERY job entry in the EXPERIENCE section, you MUST use this EXACT format:
-- Line 1: COMPANY NAME IN ALL CAPS, Location | JOB TITLE IN ALL CAPS | Month YYYY - Month YYYY (or Present)
-- Line 2+: Bullet points with achievements (following all rules above)
-
-Example (note: ATS-optimized, impact-first with comprehensive technical details):
-MICROSOFT, Redmond, WA | SOFTWARE ENGINEER | June 2020 - Present
-- Achieved 99.9% uptime for cloud infrastructure serving 10M+ daily users using AWS EC2, S3, RDS, Lambda, CloudWatch monitoring, auto-scaling groups, and load balancing with Application Load Balancer (ALB)
-- Improved system scalability 3x with event-driven microservices architecture using Node.js, Express, MongoDB, Redis caching, RabbitMQ message queuing, and Docker containerization with Kubernetes orchestration
-- Reduced deployment time 60% by migrating monolith to microservices architecture and implementing automated CI/CD pipeline using Jenkins, GitHub Actions, infrastructure-as-code with Terraform, and automated testing
-- Implemented OAuth2 authentication and JWT token-based authorization across 15+ microservices for enhanced security, user management, and role-based access control (RBAC)
-
-CRITICAL PROJECT SECTION FORMATTING:
-For EVERY project entry in the PROJECTS/PROJECTS section, you MUST use this EXACT format:
-- Line 1: PROJECT NAME IN ALL CAPS
-- Line 2+: Bullet points with project details
-
-Example:
-E-COMMERCE PLATFORM
-- Built full-stack web application using React and Node.js
-- Implemented payment gateway integration with Stripe
-
-CRITICAL HEADER FORMATTING:
-The header MUST follow this EXACT format:
-Line 1: [Full Name]
-Line 2: [Professional Title from original resume - e.g., Software Engineer, Data Scientist, etc.]
-Line 3: [Contact info on one line separated by " | "]
-
-Example:
-John Doe
-Software Engineer
-(555) 123-4567 | john@email.com | linkedin.com/in/johndoe | github.com/johndoe | portfolio.com
-
-IMPORTANT FORMATTING RULES:
-- Keep the EDUCATION section EXACTLY as it appears in the original resume. Copy it word-for-word without any changes.
-- PRESERVE the professional title/job title from the header (the line immediately after the name) on its own line. This title should be prominent and clearly visible.
-- PRESERVE ALL contact information in the header including Phone Number, Email, LinkedIn, GitHub, Portfolio, and any other links or URLs. Format them on one line separated by " | "
-- In EXPERIENCE section: Company names MUST be in ALL CAPS. Job titles MUST be in ALL CAPS. This is NON-NEGOTIABLE.
-- In PROJECTS section: Project names MUST be in ALL CAPS. This is NON-NEGOTIABLE.
-
-Provide the complete improved resume."""
-
-            stage1_response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert resume writer focusing on content quality and relevance."},
-                    {"role": "user", "content": stage1_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=4000
-            )
-
-            stage1_resume = stage1_response.choices[0].message.content.strip()
-
-            # Stage 2: ATS Keyword Optimization
-            critical_keywords = job_analysis.get('critical_keywords', [])
-            ats_keywords = job_analysis.get('ats_keywords', [])
-
-            stage2_prompt = f"""STAGE 2: ATS KEYWORD OPTIMIZATION
-
-RESUME FROM STAGE 1:
-{stage1_resume[:4000]}
-
-CRITICAL KEYWORDS TO INCORPORATE:
-{', '.join(critical_keywords[:15])}
-
-ATS KEYWORDS:
-{', '.join(ats_keywords[:15])}
+from utils.semantic_cache import SemanticCache, DEFAULT_SIMILARITY_THRESHOLD, pair_key, embed_texts, text_similarity
+from utils.skill_vocab import find_skills
+from utils.fast_score import keyword_score
+from utils.http_pool import shared_http_client, async_http_client
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    _json_loads = orjson.loads
+except ImportError:
+    ORJSON_AVAILABLE = False
+    _json_loads = json.loads
+
+try:
+    import fastjsonschema
+    FASTJSONSCHEMA_AVAILABLE = True
+except ImportError:
+    FASTJSONSCHEMA_AVAILABLE = False
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+try:
+    from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter, before_sleep_log
+    TENACITY_AVAILABLE = True
+except ImportError:
+    TENACITY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+# Shape of the optimized-resume JSON the prompts ask the model to return.
+_RESUME_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "title": {"type": "string"},
+        "contact": _STRING_LIST,
+        "summary": {"type": "string"},
+        "skills": {"type": "object", "additionalProperties": _STRING_LIST},
+        "experience": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "company": {"type": "string"},
+                    "location": {"type": "string"},
+                    "dates": {"type": "string"},
+                    "title": {"type": "string"},
+                    "bullets": _STRING_LIST,
+                },
+            },
+        },
+        "education": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "degree": {"type": "string"},
+                    "institution": {"type": "string"},
+                    "location": {"type": "string"},
+                },
+            },
+        },
+        "certifications": _STRING_LIST,
+        "projects": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "technologies": {"type": "string"},
+                    "date": {"type": "string"},
+                    "bullets": _STRING_LIST,
+                },
+            },
+        },
+        "awards": _STRING_LIST,
+        "publications": _STRING_LIST,
+        "volunteer": _STRING_LIST,
+    },
+    "required": ["name"],
+}
+
+# Compiled once at import; fastjsonschema generates a plain Python function
+# so per-response validation skips the generic schema walker entirely.
+_VALIDATE_RESUME = fastjsonschema.compile(_RESUME_SCHEMA) if FASTJSONSCHEMA_AVAILABLE else None
+
+
+def _parse_and_validate(text: str) -> Dict:
+    """Parse optimized-resume JSON and validate it against the resume schema.
+
+    Raises ValueError (JSON decode or schema errors both subclass it).
+    """
+    data = _json_loads(text)
+    if _VALIDATE_RESUME is not None:
+        return _VALIDATE_RESUME(data)
+    if not isinstance(data, dict):
+        raise ValueError("Resume JSON must be an object")
+    return data
+
+
+# Prompt templates live in utils/prompts as string.Template files
+_PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prompts')
+
+
+@functools.lru_cache(maxsize=None)
+def _load_prompt_template(name: str) -> string.Template:
+    """Load utils/prompts/<name>.tmpl on first use and keep the compiled template.
+
+    The file is read through a read-only memory map so worker processes share
+    the OS page cache rather than each holding the prompt from module import.
+    """
+    path = os.path.join(_PROMPTS_DIR, name + '.tmpl')
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return string.Template(mapped[:].decode('utf-8'))
+
+
+# Section headings and list items in the analyze_job_description response;
+# headings must start a line (optionally markdown-decorated), so a keyword
+# such as "INDUSTRY:" inside a bullet does not open a new section.
+_JOB_ANALYSIS_SECTION_RE = re.compile(
+    r'^[ \t#*]*(REQUIRED_SKILLS|YEARS_OF_EXPERIENCE|INDUSTRY|SENIORITY_LEVEL|CRITICAL_KEYWORDS|ATS_KEYWORDS)'
+    r':[ \t*]*(.*)$',
+    re.MULTILINE,
+)
+# "- item" lines in job-analysis sections and ATS recommendations
+_BULLET_LINE_RE = re.compile(r'^\s*-[\s-]*(.+?)\s*$', re.MULTILINE)
+
+# MATCH_SCORE in an analysis, once the full number is known (a non-digit or the end follows it)
+_MATCH_SCORE_RE = re.compile(r'MATCH_SCORE[:\s]+(\d+)(?!\d)')
+_STREAMED_MATCH_SCORE_RE = re.compile(r'MATCH_SCORE[:\s]+(\d+)\D')
+
+# "OVERALL_SCORE: 85" lines in ATS score responses
+_ATS_SCORE_RE = re.compile(r'\b(KEYWORD_MATCH|FORMAT_SCORE|SECTION_SCORE|OVERALL_SCORE):\s*(\d+)')
+
+# Hybrid scoring (HYBRID_SCORE=1): every provider answers analyses locally when the
+# TF-IDF keyword score of resume and job description (0-1) is below the low or at
+# least the high threshold, and calls the LLM only for the middle band
+HYBRID_SCORE = os.getenv('HYBRID_SCORE', '0') == '1'
+KEYWORD_SCORE_LOW = float(os.getenv('KEYWORD_SCORE_LOW', '0.15'))
+KEYWORD_SCORE_HIGH = float(os.getenv('KEYWORD_SCORE_HIGH', '0.85'))
+# Share of the hybrid score taken from the embedding similarity when
+# sentence-transformers is installed (0 scores on keywords alone)
+SEMANTIC_SCORE_WEIGHT = float(os.getenv('SEMANTIC_SCORE_WEIGHT', '0.5'))
+_LOW_MATCH_SUGGESTION = ("1. Overall: The resume and job description cover largely different fields - "
+                         "Consider whether this role is a good fit - Highlight transferable skills and relevant experience first")
+_HIGH_MATCH_SUGGESTION = ("1. Overall: The resume already closely matches this role - "
+                          "Tailor the summary to the role - Lead with the achievements most relevant to the job description")
+
+# Local pre-screen (off by default): set PRESCREEN_THRESHOLD to a 0-1 skill
+# match score, e.g. 0.25, and Groq analyses scoring below it are answered
+# locally with a low score instead of calling the LLM (0 disables)
+PRESCREEN_THRESHOLD = float(os.getenv('PRESCREEN_THRESHOLD', '0'))
+# ...and, when PRESCREEN_HIGH_THRESHOLD is set below 1 (e.g. 0.85), so are those
+# scoring at least that, with a high score, if the job description names at
+# least ATS_SKIP_MIN_SKILLS vocabulary skills (1 or more disables, the default)
+PRESCREEN_HIGH_THRESHOLD = float(os.getenv('PRESCREEN_HIGH_THRESHOLD', '1'))
+
+# Local ATS check: when the resume already names at least this share (0-1) of
+# the job description's vocabulary skills, calculate_ats_score skips the LLM.
+# Job descriptions naming fewer than ATS_SKIP_MIN_SKILLS skills always use it.
+ATS_SKIP_COVERAGE = float(os.getenv('ATS_SKIP_COVERAGE', '0.95'))
+ATS_SKIP_MIN_SKILLS = 5
+_STANDARD_SECTION_RE = re.compile(r'^[ \t]*(EXPERIENCE|WORK EXPERIENCE|PROFESSIONAL EXPERIENCE|EDUCATION|SKILLS|TECHNICAL SKILLS)\b',
+                                  re.IGNORECASE | re.MULTILINE)
+_STANDARD_SECTIONS = ("experience", "education", "skills")
+# Tabs, box-drawing and graphic bullets that ATS parsers handle poorly
+_ATS_UNFRIENDLY_RE = re.compile(r'[\t│┃║┆■◆★●►✓✔]')
+
+# Output separators for single-pass multi-stage optimization
+_STAGE_MARKERS = ("===STAGE 1 OUTPUT===", "===STAGE 2 OUTPUT===", "===STAGE 3 OUTPUT===")
+
+# Output separators for analyze_and_score
+_ANALYSIS_MARKER = "===RESUME ANALYSIS==="
+_ATS_SCORE_MARKER = "===ATS SCORE==="
+
+# Seed sent with temperature=0 requests so repeated inputs reproduce their output
+DETERMINISTIC_SEED = 42
+
+# Low temperature for the OpenAI, Claude and Cohere rewrites: near-identical
+# resubmissions give near-identical output, alongside the cached rules prefix
+OPTIMIZE_TEMPERATURE = 0.2
+
+# Only the first suggestions are put in the optimize prompt
+MAX_PROMPT_SUGGESTIONS = 10
+# Suggestions whose character-trigram Jaccard similarity to an earlier one
+# exceeds this are near-duplicates and left out of the prompt
+SUGGESTION_DUPLICATE_SIMILARITY = 0.8
+# Recently rendered optimize prompts kept in memory (LRU)
+OPTIMIZE_PROMPT_CACHE_SIZE = 64
+
+
+def _trigrams(text: str) -> FrozenSet[str]:
+    """Character trigrams of text (the text itself when shorter)."""
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2)) or frozenset((text,))
+
+
+def _prompt_suggestions(suggestions: Iterable[str]) -> List[str]:
+    """
+    The first MAX_PROMPT_SUGGESTIONS distinct suggestions, in order.
+
+    Repeats (ignoring case and spacing, e.g. from merging several providers'
+    suggestions) and near-duplicates by trigram Jaccard similarity are
+    skipped, so they do not spend prompt tokens; iteration stops once enough
+    are kept.
+    """
+    kept: List[str] = []
+    seen: Dict[str, FrozenSet[str]] = {}
+    for suggestion in suggestions:
+        normalized = _WHITESPACE_RE.sub(' ', suggestion).strip().lower()
+        if not normalized or normalized in seen:
+            continue
+        trigrams = _trigrams(normalized)
+        if any(len(trigrams & other) > SUGGESTION_DUPLICATE_SIMILARITY * len(trigrams | other)
+               for other in seen.values()):
+            continue
+        seen[normalized] = trigrams
+        kept.append(suggestion)
+        if len(kept) == MAX_PROMPT_SUGGESTIONS:
+            break
+    return kept
+
+
+def _suggestions_block(suggestions: Iterable[str]) -> str:
+    """Newline-joined leading distinct suggestions, without copying a long list."""
+    return "\n".join(_prompt_suggestions(suggestions))
+
+
+def _optimize_prompt(template_name: str, resume_text: str, job_description: str, suggestions: List[str],
+                     social_links: Optional[Dict] = None) -> str:
+    """Render an optimize_resume prompt template; only the per-request fields are substituted."""
+    social_links = social_links or {}
+    social_links_info = "".join(
+        f"\n{label} URL from original resume: {social_links[key]}"
+        for key, label in (('linkedin', 'LinkedIn'), ('github', 'GitHub'))
+        if social_links.get(key)
+    )
+    return _render_optimize_prompt(template_name, resume_text, job_description,
+                                   _suggestions_block(suggestions), social_links_info)
+
+
+@functools.lru_cache(maxsize=OPTIMIZE_PROMPT_CACHE_SIZE)
+def _render_optimize_prompt(template_name: str, resume_text: str, job_description: str,
+                            suggestions: str, social_links_info: str) -> str:
+    """
+    Rendered optimize prompt, kept per input: retrying the same request (or
+    switching to another provider sharing the template) returns the same
+    string instead of re-running section detection and substitution.
+    """
+    return _load_prompt_template(template_name).substitute(
+        resume_text=resume_text,
+        job_description=job_description,
+        suggestions=suggestions,
+        social_links_info=social_links_info,
+        detected_sections=_format_detected_sections(resume_text),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _optimize_rules() -> str:
+    """Static rules for the 'optimize_resume' prompt.
+
+    They are sent as the system prompt, ahead of the per-request fields, so the
+    providers' server-side prompt caching can reuse them across requests.
+    """
+    return _load_prompt_template('optimize_resume_rules').substitute()
+
+
+# System prompts shared by the providers' chat requests. The analyze and
+# optimize prompts were deduplicated against the user prompts, which already
+# carry the full scoring framework and rewrite rules (original: see git history).
+# The structured variant is for JSON/tool-call responses, whose format is set
+# by the schema rather than the prompt.
+_ANALYZE_STRUCTURED_SYSTEM_PROMPT = (
+    "You are a strict resume analyst. Score the resume with the 6-factor framework in the prompt "
+    "(required skills are 50% of the score - identify and match them thoroughly), total out of 100, "
+    "rounded to a whole number. Be STRICT: 0-40 = missing most requirements, 40-70 = some met, "
+    "70-100 = most/all met."
+)
+_ANALYZE_SYSTEM_PROMPT = _ANALYZE_STRUCTURED_SYSTEM_PROMPT + " Always provide the score as MATCH_SCORE: [number]."
+
+_OPTIMIZE_SYSTEM_PROMPT = (
+    "You are an expert resume writer tailoring resumes to job descriptions. MANDATORY: rewrite every "
+    "experience bullet from scratch - never just add keywords or make minor edits. Each bullet uses "
+    "Problem → Action → Result, a strong verb not repeated elsewhere, job-relevant technologies and a clear "
+    "business impact. Give each position 4-6 bullets, about half quantified (numbers, percentages, time, "
+    "money, scale) and half technical (implementations, architectures, job-matching technologies, no "
+    "metrics); no soft-skill bullets (leadership, collaboration, strategic thinking). Example: 'Worked on "
+    "projects' → 'Designed and deployed 3 microservices using Python and Docker, reducing API response time "
+    "by 45% and handling 50K+ requests daily'. Natural, business-professional tone, no generic AI-style "
+    "language. Stay truthful."
+)
+
+_JD_ANALYSIS_SYSTEM_PROMPT = "You are an expert job description analyst. Extract structured information that will help optimize resumes for this role."
+
+
+# Fixed instructions for multi-stage stages 2 and 3. They are sent as their
+# own message ahead of the per-request content, so every request shares a
+# byte-identical prefix that server-side prompt caches can reuse.
+_STAGE2_INSTRUCTIONS = """STAGE 2: ATS KEYWORD OPTIMIZATION
 
 Optimize for ATS by:
-1. Naturally incorporating the critical keywords listed above into existing bullet points
+1. Naturally incorporating the critical keywords listed below into existing bullet points
 2. Using exact keyword phrases from the job description where they fit naturally
 3. Including synonyms and related terms organically
 4. Ensuring keywords appear in relevant sections (NO keyword stuffing - keep it natural)
@@ -795,26 +399,7 @@ IMPORTANT:
 
 Provide the complete ATS-optimized resume."""
 
-            stage2_response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an ATS optimization specialist. Incorporate keywords naturally without stuffing."},
-                    {"role": "user", "content": stage2_prompt}
-                ],
-                temperature=0.6,
-                max_tokens=4000
-            )
-
-            stage2_resume = stage2_response.choices[0].message.content.strip()
-
-            # Stage 3: Format and Consistency Check - Convert to JSON
-            stage3_prompt = f"""STAGE 3: CONVERT TO STRUCTURED JSON FORMAT
-
-RESUME FROM STAGE 2:
-{stage2_resume[:4000]}
-
-ORIGINAL RESUME (for section preservation):
-{resume_text[:4000]}
+_STAGE3_INSTRUCTIONS = """STAGE 3: CONVERT TO STRUCTURED JSON FORMAT
 
 Convert the optimized resume from Stage 2 into a structured JSON format. Perform quality checks while converting:
 1. Ensure consistent formatting throughout
@@ -830,17 +415,17 @@ Convert the optimized resume from Stage 2 into a structured JSON format. Perform
 OUTPUT FORMAT - RETURN ONLY VALID JSON (NO OTHER TEXT):
 Return the optimized resume as a JSON object with this EXACT structure:
 
-{{
+{
   "name": "Full Name",
   "title": "Job Title/Position",
   "contact": ["Location: City, State", "Email: email@example.com", "Phone: (123) 456-7890", "LinkedIn: https://linkedin.com/in/username", "GitHub: https://github.com/username"],
   "summary": "Complete summary paragraph as single string",
-  "skills": {{
+  "skills": {
     "Category 1": ["skill1", "skill2", "skill3"],
     "Category 2": ["skill1", "skill2", "skill3"]
-  }},
+  },
   "experience": [
-    {{
+    {
       "company": "Company Name",
       "location": "City, State",
       "dates": "Start Date - End Date",
@@ -849,21 +434,21 @@ Return the optimized resume as a JSON object with this EXACT structure:
         "First bullet point with achievements and metrics",
         "Second bullet point with achievements and metrics"
       ]
-    }}
+    }
   ],
   "education": [
-    {{
+    {
       "degree": "Degree Name",
       "institution": "University Name",
       "location": "City, State"
-    }}
+    }
   ],
   "certifications": [
     "Certification exactly as written in original resume (e.g., AWS Certified Solutions Architect, 2023)",
     "Another certification"
   ],
   "projects": [
-    {{
+    {
       "name": "Project Name",
       "technologies": "Tech stack used",
       "date": "Date or Duration",
@@ -871,7 +456,7 @@ Return the optimized resume as a JSON object with this EXACT structure:
         "Project description and achievements",
         "Key features or results"
       ]
-    }}
+    }
   ],
   "awards": [
     "Award exactly as written in original resume",
@@ -885,17 +470,11 @@ Return the optimized resume as a JSON object with this EXACT structure:
     "Volunteer work exactly as written in original resume",
     "Another volunteer experience"
   ]
-}}
+}
 
 CRITICAL JSON RULES:
 - Return ONLY valid JSON - no markdown, no explanations, no code blocks
-- Include sections ONLY if they exist in ORIGINAL resume:
-  * "education" - Check original for: EDUCATION, ACADEMIC BACKGROUND, QUALIFICATIONS
-  * "certifications" - Check original for: CERTIFICATIONS, CERTIFICATES, LICENSES
-  * "projects" - Check original for: PROJECTS, ACADEMIC PROJECTS, PERSONAL PROJECTS
-  * "awards" - Check original for: AWARDS, HONORS, ACHIEVEMENTS
-  * "publications" - Check original for: PUBLICATIONS, RESEARCH, PAPERS
-  * "volunteer" - Check original for: VOLUNTEER, VOLUNTEER WORK, COMMUNITY SERVICE
+- Include optional sections ONLY if they exist in ORIGINAL resume (see SECTIONS DETECTED IN THE ORIGINAL RESUME below)
 - If a section doesn't exist in ORIGINAL resume, DO NOT include it in JSON
 - For certifications, awards, publications, volunteer: Copy EXACTLY from ORIGINAL resume
 - For education: Copy EXACTLY from ORIGINAL resume, preserve all degree details
@@ -916,106 +495,1737 @@ EXPERIENCE BULLETS QUALITY CHECK:
 - Use varied sentence structures and action verbs
 - Most recent role: 6-7 bullets max; Previous roles: 4-5 bullets max; Older roles: 3-4 bullets max"""
 
-            stage3_response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a meticulous resume editor. Return ONLY valid JSON, no other text."},
-                    {"role": "user", "content": stage3_prompt}
-                ],
-                temperature=0.5,
-                max_tokens=4000
-            )
-
-            final_resume = stage3_response.choices[0].message.content.strip()
-
-            # Clean up JSON if wrapped in markdown code blocks
-            import json
-            if final_resume.startswith('```json'):
-                final_resume = final_resume.replace('```json', '').replace('```', '').strip()
-            elif final_resume.startswith('```'):
-                final_resume = final_resume.replace('```', '').strip()
-
-            # Validate it's valid JSON
-            try:
-                json.loads(final_resume)
-            except json.JSONDecodeError as e:
-                # If JSON parsing fails, log the error but return the text anyway
-                # The frontend will handle fallback to text parsing
-                print(f"Warning: Stage 3 didn't return valid JSON: {e}")
-
-            return {
-                "optimized_resume": final_resume,  # JSON format
-                "download_resume": final_resume,  # JSON format
-                "original_resume": resume_text,
-                "stages": {
-                    "stage1_content": "Content improved",
-                    "stage2_keywords": f"Added {len(critical_keywords)} critical keywords",
-                    "stage3_format": "Converted to JSON format"
-                },
-                "multi_stage": True
-            }
-
-        except Exception as e:
-            return {"error": f"Error in multi-stage optimization: {str(e)}"}
 
-    def calculate_ats_score(self, resume_text: str, job_description: str) -> Dict:
-        """
-        Calculate ATS compatibility score for common ATS systems.
+# Fixed messages shared by every multi-stage and ATS request, built once
+# rather than per call (the SDK only reads them)
+_STAGE1_SYSTEM_MESSAGE = {"role": "system", "content": "You are an expert resume writer focusing on content quality and relevance."}
+_STAGE2_SYSTEM_MESSAGE = {"role": "system", "content": "You are an ATS optimization specialist. Incorporate keywords naturally without stuffing."}
+_STAGE2_INSTRUCTIONS_MESSAGE = {"role": "user", "content": _STAGE2_INSTRUCTIONS}
+_STAGE3_SYSTEM_MESSAGE = {"role": "system", "content": "You are a meticulous resume editor. Return ONLY valid JSON, no other text."}
+_STAGE3_INSTRUCTIONS_MESSAGE = {"role": "user", "content": _STAGE3_INSTRUCTIONS}
+_SINGLE_PASS_SYSTEM_MESSAGE = {"role": "system", "content": "You are an expert resume writer and ATS optimization specialist. Follow the stage markers exactly; the final stage must be valid JSON only."}
+_ATS_SCORE_SYSTEM_MESSAGE = {"role": "system", "content": "You are an ATS compatibility expert familiar with Workday, Greenhouse, and Lever systems."}
+_ANALYZE_AND_SCORE_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": _ANALYZE_SYSTEM_PROMPT + " For task 2, act as an ATS compatibility expert familiar with Workday, Greenhouse, and Lever systems."
+}
+
+
+# Section headings detected client-side in the original resume. Only the names
+# of the sections found are sent to the model, instead of asking it to match
+# these keyword lists itself (those instructions were billed on every call).
+_SECTION_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "education": ("EDUCATION", "ACADEMIC BACKGROUND", "QUALIFICATIONS", "ACADEMIC QUALIFICATIONS"),
+    "certifications": ("CERTIFICATIONS", "CERTIFICATES", "PROFESSIONAL CERTIFICATIONS", "LICENSES",
+                       "LICENSE & CERTIFICATIONS"),
+    "projects": ("PROJECTS", "ACADEMIC PROJECTS", "SCHOOL PROJECTS", "PERSONAL PROJECTS", "SIDE PROJECTS",
+                 "PORTFOLIO PROJECTS", "CAPSTONE PROJECTS", "RESEARCH PROJECTS", "INDIVIDUAL PROJECTS",
+                 "TEAM PROJECTS", "GROUP PROJECTS", "COURSE PROJECTS", "UNIVERSITY PROJECTS",
+                 "COLLEGE PROJECTS"),
+    "awards": ("AWARDS", "HONORS", "ACHIEVEMENTS", "HONORS & AWARDS", "RECOGNITION"),
+    "publications": ("PUBLICATIONS", "RESEARCH", "PAPERS", "PUBLISHED WORK"),
+    "volunteer": ("VOLUNTEER", "VOLUNTEER WORK", "VOLUNTEER EXPERIENCE", "COMMUNITY SERVICE"),
+}
+
+# One heading pattern per section: a line that starts with one of the section's
+# keywords (optionally followed by a short qualifier such as "& TRAINING:").
+_SECTION_NAMES: Tuple[str, ...] = tuple(_SECTION_KEYWORDS)
+_SECTION_HEADING_PATTERNS: Tuple[str, ...] = tuple(
+    r'^[ \t]*(?:%s)\b[^\n]{0,40}$' % '|'.join(re.escape(k) for k in _SECTION_KEYWORDS[section])
+    for section in _SECTION_NAMES
+) + (r'^[ \t]*[A-Z &/-]*PROJECT[A-Z &/-]*:?[ \t]*$',)  # any heading containing "PROJECT"
+_SECTION_PATTERN_OWNERS: Tuple[str, ...] = _SECTION_NAMES + ("projects",)
+
+if HYPERSCAN_AVAILABLE:
+    # Hyperscan compiles all heading patterns into one DFA scanned in a single pass
+    _SECTION_DB = hyperscan.Database()
+    _SECTION_DB.compile(
+        expressions=[pattern.encode() for pattern in _SECTION_HEADING_PATTERNS],
+        ids=list(range(len(_SECTION_HEADING_PATTERNS))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_SINGLEMATCH]
+        * len(_SECTION_HEADING_PATTERNS),
+    )
+    _SECTION_REGEX = None
+else:
+    _SECTION_DB = None
+    # Same patterns as one alternation with a named group per pattern
+    _SECTION_REGEX = re.compile(
+        '|'.join('(?P<s%d>%s)' % (i, pattern) for i, pattern in enumerate(_SECTION_HEADING_PATTERNS)),
+        re.IGNORECASE | re.MULTILINE,
+    )
+
+
+def _detect_sections(resume_text: str) -> List[str]:
+    """Return the optional sections (education, projects, ...) whose headings appear in the resume."""
+    found = set()
+    if _SECTION_DB is not None:
+        def on_match(pattern_id, start, end, flags, context):
+            found.add(_SECTION_PATTERN_OWNERS[pattern_id])
+        _SECTION_DB.scan(resume_text.encode('utf-8', 'ignore'), match_event_handler=on_match)
+    else:
+        for match in _SECTION_REGEX.finditer(resume_text):
+            found.add(_SECTION_PATTERN_OWNERS[int(match.lastgroup[1:])])
+    return [section for section in _SECTION_NAMES if section in found]
+
+
+def _format_detected_sections(resume_text: str) -> str:
+    """Comma-separated detected sections for the prompt, or "none"."""
+    return ", ".join(_detect_sections(resume_text)) or "none"
+
+
+# Headings of the core sections, which _parse_sections splits on together with
+# the optional sections above
+_CORE_SECTION_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "summary": ("SUMMARY", "PROFESSIONAL SUMMARY", "PROFILE", "OBJECTIVE", "CAREER OBJECTIVE"),
+    "skills": ("SKILLS", "TECHNICAL SKILLS", "CORE COMPETENCIES", "TECHNOLOGIES"),
+    "experience": ("EXPERIENCE", "WORK EXPERIENCE", "PROFESSIONAL EXPERIENCE", "EMPLOYMENT HISTORY",
+                   "WORK HISTORY"),
+}
+_SPLIT_SECTION_NAMES: Tuple[str, ...] = tuple(_CORE_SECTION_KEYWORDS) + _SECTION_NAMES
+# Unlike the detection patterns, a line must be the heading alone (plus an
+# optional colon) to split on it, so body text such as "Research on ..." is
+# never mistaken for the start of a section.
+_SECTION_SPLIT_RE = re.compile(
+    '|'.join(
+        r'(?P<%s>^[ \t]*(?:%s)[ \t]*:?[ \t]*$)' % (section, '|'.join(re.escape(k) for k in keywords))
+        for section, keywords in (*_CORE_SECTION_KEYWORDS.items(), *((name, _SECTION_KEYWORDS[name]) for name in _SECTION_NAMES))
+    ),
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Sections the analysis rubric (skills, experience level and years, title,
+# education, industry) does not score, left out of analyze prompts
+_ANALYSIS_SKIPPED_SECTIONS = frozenset({"awards", "publications", "volunteer"})
+
+
+def _parse_sections(resume_text: str) -> Dict[str, str]:
+    """
+    Split a resume into its sections in one pass over the headings.
+
+    Returns:
+        Section name -> text (heading included), in resume order; the lines
+        before the first heading are under "header". Sections whose heading
+        appears more than once are joined.
+    """
+    sections: Dict[str, str] = {}
+    name, start = "header", 0
+    for match in _SECTION_SPLIT_RE.finditer(resume_text):
+        if match.start() > start or name != "header":
+            sections[name] = sections.get(name, "") + resume_text[start:match.start()]
+        name, start = match.lastgroup, match.start()
+    sections[name] = sections.get(name, "") + resume_text[start:]
+    return sections
+
+
+def _analysis_resume_text(resume_text: str) -> str:
+    """The resume without the sections the analysis rubric does not score."""
+    sections = _parse_sections(resume_text)
+    if not _ANALYSIS_SKIPPED_SECTIONS.intersection(sections):
+        return resume_text
+    return "".join(text for name, text in sections.items() if name not in _ANALYSIS_SKIPPED_SECTIONS).rstrip()
+
+
+# Structured analysis, requested as Claude tool input or a Gemini JSON response
+# so the fields arrive parsed instead of being scraped from free text
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "match_score": {"type": "integer", "description": "Total score from the rubric, 0-100 (be strict)"},
+        "strengths": {"type": "array", "items": {"type": "string"}},
+        "improvements_needed": {"type": "array", "items": {"type": "string"},
+                                "description": "Specific content changes"},
+        "content_suggestions": {"type": "array", "items": {"type": "string"},
+                                "description": "Each as '[Section/Area]: [What to change] - [Why] - [How to improve it]'"},
+    },
+    "required": ["match_score", "strengths", "improvements_needed", "content_suggestions"],
+}
+
+
+def _structured_analysis(data: Any, provider: str) -> Dict:
+    """
+    Analysis result for a structured response: the fields under "analysis",
+    plus raw_analysis rendered in the plain-text format the analyze prompt
+    asks for, so text consumers and caches see the same shape as before.
+    """
+    if not isinstance(data, dict):
+        return {"error": f"{provider} API error: malformed structured analysis"}
+    try:
+        score = max(0, min(100, int(data.get("match_score", 0))))
+    except (TypeError, ValueError):
+        return {"error": f"{provider} API error: malformed structured analysis"}
+    analysis = {"match_score": score}
+    for field in ("strengths", "improvements_needed", "content_suggestions"):
+        items = data.get(field) or []
+        analysis[field] = [str(item).strip() for item in items if str(item).strip()] if isinstance(items, list) else []
+
+    strengths = "\n".join(f"- {item}" for item in analysis["strengths"])
+    improvements = "\n".join(f"- {item}" for item in analysis["improvements_needed"])
+    suggestions = "\n".join(f"{i}. {item}" for i, item in enumerate(analysis["content_suggestions"], 1))
+    raw_analysis = (
+        f"MATCH_SCORE: {score}\n"
+        f"STRENGTHS:\n{strengths}\n\n"
+        f"IMPROVEMENTS_NEEDED:\n{improvements}\n\n"
+        f"CONTENT_SUGGESTIONS:\n{suggestions}\n"
+    )
+    return {"raw_analysis": raw_analysis, "analysis": analysis, "provider": provider}
+
+
+# Output token ceiling for resume rewrites; the actual cap is sized per call
+MAX_OUTPUT_TOKENS = 4000
+
+
+# Context windows (tokens) by model-name prefix, covering the default and
+# fallback models of each provider; anything unlisted gets the default.
+_CONTEXT_WINDOWS: Tuple[Tuple[str, int], ...] = (
+    ("llama-3", 128000),
+    ("gpt-4o", 128000),
+    ("claude-3", 200000),
+    ("gemini-", 1000000),
+    ("command-r", 128000),
+)
+DEFAULT_CONTEXT_WINDOW = 32768
+
+# Upper bound on the fixed instructions around the resume and job description
+PROMPT_OVERHEAD_TOKENS = 6000
+
+# Smallest output reservation, and tokens kept free below the context window
+MIN_OUTPUT_TOKENS = 512
+CONTEXT_SAFETY_MARGIN = 128
+
+
+@functools.lru_cache(maxsize=8)
+def _get_encoder(model: Optional[str] = None):
+    """Load a tiktoken encoder once per model (building the BPE ranks is expensive).
+
+    Non-OpenAI models fall back to cl100k_base as a conservative estimator.
+    """
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def _count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens with tiktoken, or estimate ~4 characters per token without it."""
+    if TIKTOKEN_AVAILABLE:
+        return len(_get_encoder(model).encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def _truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Cut text down to at most max_tokens tokens, keeping the beginning."""
+    if max_tokens <= 0:
+        return ""
+    if TIKTOKEN_AVAILABLE:
+        encoder = _get_encoder(model)
+        tokens = encoder.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return encoder.decode(tokens[:max_tokens])
+    return text[:max_tokens * 4]
+
+
+# Sentences, or lines for bullet-style text; each unit keeps its trailing whitespace
+_SENTENCE_RE = re.compile(r'[^\n]*?(?:[.!?]+[ \t]+|\n+|$)')
+
+# Token budgets for the resume and job description excerpts in the multi-stage
+# and ATS prompts (the sizes of the character slices they replace)
+STAGE_RESUME_TOKENS = 1000
+STAGE_JOB_DESCRIPTION_TOKENS = 500
+ATS_RESUME_TOKENS = 750
+ATS_JOB_DESCRIPTION_TOKENS = 375
+JOB_DESCRIPTION_QUERY = "required skills, qualifications and responsibilities"
+
+
+def _truncate_to_budget(text: str, budget_tokens: int, query: Optional[str] = None) -> str:
+    """Shrink text to budget_tokens at sentence/line boundaries instead of mid-word.
+
+    With a query (and sentence-transformers installed) the sentences most
+    similar to the query are kept, so requirements near the end of a long
+    job description survive; otherwise the leading sentences are kept. Kept
+    sentences stay in their original order.
+    """
+    if _count_tokens(text) <= budget_tokens:
+        return text
+    units = [match.group(0) for match in _SENTENCE_RE.finditer(text) if match.group(0)]
+    order = list(range(len(units)))
+    ranked = False
+    if query:
+        vectors = embed_texts([query] + [unit.strip() or unit for unit in units])
+        if vectors is not None:
+            scores = vectors[1:] @ vectors[0]
+            order.sort(key=lambda i: -scores[i])
+            ranked = True
+
+    kept, used = [], 0
+    for i in order:
+        cost = _count_tokens(units[i])
+        if used + cost > budget_tokens:
+            if ranked:
+                continue  # a shorter, less similar sentence may still fit
+            break
+        kept.append(i)
+        used += cost
+    if not kept:
+        return _truncate_to_tokens(text, budget_tokens)
+    return ''.join(units[i] for i in sorted(kept)).rstrip()
+
+
+def _context_window(model: str) -> int:
+    """Context window size for model, by name prefix."""
+    return next((size for prefix, size in _CONTEXT_WINDOWS if model.startswith(prefix)), DEFAULT_CONTEXT_WINDOW)
+
+
+# Hard caps on the resume and job description pasted into a prompt, so prefill
+# cost stays predictable however large an upload is (a long resume is ~2K tokens)
+MAX_RESUME_PROMPT_TOKENS = int(os.getenv('MAX_RESUME_PROMPT_TOKENS', '3000'))
+MAX_JOB_DESCRIPTION_PROMPT_TOKENS = int(os.getenv('MAX_JOB_DESCRIPTION_PROMPT_TOKENS', '2000'))
+
+
+def _fit_to_context(resume_text: str, job_description: str, model: str) -> Tuple[str, str]:
+    """Bound the resume and job description before they are built into a prompt.
+
+    The job description is cut to MAX_JOB_DESCRIPTION_PROMPT_TOKENS, keeping
+    the sentences closest to its requirements. The resume is cut to
+    MAX_RESUME_PROMPT_TOKENS and to what fits the model's context window
+    after the instructions, the job description and the largest output, so
+    oversize inputs are trimmed client-side instead of failing with a
+    context-length error after a wasted round trip.
+    """
+    job_description, job_tokens = _fit_job_description(job_description, model)
+    budget = _context_window(model) - MAX_OUTPUT_TOKENS - PROMPT_OVERHEAD_TOKENS - job_tokens
+    return _truncate_to_tokens(resume_text, min(budget, MAX_RESUME_PROMPT_TOKENS), model), job_description
+
+
+# Per-job-description work is memoized: batches and recruiter workflows score
+# many resumes against the same description, so only the first pays for it
+@functools.lru_cache(maxsize=32)
+def _fit_job_description(job_description: str, model: str) -> Tuple[str, int]:
+    """The job description cut to MAX_JOB_DESCRIPTION_PROMPT_TOKENS, and its token count."""
+    job_description = _truncate_to_budget(job_description, MAX_JOB_DESCRIPTION_PROMPT_TOKENS, JOB_DESCRIPTION_QUERY)
+    return job_description, _count_tokens(job_description, model)
+
+
+@functools.lru_cache(maxsize=32)
+def _job_skills(job_description: str) -> FrozenSet[str]:
+    """Vocabulary skills named in a job description."""
+    return frozenset(find_skills(job_description))
+
+
+def _output_token_budget(source_text: str, cap: int = MAX_OUTPUT_TOKENS) -> int:
+    """Size max_tokens for a rewrite of source_text instead of always reserving the cap.
+
+    The rewritten resume (plus JSON structure) is allowed about twice the
+    source length with a fixed headroom, which still fits a typical resume
+    while letting short inputs finish with a much smaller reservation.
+    """
+    return min(cap, _count_tokens(source_text) * 2 + 1024)
+
+
+def _clamp_max_tokens(request: Dict) -> Dict:
+    """Lower the request's max_tokens so prompt plus output fits the context window.
+
+    The per-request value stays the cap; it is only reduced when the prompt
+    is large enough that the full reservation would overflow, and never
+    below MIN_OUTPUT_TOKENS.
+    """
+    cap = request.get('max_tokens')
+    if not cap:
+        return request
+    prompt_tokens = sum(_count_tokens(message.get('content', '')) for message in request.get('messages', ()))
+    room = _context_window(request.get('model', '')) - prompt_tokens - CONTEXT_SAFETY_MARGIN
+    max_tokens = max(MIN_OUTPUT_TOKENS, min(cap, room))
+    if max_tokens == cap:
+        return request
+    return {**request, 'max_tokens': max_tokens}
+
+
+# Retry policy for provider API calls: 3 attempts, exponential backoff with jitter
+RETRY_ATTEMPTS = 3
+RETRY_INITIAL_WAIT = 1  # seconds
+RETRY_MAX_WAIT = 30  # seconds
+# Per-request timeout for the provider SDK clients; their built-in retries are
+# disabled (max_retries=0) so _retry_transient is the only retry layer.
+API_TIMEOUT = 60.0  # seconds
+# Providers and SDK clients kept per API key (LRU); requests can bring their
+# own keys, so the caches are bounded rather than growing with every key seen
+CLIENT_CACHE_SIZE = int(os.getenv('CLIENT_CACHE_SIZE', '32'))
+
+# SDK exception class names that indicate a transient failure worth retrying
+# (openai/groq/anthropic share names; cohere and google use their own).
+_TRANSIENT_ERROR_NAMES = frozenset({
+    "RateLimitError",
+    "APIConnectionError",
+    "APITimeoutError",
+    "InternalServerError",
+    "TooManyRequestsError",
+    "ServiceUnavailableError",
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+})
+
+
+def _is_transient_error(exc: BaseException) -> bool:
+    """Return True for rate-limit, connection and 5xx errors; auth/4xx errors are not retried."""
+    if any(cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(exc).__mro__):
+        return True
+    status = getattr(exc, 'status_code', None) or getattr(exc, 'http_status', None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+if TENACITY_AVAILABLE:
+    _retry_transient = retry(
+        retry=retry_if_exception(_is_transient_error),
+        wait=wait_exponential_jitter(initial=RETRY_INITIAL_WAIT, max=RETRY_MAX_WAIT),
+        stop=stop_after_attempt(RETRY_ATTEMPTS),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True,
+    )
+else:
+    def _retry_delay(attempt: int) -> float:
+        return min(RETRY_MAX_WAIT, RETRY_INITIAL_WAIT * 2 ** attempt) + random.uniform(0, RETRY_INITIAL_WAIT)
+
+    def _retry_transient(func):
+        """Fallback retry decorator used when tenacity is not installed."""
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                for attempt in range(RETRY_ATTEMPTS):
+                    try:
+                        return await func(*args, **kwargs)
+                    except Exception as e:
+                        if attempt == RETRY_ATTEMPTS - 1 or not _is_transient_error(e):
+                            raise
+                        delay = _retry_delay(attempt)
+                        logger.warning(f"Retrying {func.__qualname__} in {delay:.1f}s after {e!r}")
+                        await asyncio.sleep(delay)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(RETRY_ATTEMPTS):
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    if attempt == RETRY_ATTEMPTS - 1 or not _is_transient_error(e):
+                        raise
+                    delay = _retry_delay(attempt)
+                    logger.warning(f"Retrying {func.__qualname__} in {delay:.1f}s after {e!r}")
+                    time.sleep(delay)
+        return wrapper
+
+
+# Max in-flight async requests per provider, kept under the providers' RPM limits
+MAX_CONCURRENT_REQUESTS = 10
+
+
+# Groq account quota (requests and tokens per minute); override for your plan
+GROQ_RPM = int(os.getenv('GROQ_RPM', '30'))
+GROQ_TPM = int(os.getenv('GROQ_TPM', '60000'))
+RATE_LIMIT_WINDOW = 60.0  # seconds
+
+# Smaller Groq model (own per-model quota) tried once the main model's retries
+# are exhausted on a transient error; set GROQ_FALLBACK_MODEL empty to disable
+GROQ_FALLBACK_MODEL = os.getenv('GROQ_FALLBACK_MODEL', 'llama-3.1-8b-instant')
+
+
+class _RateLimiter:
+    """
+    Sliding-window requests-per-minute and tokens-per-minute limiter.
+
+    Callers reserve a request and its estimated tokens before each API call
+    and wait while either the request count or the token sum over the last
+    window would exceed the quota. One instance is shared by the sync and
+    async paths of a provider, so it is guarded by a thread lock.
+    """
+
+    __slots__ = ("rpm", "tpm", "window", "_requests", "_tokens", "_token_sum", "_lock")
+
+    def __init__(self, rpm: int, tpm: int, window: float = RATE_LIMIT_WINDOW):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self._requests = deque()  # timestamps
+        self._tokens = deque()  # (timestamp, tokens)
+        self._token_sum = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        """Record the call and return 0, or return how long to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            cutoff = now - self.window
+            while self._requests and self._requests[0] <= cutoff:
+                self._requests.popleft()
+            while self._tokens and self._tokens[0][0] <= cutoff:
+                self._token_sum -= self._tokens.popleft()[1]
+
+            if len(self._requests) >= self.rpm:
+                return self._requests[0] - cutoff
+            # A single call larger than the quota is let through on an empty window
+            if self._tokens and self._token_sum + tokens > self.tpm:
+                return self._tokens[0][0] - cutoff
+
+            self._requests.append(now)
+            self._tokens.append((now, tokens))
+            self._token_sum += tokens
+            return 0.0
+
+    def acquire(self, tokens: int):
+        """Block until the call fits in the window."""
+        while True:
+            delay = self._reserve(tokens)
+            if not delay:
+                return
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int):
+        """Wait, without blocking the event loop, until the call fits in the window."""
+        while True:
+            delay = self._reserve(tokens)
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+
+def _estimate_request_tokens(kwargs: Dict) -> int:
+    """Prompt tokens plus the reserved completion budget, as counted against TPM."""
+    prompt_tokens = sum(_count_tokens(message.get('content', '')) for message in kwargs.get('messages', ()))
+    return prompt_tokens + kwargs.get('max_tokens', 0)
+
+
+# Default fan-out for the batch helpers
+DEFAULT_BATCH_CONCURRENCY = 20
+
+# Provider batch APIs (OpenAI Batch, Claude Message Batches): half-price
+# analyses completed asynchronously, within 24 hours
+MAX_ANALYSIS_BATCH_SIZE = 500
+BATCH_POLL_INTERVAL = 30.0  # seconds
+BATCH_TIMEOUT = 24 * 3600  # seconds
+
+# Exact-match response cache for byte-identical requests (complements the semantic cache)
+RESPONSE_CACHE_DIR = os.getenv('RESPONSE_CACHE_DIR', os.path.expanduser('~/.cache/resumeopt/groq'))
+RESPONSE_CACHE_TTL = 7 * 86400  # seconds
+# Disk bound for the response cache; least recently stored entries are culled past it
+RESPONSE_CACHE_SIZE_LIMIT = int(os.getenv('RESPONSE_CACHE_SIZE_LIMIT', str(512 * 2**20)))  # bytes
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _result_cache_key(operation: str, model: str, *parts: Any) -> str:
+    """
+    Cache key for a whole operation's result, computed from its inputs.
+
+    Text inputs are whitespace-normalised, so re-submitting the same resume
+    and job description with different spacing or line breaks still hits.
+    """
+    digest = hashlib.blake2b(operation.encode(), digest_size=32)
+    for part in (*parts, model):
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, default=str)
+        digest.update(b"\x00" + _WHITESPACE_RE.sub(' ', part).strip().encode('utf-8'))
+    return f"result:{digest.hexdigest()}"
+
+
+def _request_cache_key(kwargs: Dict) -> str:
+    """SHA-256 of the full request arguments (model, messages, temperature, max_tokens, ...)."""
+    if ORJSON_AVAILABLE:
+        return hashlib.sha256(orjson.dumps(kwargs, option=orjson.OPT_SORT_KEYS, default=str)).hexdigest()
+    return hashlib.sha256(json.dumps(kwargs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _provider_response_cache():
+    """diskcache.Cache shared by the providers without their own response cache, or None."""
+    if not DISKCACHE_AVAILABLE:
+        return None
+    return diskcache.Cache(RESPONSE_CACHE_DIR, size_limit=RESPONSE_CACHE_SIZE_LIMIT)
+
+
+def clean_response_cache() -> int:
+    """
+    Remove expired response cache entries and cull the cache back under
+    RESPONSE_CACHE_SIZE_LIMIT; meant for a periodic job.
+
+    Returns:
+        Number of entries removed
+    """
+    cache = _provider_response_cache()
+    if cache is None:
+        return 0
+    return cache.expire() + cache.cull()
+
+
+def _is_successful_result(result: Any) -> bool:
+    """True for analyze dicts without an error and optimize text that is not an error message."""
+    if isinstance(result, dict):
+        return "error" not in result
+    return isinstance(result, str) and bool(result) and not result.startswith("Error")
+
+
+def _cached_response(operation: str):
+    """
+    Decorator caching a provider method's result on disk, keyed on
+    (operation, provider, model) and the call's arguments.
+
+    Repeated (resume, job description) inputs - retries after a crash, or a
+    batch re-run - are answered from the cache instead of the API. Works on
+    sync and async methods; errors are never cached.
+    """
+    def decorator(func):
+        def lookup(self, args, kwargs):
+            cache = _provider_response_cache() if self.is_available() else None
+            if cache is None:
+                return None, None, None
+            key = _result_cache_key(f"{operation}:{type(self).__name__}", self.model, *args, kwargs)
+            return cache, key, cache.get(key)
+
+        def store(cache, key, result):
+            # Local pre-screen answers are cheap to recompute and depend on HYBRID_SCORE, so they are not stored
+            if cache is not None and _is_successful_result(result) and not (
+                    isinstance(result, dict) and result.get("provider") == "local-prescreen"):
+                cache.set(key, result, expire=RESPONSE_CACHE_TTL)
+            return result
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                cache, key, cached = lookup(self, args, kwargs)
+                if cached is not None:
+                    return cached
+                return store(cache, key, await func(self, *args, **kwargs))
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            cache, key, cached = lookup(self, args, kwargs)
+            if cached is not None:
+                return cached
+            return store(cache, key, func(self, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+@functools.lru_cache(maxsize=None)
+def _import_sdk(module_name: str):
+    """Import a provider SDK on first use, or return None if it is not installed.
+
+    Provider SDKs are slow to import, so they are only loaded once a provider
+    with an API key is constructed, not when this module is imported.
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
+
+
+def score_batch(provider, pairs: List[Tuple[str, str]], *, poll_interval: float = BATCH_POLL_INTERVAL,
+                timeout: float = BATCH_TIMEOUT) -> List[Dict]:
+    """
+    Analyze many (resume_text, job_description) pairs through a provider's
+    batch API (OpenAI or Claude, see analysis_batch_available()), blocking
+    until the batch ends; meant for offline jobs, not requests.
+
+    Returns:
+        One analysis dict per pair, in input order
+    """
+    batch_id = provider.submit_analysis_batch(pairs)
+    deadline = time.monotonic() + timeout
+    while True:
+        results = provider.analysis_batch_results(batch_id)
+        if results is not None:
+            return results
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Batch {batch_id} did not finish within {timeout:.0f}s")
+        time.sleep(poll_interval)
+
+
+def _high_match_score(score: float, threshold: float) -> int:
+    """MATCH_SCORE for a local score at or above threshold: 70-95, above the optimization cut-off the dashboards use."""
+    return min(95, 70 + int((score - threshold) / (1 - threshold) * 25))
+
+
+def _local_analysis(match_score: int, suggestion: str, skill_match: Tuple[Set[str], Set[str]]) -> Dict:
+    """Analysis result in the usual text format, built from a local score and skill match."""
+    found, required = skill_match
+    missing = sorted(required - found)
+    strengths = "\n".join(f"- Lists {skill}" for skill in sorted(found)) or "- None identified for this role"
+    improvements = "\n".join(f"- Add experience with {skill}" for skill in missing[:10]) or \
+        "- Show experience directly relevant to this role"
+    raw_analysis = (
+        f"MATCH_SCORE: {match_score}\n"
+        f"STRENGTHS:\n{strengths}\n\n"
+        f"IMPROVEMENTS_NEEDED:\n{improvements}\n\n"
+        "CONTENT_SUGGESTIONS:\n"
+        f"{suggestion}\n"
+    )
+    return {"raw_analysis": raw_analysis, "provider": "local-prescreen"}
 
-        Checks for: Workday, Greenhouse, Lever compatibility
 
-        Returns:
-            Dictionary with ATS score and specific recommendations
-        """
+class AIProvider(ABC):
+    """Base class for AI providers."""
+    
+    __slots__ = ("api_key", "client", "model")
+    
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Check if provider is available."""
+        pass
+    
+    @abstractmethod
+    def analyze_resume(self, resume_text: str, job_description: str) -> Dict:
+        """Analyze resume against job description."""
+        pass
+    
+    @abstractmethod
+    def optimize_resume(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None) -> str:
+        """Create optimized resume."""
+        pass
+    
+    def _keyword_prescreen(self, resume_text: str, job_description: str) -> Optional[Dict]:
+        """
+        With HYBRID_SCORE on, a local analysis when the TF-IDF keyword score
+        is clearly low or high, or None to call the LLM.
+
+        When embeddings are available the score blends in their cosine
+        similarity (SEMANTIC_SCORE_WEIGHT), so paraphrased skills still count;
+        embeddings are persisted, so re-submitted texts are not re-encoded.
+        """
+        if not HYBRID_SCORE:
+            return None
+        score = keyword_score(resume_text, job_description)
+        if SEMANTIC_SCORE_WEIGHT > 0:
+            similarity = text_similarity(resume_text, job_description)
+            if similarity is not None:
+                score = (1 - SEMANTIC_SCORE_WEIGHT) * score + SEMANTIC_SCORE_WEIGHT * similarity
+        if score < KEYWORD_SCORE_LOW:
+            return _local_analysis(int(score * 100), _LOW_MATCH_SUGGESTION,
+                                   self.local_skill_match(resume_text, job_description))
+        if score >= KEYWORD_SCORE_HIGH:
+            return _local_analysis(_high_match_score(score, KEYWORD_SCORE_HIGH), _HIGH_MATCH_SUGGESTION,
+                                   self.local_skill_match(resume_text, job_description))
+        return None
+    
+    def local_skill_match(self, resume_text: str, job_description: str) -> Tuple[Set[str], Set[str]]:
+        """
+        Match vocabulary skills locally, without an API call.
+
+        Gives a free preliminary score (len(found) / len(required)) that can
+        screen out obvious mismatches before spending tokens on analysis.
+
+        Returns:
+            (found, required) - skills named in the job description, and the
+            subset of them that also appear in the resume
+        """
+        required = set(_job_skills(job_description))
+        return required & find_skills(resume_text), required
+    
+    async def analyze_resume_async(self, resume_text: str, job_description: str) -> Dict:
+        """Non-blocking analyze_resume; the SDK call runs in a worker thread."""
+        return await asyncio.to_thread(self.analyze_resume, resume_text, job_description)
+    
+    async def optimize_resume_async(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None) -> str:
+        """Non-blocking optimize_resume; the SDK call runs in a worker thread."""
+        return await asyncio.to_thread(self.optimize_resume, resume_text, job_description, suggestions, social_links)
+    
+    def match_score(self, resume_text: str, job_description: str) -> Optional[int]:
+        """
+        The analysis MATCH_SCORE alone, for score-only passes.
+
+        Providers with analyze_resume_stream stop reading (and close the stream)
+        as soon as the score has streamed, skipping the long strengths and
+        suggestions tail. Returns None when the analysis has no score; API
+        errors are raised.
+        """
+        stream = getattr(self, 'analyze_resume_stream', None)
+        if stream is None:
+            result = self.analyze_resume(resume_text, job_description)
+            if "error" in result:
+                raise RuntimeError(result["error"])
+            match = _MATCH_SCORE_RE.search(result.get("raw_analysis", ""))
+            return int(match.group(1)) if match else None
+        
+        deltas = stream(resume_text, job_description)
+        text = ""
+        try:
+            for delta in deltas:
+                text += delta
+                match = _STREAMED_MATCH_SCORE_RE.search(text)
+                if match:
+                    return int(match.group(1))
+        finally:
+            deltas.close()
+        match = _MATCH_SCORE_RE.search(text)
+        return int(match.group(1)) if match else None
+    
+    async def optimize_resumes_batch(self, requests: List[Tuple[str, str, List[str]]], *,
+                                     max_concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> List[str]:
+        """
+        optimize_resume_async for many (resume_text, job_description, suggestions)
+        requests concurrently, at most max_concurrency at a time.
+
+        Returns:
+            One optimized resume (or "Error: ..." string) per request, in input order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def optimize_one(resume_text: str, job_description: str, suggestions: List[str]) -> str:
+            async with semaphore:
+                return await self.optimize_resume_async(resume_text, job_description, suggestions)
+        
+        return list(await asyncio.gather(*(optimize_one(*request) for request in requests)))
+
+
+class _AsyncSDKProvider(AIProvider):
+    """Base class for providers whose SDK has a native async client."""
+    
+    # The async client is created lazily per event loop (httpx pools are loop-bound)
+    __slots__ = ("_async_client", "_async_loop", "_async_semaphore")
+    
+    @abstractmethod
+    def _new_async_client(self):
+        """Native async SDK client for the running event loop."""
+        pass
+    
+    def _get_async_client(self):
+        """Async SDK client for the running event loop, with its request semaphore."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = self._new_async_client()
+            self._async_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+            self._async_loop = loop
+        return self._async_client
+
+
+class GroqProvider(_AsyncSDKProvider):
+    """Groq AI Provider - Fast and cost-effective."""
+    
+    __slots__ = ("semantic_cache", "rate_limiter", "cache_enabled", "skip_llm_threshold", "skip_llm_high_threshold",
+                 "fallback_model",
+                 "_response_cache",
+                 "_inflight", "_inflight_async", "_inflight_lock")
+    
+    # Sync clients by sha256(API key), shared across instances (class-level, not
+    # per instance); the CLIENT_CACHE_SIZE most recently used are kept
+    _clients: ClassVar["OrderedDict[str, object]"] = OrderedDict()
+    _clients_lock: ClassVar[threading.Lock] = threading.Lock()
+    
+    def __init__(self, api_key: Optional[str] = None, similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+                 cache_path: Optional[str] = None, rpm: int = GROQ_RPM, tpm: int = GROQ_TPM,
+                 cache_enabled: bool = True, skip_llm_threshold: float = PRESCREEN_THRESHOLD,
+                 fallback_model: Optional[str] = GROQ_FALLBACK_MODEL,
+                 skip_llm_high_threshold: float = PRESCREEN_HIGH_THRESHOLD):
+        self.api_key = api_key or os.getenv('GROQ_API_KEY')
+        self.client = None
+        self.model = "llama-3.3-70b-versatile"
+        # Near-duplicate (resume, JD) submissions are answered from this cache
+        self.semantic_cache = SemanticCache(
+            cache_path=cache_path or os.getenv('SEMANTIC_CACHE_PATH'),
+            similarity_threshold=similarity_threshold
+        )
+        # Calls wait here instead of running into 429s under concurrent load
+        self.rate_limiter = _RateLimiter(rpm, tpm)
+        # Resumes scoring below this locally are not sent to Groq for analysis (0 disables)
+        self.skip_llm_threshold = skip_llm_threshold
+        # ...and neither are clear matches scoring at least this (1 or more disables)
+        self.skip_llm_high_threshold = skip_llm_high_threshold
+        # Model used when self.model keeps failing with rate-limit/5xx errors (None disables)
+        self.fallback_model = fallback_model or None
+        # Identical requests are answered from disk (opened on first use)
+        self.cache_enabled = cache_enabled and DISKCACHE_AVAILABLE
+        self._response_cache = None
+        # Identical requests already in flight, by request key (sync: Future, async: Task)
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._inflight_async: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._async_client = None
+        self._async_loop = None
+        self._async_semaphore = None
+        
+        if self.api_key:
+            self.client = self._get_client(self.api_key)
+    
+    @classmethod
+    def _get_client(cls, api_key: str):
+        """Groq client shared by every instance with this key, so they share one connection pool."""
+        groq = _import_sdk('groq')
+        if groq is None:
+            return None
+        key = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+        with cls._clients_lock:
+            client = cls._clients.get(key)
+            if client is not None:
+                cls._clients.move_to_end(key)
+                return client
+            client = cls._clients[key] = groq.Groq(api_key=api_key, timeout=API_TIMEOUT, max_retries=0,
+                                                   http_client=shared_http_client())
+            while len(cls._clients) > CLIENT_CACHE_SIZE:
+                cls._clients.popitem(last=False)
+        return client
+    
+    def is_available(self) -> bool:
+        return self.client is not None
+    
+    @_retry_transient
+    def _chat(self, **kwargs):
+        """Chat completion call, rate limited and retried on transient API errors."""
+        self.rate_limiter.acquire(_estimate_request_tokens(kwargs))
+        return self.client.chat.completions.create(**kwargs)
+    
+    def _should_fall_back(self, exc: BaseException, kwargs: Dict) -> bool:
+        """Whether a failed request should be retried once on the fallback model."""
+        return (self.fallback_model is not None and kwargs.get('model') != self.fallback_model
+                and _is_transient_error(exc))
+    
+    def _chat_with_fallback(self, kwargs: Dict) -> Tuple[str, bool]:
+        """
+        Message content for kwargs, retried on the fallback model when the
+        main model's transient-error retries run out.
+
+        Returns:
+            (content, whether the fallback model produced it)
+        """
+        try:
+            return self._chat(**kwargs).choices[0].message.content, False
+        except Exception as e:
+            if not self._should_fall_back(e, kwargs):
+                raise
+            logger.warning(f"{kwargs['model']} unavailable ({e!r}); retrying with {self.fallback_model}")
+            return self._chat(**{**kwargs, 'model': self.fallback_model}).choices[0].message.content, True
+    
+    def _get_response_cache(self):
+        """diskcache.Cache for exact request matches, or None when caching is off."""
+        if not self.cache_enabled:
+            return None
+        if self._response_cache is None:
+            self._response_cache = diskcache.Cache(RESPONSE_CACHE_DIR, size_limit=RESPONSE_CACHE_SIZE_LIMIT)
+        return self._response_cache
+    
+    def _complete(self, **kwargs) -> str:
+        """
+        Message content for a chat completion.
+
+        Served from the response cache when an identical request was answered
+        before; identical requests already in flight on other threads wait for
+        that call instead of issuing their own.
+        """
+        kwargs = _clamp_max_tokens(kwargs)
+        key = _request_cache_key(kwargs)
+        cache = self._get_response_cache()
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = concurrent.futures.Future()
+        if not owner:
+            return future.result()
+        
+        try:
+            content, fell_back = self._chat_with_fallback(kwargs)
+            if cache is not None and not fell_back:
+                cache.set(key, content, expire=RESPONSE_CACHE_TTL)
+            future.set_result(content)
+            return content
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+    
+    async def _acomplete(self, **kwargs) -> str:
+        """Async _complete; identical in-flight requests on this event loop share one task."""
+        kwargs = _clamp_max_tokens(kwargs)
+        key = _request_cache_key(kwargs)
+        cache = self._get_response_cache()
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        
+        # Tasks are loop-bound, so the loop is part of the key
+        inflight_key = (asyncio.get_running_loop(), key)
+        task = self._inflight_async.get(inflight_key)
+        if task is None:
+            task = asyncio.ensure_future(self._acomplete_uncached(key, kwargs))
+            self._inflight_async[inflight_key] = task
+            task.add_done_callback(lambda _: self._inflight_async.pop(inflight_key, None))
+        # Shielded so one cancelled caller does not cancel the call for the others
+        return await asyncio.shield(task)
+    
+    async def _acomplete_uncached(self, key: str, kwargs: Dict) -> str:
+        """API call behind _acomplete, caching the content under key."""
+        try:
+            content = (await self._achat(**kwargs)).choices[0].message.content
+        except Exception as e:
+            if not self._should_fall_back(e, kwargs):
+                raise
+            logger.warning(f"{kwargs['model']} unavailable ({e!r}); retrying with {self.fallback_model}")
+            # Not cached: the next identical request should try the main model again
+            return (await self._achat(**{**kwargs, 'model': self.fallback_model})).choices[0].message.content
+        cache = self._get_response_cache()
+        if cache is not None:
+            cache.set(key, content, expire=RESPONSE_CACHE_TTL)
+        return content
+    
+    def _cached_result(self, key: str) -> Optional[Dict]:
+        """Result stored under a _result_cache_key, or None."""
+        cache = self._get_response_cache()
+        return None if cache is None else cache.get(key)
+    
+    def _store_result(self, key: str, result: Dict) -> Dict:
+        """Cache a successful result under key and return it."""
+        cache = self._get_response_cache()
+        if cache is not None and "error" not in result:
+            cache.set(key, result, expire=RESPONSE_CACHE_TTL)
+        return result
+    
+    def clear_cache(self):
+        """Clear the exact-match response cache and the semantic cache."""
+        cache = self._get_response_cache()
+        if cache is not None:
+            cache.clear()
+        self.semantic_cache.clear()
+    
+    def _new_async_client(self):
+        """AsyncGroq client with its own pooled httpx client."""
+        return _import_sdk('groq').AsyncGroq(api_key=self.api_key, http_client=async_http_client(),
+                                             timeout=API_TIMEOUT, max_retries=0)
+    
+    @_retry_transient
+    async def _achat(self, **kwargs):
+        """Async chat completion call, rate limited and retried on transient API errors."""
+        client = self._get_async_client()
+        await self.rate_limiter.acquire_async(_estimate_request_tokens(kwargs))
+        async with self._async_semaphore:
+            return await client.chat.completions.create(**kwargs)
+    
+    def _analyze_request(self, resume_text: str, job_description: str) -> Dict:
+        """Chat-completion arguments for analyze_resume."""
+        prompt = _load_prompt_template('analyze_resume').substitute(
+            resume_text=_analysis_resume_text(resume_text),
+            job_description=job_description,
+        )
+
+        return dict(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": _ANALYZE_SYSTEM_PROMPT
+                },
+                {"role": "user", "content": prompt}
+            ],
+            # Deterministic scoring: identical inputs get identical scores (and cache hits)
+            temperature=0,
+            seed=DETERMINISTIC_SEED,
+            max_tokens=3000
+        )
+    
+    def quick_score(self, resume_text: str, job_description: str,
+                    skill_match: Optional[Tuple[Set[str], Set[str]]] = None) -> Optional[float]:
+        """
+        Cheap local match score in [0, 1], without an API call.
+
+        Averages the embedding cosine similarity of resume and job description
+        with the share of vocabulary skills from the job description found in
+        the resume (cosine alone when the description names none). Returns
+        None when embeddings are unavailable, since skill overlap alone is
+        too coarse to reject a resume on. skill_match is a local_skill_match()
+        result the caller already has.
+        """
+        vectors = self.semantic_cache.embed_many([resume_text, job_description])
+        if vectors is None:
+            return None
+        similarity = max(0.0, float(vectors[0] @ vectors[1]))
+        found, required = skill_match or self.local_skill_match(resume_text, job_description)
+        if not required:
+            return similarity
+        return (similarity + len(found) / len(required)) / 2
+    
+    def _prescreen(self, resume_text: str, job_description: str) -> Optional[Dict]:
+        """
+        Synthetic analysis for an obvious mismatch or a clear match, or None to
+        run the LLM on the ambiguous middle.
+        """
+        if self.skip_llm_threshold <= 0 and self.skip_llm_high_threshold >= 1:
+            return self._keyword_prescreen(resume_text, job_description)
+        found, required = skill_match = self.local_skill_match(resume_text, job_description)
+        score = self.quick_score(resume_text, job_description, skill_match)
+        if score is None:
+            return self._keyword_prescreen(resume_text, job_description)
+        
+        if score < self.skip_llm_threshold:
+            return _local_analysis(int(score * 40), _LOW_MATCH_SUGGESTION, skill_match)
+        if score >= self.skip_llm_high_threshold and len(required) >= ATS_SKIP_MIN_SKILLS:
+            return _local_analysis(_high_match_score(score, self.skip_llm_high_threshold), _HIGH_MATCH_SUGGESTION, skill_match)
+        return None
+    
+    def analyze_resume(self, resume_text: str, job_description: str) -> Dict:
+        if not self.is_available():
+            return {"error": "Groq API not available. Set GROQ_API_KEY."}
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        cache_key = pair_key(resume_text, job_description)
+        cached, cache_vector = self.semantic_cache.lookup('analyze', resume_text, cache_key)
+        if cached is not None:
+            return dict(cached)
+        prescreened = self._prescreen(resume_text, job_description)
+        if prescreened is not None:
+            return prescreened
+        
+        try:
+            result = {"raw_analysis": self._complete(**self._analyze_request(resume_text, job_description)), "provider": "Groq"}
+            self.semantic_cache.store('analyze', cache_vector, result, cache_key)
+            return result
+        except Exception as e:
+            return {"error": f"Groq API error: {str(e)}"}
+    
+    def analyze_resume_stream(self, resume_text: str, job_description: str) -> Iterator[str]:
+        """
+        Stream the raw analysis text as Groq generates it.
+
+        Yields content deltas; a cached analysis is yielded as a single chunk.
+        The joined text equals analyze_resume()'s raw_analysis and is cached
+        the same way once the stream completes. Errors are raised, not
+        returned, since a partial stream cannot be replaced by an error dict.
+        """
+        if not self.is_available():
+            raise RuntimeError("Groq API not available. Set GROQ_API_KEY.")
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        cache_key = pair_key(resume_text, job_description)
+        cached, cache_vector = self.semantic_cache.lookup('analyze', resume_text, cache_key)
+        if cached is not None:
+            yield cached["raw_analysis"]
+            return
+        prescreened = self._prescreen(resume_text, job_description)
+        if prescreened is not None:
+            yield prescreened["raw_analysis"]
+            return
+        
+        request = _clamp_max_tokens(self._analyze_request(resume_text, job_description))
+        cache = self._get_response_cache()
+        key = _request_cache_key(request) if cache is not None else None
+        content = cache.get(key) if cache is not None else None
+        if content is None:
+            chunks = []
+            for chunk in self._chat(**request, stream=True):
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+            content = "".join(chunks)
+            if cache is not None:
+                cache.set(key, content, expire=RESPONSE_CACHE_TTL)
+        else:
+            yield content
+        self.semantic_cache.store('analyze', cache_vector, {"raw_analysis": content, "provider": "Groq"}, cache_key)
+    
+    async def analyze_resume_async(self, resume_text: str, job_description: str) -> Dict:
+        if not self.is_available():
+            return {"error": "Groq API not available. Set GROQ_API_KEY."}
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        # Embedding is CPU-bound; off the event loop so other requests' I/O keeps flowing
+        cached, cache_vector = await asyncio.to_thread(self.semantic_cache.lookup, 'analyze', resume_text,
+                                                       pair_key(resume_text, job_description))
+        if cached is not None:
+            return dict(cached)
+        return await self._analyze_uncached_async(resume_text, job_description, cache_vector)
+    
+    async def _analyze_uncached_async(self, resume_text: str, job_description: str, cache_vector) -> Dict:
+        """API half of analyze_resume_async, after the semantic cache missed."""
+        prescreened = self._prescreen(resume_text, job_description)
+        if prescreened is not None:
+            return prescreened
+        try:
+            result = {"raw_analysis": await self._acomplete(**self._analyze_request(resume_text, job_description)),
+                      "provider": "Groq"}
+            self.semantic_cache.store('analyze', cache_vector, result, pair_key(resume_text, job_description))
+            return result
+        except Exception as e:
+            return {"error": f"Groq API error: {str(e)}"}
+    
+    async def analyze_resumes_batch(self, resumes: List[str], job_description: str, *,
+                                    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> List[Dict]:
+        """
+        Analyze many resumes against one job description concurrently.
+
+        All resumes (and, for the local pre-filter, the job description) are
+        embedded in one batch and checked against the semantic cache first; only the misses are sent to Groq, at most max_concurrency
+        at a time (the rate limiter and per-loop semaphore still apply).
+
+        Returns:
+            One analysis dict per resume, in input order
+        """
+        if not self.is_available():
+            return [{"error": "Groq API not available. Set GROQ_API_KEY."} for _ in resumes]
+        
+        def prepare() -> Tuple[str, List[str], List[Tuple[Optional[Dict], Any]]]:
+            job = _fit_job_description(job_description, self.model)[0]
+            fitted = [_fit_to_context(resume_text, job_description, self.model)[0] for resume_text in resumes]
+            if self.skip_llm_threshold > 0 or self.skip_llm_high_threshold < 1:
+                # One encode for the pre-filter: quick_score then reads every vector from the LRU
+                self.semantic_cache.embed_many([job, *fitted])
+            return job, fitted, self.semantic_cache.lookup_many('analyze', fitted,
+                                                                [pair_key(resume_text, job) for resume_text in fitted])
+        
+        # Token counting and batch embedding are CPU-bound; run them off the event loop
+        job_description, resumes, lookups = await asyncio.to_thread(prepare)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def analyze_one(resume_text: str, cached, cache_vector) -> Dict:
+            if cached is not None:
+                return dict(cached)
+            async with semaphore:
+                return await self._analyze_uncached_async(resume_text, job_description, cache_vector)
+        
+        return list(await asyncio.gather(*(
+            analyze_one(resume_text, cached, cache_vector)
+            for resume_text, (cached, cache_vector) in zip(resumes, lookups)
+        )))
+    
+    def _optimize_request(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None,
+                          deterministic: bool = False) -> Dict:
+        """Chat-completion arguments for optimize_resume."""
+        prompt = _optimize_prompt('optimize_resume_groq', resume_text, job_description, suggestions, social_links)
+
+        return dict(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": _OPTIMIZE_SYSTEM_PROMPT
+                },
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=_output_token_budget(resume_text),
+            # Creative rewrites by default; deterministic runs are reproducible and cacheable
+            **(dict(temperature=0, seed=DETERMINISTIC_SEED) if deterministic else dict(temperature=0.7))
+        )
+    
+    def optimize_resume(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None,
+                        deterministic: bool = False) -> str:
+        """
+        Create an optimized resume.
+
+        deterministic=True uses temperature 0 with a fixed seed, for
+        reproducible output (tests, automation) and exact cache hits.
+        """
+        if not self.is_available():
+            return "Groq API not available."
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        # The resume, job, suggestions and links change the output, so they must match exactly for a hit
+        cache_key = pair_key(resume_text, job_description, tuple(sorted(_prompt_suggestions(suggestions))),
+                             sorted((social_links or {}).items()))
+        cached, cache_vector = self.semantic_cache.lookup('optimize', resume_text, cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            optimized = self._complete(**self._optimize_request(resume_text, job_description, suggestions, social_links, deterministic))
+            self.semantic_cache.store('optimize', cache_vector, optimized, cache_key)
+            return optimized
+        except Exception as e:
+            return f"Error: {str(e)}"
+    
+    async def optimize_resume_async(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None,
+                                    deterministic: bool = False) -> str:
+        if not self.is_available():
+            return "Groq API not available."
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        cache_key = pair_key(resume_text, job_description, tuple(sorted(_prompt_suggestions(suggestions))),
+                             sorted((social_links or {}).items()))
+        cached, cache_vector = await asyncio.to_thread(self.semantic_cache.lookup, 'optimize', resume_text, cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            optimized = await self._acomplete(**self._optimize_request(resume_text, job_description, suggestions, social_links,
+                                                                         deterministic))
+            self.semantic_cache.store('optimize', cache_vector, optimized, cache_key)
+            return optimized
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    # ========== ENHANCED MULTI-STAGE OPTIMIZATION METHODS ==========
+
+    def _job_analysis_request(self, job_description: str) -> Dict:
+        """Chat-completion arguments for analyze_job_description."""
+        prompt = _load_prompt_template('analyze_job_description').substitute(job_description=job_description)
+
+        return dict(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": _JD_ANALYSIS_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.3,
+            max_tokens=1500
+        )
+
+    def analyze_job_description(self, job_description: str) -> Dict:
+        """
+        Analyze job description to extract key requirements before optimization.
+
+        Returns:
+            Dictionary with extracted requirements, skills, experience level, industry
+        """
         if not self.is_available():
             return {"error": "Groq API not available."}
 
         try:
-            prompt = f"""Analyze this resume for ATS (Applicant Tracking System) compatibility.
+            result = self._complete(**self._job_analysis_request(job_description))
+            return self._parse_job_analysis(result)
+
+        except Exception as e:
+            return {"error": f"Error analyzing job description: {str(e)}"}
+
+    async def analyze_job_description_async(self, job_description: str) -> Dict:
+        """Non-blocking analyze_job_description on the AsyncGroq client."""
+        if not self.is_available():
+            return {"error": "Groq API not available."}
+
+        try:
+            return self._parse_job_analysis(await self._acomplete(**self._job_analysis_request(job_description)))
+        except Exception as e:
+            return {"error": f"Error analyzing job description: {str(e)}"}
+
+    def _parse_job_analysis(self, analysis_text: str) -> Dict:
+        """Parse job analysis text into structured format."""
+        result = {
+            'required_skills': [],
+            'years_of_experience': '',
+            'industry': '',
+            'seniority_level': '',
+            'critical_keywords': [],
+            'ats_keywords': []
+        }
+
+        headings = list(_JOB_ANALYSIS_SECTION_RE.finditer(analysis_text))
+        for i, heading in enumerate(headings):
+            key = heading.group(1).lower()
+            body_end = headings[i + 1].start() if i + 1 < len(headings) else len(analysis_text)
+            body = analysis_text[heading.end():body_end]
+            if isinstance(result[key], list):
+                result[key].extend(_BULLET_LINE_RE.findall(body))
+            else:
+                # Value on the heading line itself, else the first line under it
+                inline = heading.group(2).strip()
+                result[key] = inline or next(
+                    (line.strip() for line in body.splitlines() if line.strip() and not line.strip().endswith(':')), ''
+                )
+
+        return result
+
+    def _stage1_request(self, resume_text: str, job_description: str, job_analysis: Dict) -> Dict:
+        """Chat-completion arguments for stage 1 (content improvement)."""
+        resume_excerpt = _truncate_to_budget(resume_text, STAGE_RESUME_TOKENS)
+        prompt = _load_prompt_template('multi_stage_content').substitute(
+            job_description=_truncate_to_budget(job_description, STAGE_JOB_DESCRIPTION_TOKENS, JOB_DESCRIPTION_QUERY),
+            resume_text=resume_excerpt,
+            seniority_level=job_analysis.get('seniority_level', 'Not specified'),
+            industry=job_analysis.get('industry', 'Not specified'),
+            required_skills=', '.join(job_analysis.get('required_skills', [])[:10]),
+            seniority=job_analysis.get('seniority_level', 'this'),
+        )
+
+        return dict(
+            model=self.model,
+            messages=[
+                _STAGE1_SYSTEM_MESSAGE,
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=_output_token_budget(resume_excerpt)
+        )
+
+    def _stage2_request(self, stage1_resume: str, job_analysis: Dict) -> Dict:
+        """Chat-completion arguments for stage 2 (ATS keyword optimization)."""
+        critical_keywords = job_analysis.get('critical_keywords', [])
+        ats_keywords = job_analysis.get('ats_keywords', [])
+
+        stage1_excerpt = _truncate_to_budget(stage1_resume, STAGE_RESUME_TOKENS)
+
+        prompt = f"""RESUME FROM STAGE 1:
+{stage1_excerpt}
+
+CRITICAL KEYWORDS TO INCORPORATE:
+{', '.join(critical_keywords[:15])}
+
+ATS KEYWORDS:
+{', '.join(ats_keywords[:15])}"""
+
+        return dict(
+            model=self.model,
+            messages=[
+                _STAGE2_SYSTEM_MESSAGE,
+                _STAGE2_INSTRUCTIONS_MESSAGE,
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.6,
+            max_tokens=_output_token_budget(stage1_excerpt)
+        )
+
+    def _stage3_request(self, stage2_resume: str, resume_text: str) -> Dict:
+        """Chat-completion arguments for stage 3 (conversion to structured JSON)."""
+        stage2_excerpt = _truncate_to_budget(stage2_resume, STAGE_RESUME_TOKENS)
+        prompt = f"""RESUME FROM STAGE 2:
+{stage2_excerpt}
+
+ORIGINAL RESUME (for section preservation):
+{_truncate_to_budget(resume_text, STAGE_RESUME_TOKENS)}
+
+SECTIONS DETECTED IN THE ORIGINAL RESUME: {_format_detected_sections(resume_text)}"""
+
+        return dict(
+            model=self.model,
+            messages=[
+                _STAGE3_SYSTEM_MESSAGE,
+                _STAGE3_INSTRUCTIONS_MESSAGE,
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.5,
+            max_tokens=_output_token_budget(stage2_excerpt)
+        )
+
+    def _finish_multi_stage(self, final_resume: str, resume_text: str, job_analysis: Dict) -> Dict:
+        """Clean up the stage 3 output and build the multi-stage result."""
+        critical_keywords = job_analysis.get('critical_keywords', [])
+
+        # Clean up JSON if wrapped in markdown code blocks
+        if final_resume.startswith('```json'):
+            final_resume = final_resume.replace('```json', '').replace('```', '').strip()
+        elif final_resume.startswith('```'):
+            final_resume = final_resume.replace('```', '').strip()
+
+        # Validate it's valid resume JSON
+        try:
+            _parse_and_validate(final_resume)
+        except ValueError as e:
+            # If JSON parsing fails, log the error but return the text anyway
+            # The frontend will handle fallback to text parsing
+            print(f"Warning: Stage 3 didn't return valid JSON: {e}")
+
+        return {
+            "optimized_resume": final_resume,  # JSON format
+            "download_resume": final_resume,  # JSON format
+            "original_resume": resume_text,
+            "stages": {
+                "stage1_content": "Content improved",
+                "stage2_keywords": f"Added {len(critical_keywords)} critical keywords",
+                "stage3_format": "Converted to JSON format"
+            },
+            "multi_stage": True
+        }
+
+    def _single_pass_request(self, resume_text: str, job_description: str, job_analysis: Dict) -> Dict:
+        """Chat-completion arguments running all three stages in one call, separated by stage markers."""
+        stage_prompts = [
+            self._stage1_request(resume_text, job_description, job_analysis),
+            self._stage2_request(f"(the resume you wrote under {_STAGE_MARKERS[0]})", job_analysis),
+            self._stage3_request(f"(the resume you wrote under {_STAGE_MARKERS[1]})", resume_text),
+        ]
+        sections = "\n\n".join(
+            f"{marker}\n" + "\n\n".join(message['content'] for message in request['messages'] if message['role'] == 'user')
+            for marker, request in zip(_STAGE_MARKERS, stage_prompts)
+        )
+        prompt = f"""Complete the three stages below in order, in ONE response. Each stage works on the previous stage's output.
+
+Write each stage's complete output directly after its marker line, exactly as shown:
+{_STAGE_MARKERS[0]}
+[complete improved resume]
+{_STAGE_MARKERS[1]}
+[complete ATS-optimized resume]
+{_STAGE_MARKERS[2]}
+[JSON only]
+
+Stage instructions (the marker before each one is the place for its output):
+
+{sections}"""
+
+        return dict(
+            model=self.model,
+            messages=[
+                _SINGLE_PASS_SYSTEM_MESSAGE,
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.6,
+            max_tokens=sum(request['max_tokens'] for request in stage_prompts)
+        )
+
+    @staticmethod
+    def _final_stage_output(response_text: str) -> str:
+        """The stage 3 output from a single-pass response (text after the last stage 3 marker)."""
+        _, marker, final = response_text.rpartition(_STAGE_MARKERS[2])
+        return (final if marker else response_text).strip()
+
+    def multi_stage_optimize(self, resume_text: str, job_description: str, job_analysis: Dict,
+                             single_pass: bool = False) -> Dict:
+        """
+        Perform multi-stage optimization:
+        Stage 1: Content improvement
+        Stage 2: ATS keyword optimization
+        Stage 3: Format and consistency check
+
+        single_pass=True runs the three stages in one call (two fewer round
+        trips) with the output of each stage after a marker; the default
+        chains three calls, each seeing only its own stage's instructions.
+
+        Returns:
+            Dictionary with final optimized resume and stage details
+        """
+        if not self.is_available():
+            return {"error": "Groq API not available."}
+
+        key = _result_cache_key("multi_stage_optimize", self.model, resume_text, job_description, job_analysis,
+                                single_pass)
+        cached = self._cached_result(key)
+        if cached is not None:
+            return cached
+
+        try:
+            if single_pass:
+                response = self._complete(**self._single_pass_request(resume_text, job_description, job_analysis))
+                final_resume = self._final_stage_output(response)
+            else:
+                # Stage 1: Content Improvement
+                stage1_resume = self._complete(**self._stage1_request(resume_text, job_description, job_analysis)).strip()
+
+                # Stage 2: ATS Keyword Optimization
+                stage2_resume = self._complete(**self._stage2_request(stage1_resume, job_analysis)).strip()
+
+                # Stage 3: Format and Consistency Check - Convert to JSON
+                final_resume = self._complete(**self._stage3_request(stage2_resume, resume_text)).strip()
+
+            return self._store_result(key, self._finish_multi_stage(final_resume, resume_text, job_analysis))
+
+        except Exception as e:
+            return {"error": f"Error in multi-stage optimization: {str(e)}"}
+
+    async def analyze_resume_and_job_async(self, resume_text: str, job_description: str) -> Tuple[Dict, Dict]:
+        """
+        Run the resume analysis and the job description analysis concurrently.
+
+        Neither depends on the other, so latency is the slower of the two calls
+        rather than their sum.
+
+        Returns:
+            (resume_analysis, job_analysis)
+        """
+        resume_analysis, job_analysis = await asyncio.gather(
+            self.analyze_resume_async(resume_text, job_description),
+            self.analyze_job_description_async(job_description)
+        )
+        return resume_analysis, job_analysis
+
+    async def multi_stage_optimize_async(self, resume_text: str, job_description: str, job_analysis: Dict,
+                                         single_pass: bool = False) -> Dict:
+        """Non-blocking multi_stage_optimize; chained stages stay sequential since each needs the previous output."""
+        if not self.is_available():
+            return {"error": "Groq API not available."}
+
+        key = _result_cache_key("multi_stage_optimize", self.model, resume_text, job_description, job_analysis,
+                                single_pass)
+        cached = self._cached_result(key)
+        if cached is not None:
+            return cached
+
+        try:
+            if single_pass:
+                response = await self._acomplete(**self._single_pass_request(resume_text, job_description, job_analysis))
+                final_resume = self._final_stage_output(response)
+            else:
+                stage1_resume = (await self._acomplete(**self._stage1_request(resume_text, job_description, job_analysis))).strip()
+
+                stage2_resume = (await self._acomplete(**self._stage2_request(stage1_resume, job_analysis))).strip()
+
+                final_resume = (await self._acomplete(**self._stage3_request(stage2_resume, resume_text))).strip()
+
+            return self._store_result(key, self._finish_multi_stage(final_resume, resume_text, job_analysis))
+
+        except Exception as e:
+            return {"error": f"Error in multi-stage optimization: {str(e)}"}
+
+    async def multi_stage_optimize_batch(self, requests: List[Tuple[str, str, Dict]], *,
+                                         max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+                                         single_pass: bool = False) -> List[Dict]:
+        """
+        Run multi_stage_optimize_async for many requests concurrently.
+
+        Each (resume_text, job_description, job_analysis) request keeps its
+        own call chain; at most max_concurrency chains run at a time, and the
+        rate limiter and per-loop semaphore still pace the individual calls.
+
+        Returns:
+            One result dict per request, in input order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def optimize_one(resume_text: str, job_description: str, job_analysis: Dict) -> Dict:
+            async with semaphore:
+                return await self.multi_stage_optimize_async(resume_text, job_description, job_analysis,
+                                                             single_pass=single_pass)
+
+        return list(await asyncio.gather(*(optimize_one(*request) for request in requests)))
+
+    def _ats_score_request(self, resume_text: str, job_description: str) -> Dict:
+        """Chat-completion arguments for calculate_ats_score."""
+        prompt = _load_prompt_template('ats_score').substitute(
+            resume_text=_truncate_to_budget(resume_text, ATS_RESUME_TOKENS),
+            job_description=_truncate_to_budget(job_description, ATS_JOB_DESCRIPTION_TOKENS, JOB_DESCRIPTION_QUERY),
+        )
+
+        return dict(
+            model=self.model,
+            messages=[
+                _ATS_SCORE_SYSTEM_MESSAGE,
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=1000
+        )
+
+    def _local_ats_score(self, resume_text: str, job_description: str) -> Optional[Dict]:
+        """
+        Synthetic ATS score when the resume clearly passes, or None to run the LLM.
+
+        Passing means the resume names at least ATS_SKIP_COVERAGE of the job
+        description's vocabulary skills and has experience, education and
+        skills headings. Format is scored on tabs, tables and graphic bullets.
+        """
+        found, required = self.local_skill_match(resume_text, job_description)
+        if len(required) < ATS_SKIP_MIN_SKILLS or len(found) < ATS_SKIP_COVERAGE * len(required):
+            return None
+        headings = {match.split()[-1].lower() for match in _STANDARD_SECTION_RE.findall(resume_text)}
+        if not headings.issuperset(_STANDARD_SECTIONS):
+            return None
+
+        keyword_match = round(100 * len(found) / len(required))
+        format_score = 70 if _ATS_UNFRIENDLY_RE.search(resume_text) else 100
+        return {
+            'keyword_match': keyword_match,
+            'format_score': format_score,
+            'section_score': 100,
+            'overall_score': round((2 * keyword_match + format_score + 100) / 4),
+            'recommendations': [] if format_score == 100 else [
+                "Replace tabs, tables and graphic bullets with plain text and simple '-' bullets"
+            ],
+            'provider': 'local-prescreen'
+        }
 
-RESUME:
-{resume_text[:3000]}
+    def calculate_ats_score(self, resume_text: str, job_description: str) -> Dict:
+        """
+        Calculate ATS compatibility score for common ATS systems.
 
-JOB DESCRIPTION:
-{job_description[:1500]}
+        Checks for: Workday, Greenhouse, Lever compatibility
 
-Evaluate ATS compatibility for common systems (Workday, Greenhouse, Lever):
+        Returns:
+            Dictionary with ATS score and specific recommendations
+        """
+        if not self.is_available():
+            return {"error": "Groq API not available."}
 
-1. KEYWORD MATCH: How well do resume keywords match job description? (0-100)
-2. FORMAT SCORE: Is formatting ATS-friendly? (0-100)
-   - Standard fonts, no tables/columns
-   - Standard section headers
-   - No images or graphics
-   - Simple bullet points
-3. SECTION COMPLETENESS: Are all standard sections present? (0-100)
-4. OVERALL ATS SCORE: (0-100)
+        key = _result_cache_key("calculate_ats_score", self.model, resume_text, job_description)
+        cached = self._cached_result(key)
+        if cached is not None:
+            return cached
+        # Only the same resume, up to whitespace, scores the same against the same job description
+        score_key = pair_key(resume_text, job_description)
+        cached, cache_vector = self.semantic_cache.lookup('ats_score', resume_text, score_key)
+        if cached is not None:
+            return cached
+        local_score = self._local_ats_score(resume_text, job_description)
+        if local_score is not None:
+            return local_score
 
-Provide response in this format:
-KEYWORD_MATCH: [score]
-FORMAT_SCORE: [score]
-SECTION_SCORE: [score]
-OVERALL_SCORE: [score]
+        try:
+            result = self._complete(**self._ats_score_request(resume_text, job_description))
+            score = self._store_result(key, self._parse_ats_score(result))
+            self.semantic_cache.store('ats_score', cache_vector, score, score_key)
+            return score
 
-RECOMMENDATIONS:
-- [specific recommendation 1]
-- [specific recommendation 2]
-..."""
+        except Exception as e:
+            return {"error": f"Error calculating ATS score: {str(e)}"}
 
-            response = self.client.chat.completions.create(
+    def analyze_and_score(self, resume_text: str, job_description: str) -> Tuple[Dict, Dict]:
+        """
+        analyze_resume and calculate_ats_score in a single API call.
+
+        Both prompts share one request (the resume and job description are
+        sent once), with each answer written after its own marker. If the
+        markers are missing from the response, or either result is already
+        cached or answered locally, the two methods are called separately.
+
+        Returns:
+            (analysis, ats_score)
+        """
+        if not self.is_available():
+            error = {"error": "Groq API not available. Set GROQ_API_KEY."}
+            return error, error
+
+        fitted_resume, fitted_job = _fit_to_context(resume_text, job_description, self.model)
+        score_key = _result_cache_key("calculate_ats_score", self.model, resume_text, job_description)
+        analysis_key = pair_key(fitted_resume, fitted_job)
+        cached_analysis, analysis_vector = self.semantic_cache.lookup('analyze', fitted_resume, analysis_key)
+        score_cache_key = pair_key(resume_text, job_description)
+        cached_score, score_vector = self.semantic_cache.lookup('ats_score', resume_text, score_cache_key)
+        if (cached_analysis is not None or cached_score is not None or self._cached_result(score_key) is not None
+                or self._prescreen(fitted_resume, fitted_job) is not None
+                or self._local_ats_score(resume_text, job_description) is not None):
+            return self.analyze_resume(resume_text, job_description), self.calculate_ats_score(resume_text, job_description)
+
+        analyze_request = self._analyze_request(fitted_resume, fitted_job)
+        score_request = self._ats_score_request(resume_text, job_description)
+        prompt = f"""Answer both tasks below in ONE response, each directly after its marker line:
+{_ANALYSIS_MARKER}
+[complete answer to task 1]
+{_ATS_SCORE_MARKER}
+[complete answer to task 2]
+
+TASK 1:
+{analyze_request['messages'][-1]['content']}
+
+TASK 2:
+{score_request['messages'][-1]['content']}"""
+
+        try:
+            content = self._complete(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": "You are an ATS compatibility expert familiar with Workday, Greenhouse, and Lever systems."},
+                    _ANALYZE_AND_SCORE_SYSTEM_MESSAGE,
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.3,
-                max_tokens=1000
+                temperature=0,
+                seed=DETERMINISTIC_SEED,
+                max_tokens=analyze_request['max_tokens'] + score_request['max_tokens']
             )
+        except Exception as e:
+            error = {"error": f"Groq API error: {str(e)}"}
+            return error, error
 
-            result = response.choices[0].message.content
-            return self._parse_ats_score(result)
+        analysis_text, marker, score_text = content.partition(_ATS_SCORE_MARKER)
+        if not marker:
+            return self.analyze_resume(resume_text, job_description), self.calculate_ats_score(resume_text, job_description)
 
-        except Exception as e:
-            return {"error": f"Error calculating ATS score: {str(e)}"}
+        analysis = {"raw_analysis": analysis_text.replace(_ANALYSIS_MARKER, '', 1).strip(), "provider": "Groq"}
+        self.semantic_cache.store('analyze', analysis_vector, analysis, analysis_key)
+        score = self._store_result(score_key, self._parse_ats_score(score_text))
+        self.semantic_cache.store('ats_score', score_vector, score, score_cache_key)
+        return analysis, score
 
     def _parse_ats_score(self, score_text: str) -> Dict:
         """Parse ATS score text into structured format."""
@@ -1027,1929 +2237,1092 @@ RECOMMENDATIONS:
             'recommendations': []
         }
 
-        in_recommendations = False
-        for line in score_text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-
-            if 'KEYWORD_MATCH:' in line:
-                try:
-                    result['keyword_match'] = int(line.split(':')[1].strip())
-                except:
-                    pass
-            elif 'FORMAT_SCORE:' in line:
-                try:
-                    result['format_score'] = int(line.split(':')[1].strip())
-                except:
-                    pass
-            elif 'SECTION_SCORE:' in line:
-                try:
-                    result['section_score'] = int(line.split(':')[1].strip())
-                except:
-                    pass
-            elif 'OVERALL_SCORE:' in line:
-                try:
-                    result['overall_score'] = int(line.split(':')[1].strip())
-                except:
-                    pass
-            elif 'RECOMMENDATIONS:' in line:
-                in_recommendations = True
-            elif in_recommendations and line.startswith('-'):
-                result['recommendations'].append(line.lstrip('- ').strip())
+        for label, score in _ATS_SCORE_RE.findall(score_text):
+            result[label.lower()] = int(score)
+        _, marker, recommendations = score_text.partition('RECOMMENDATIONS:')
+        if marker:
+            result['recommendations'] = _BULLET_LINE_RE.findall(recommendations)
 
         return result
 
 
-class OpenAIProvider(AIProvider):
+# Structured Outputs: the analysis comes back as a JSON object matching ANALYSIS_SCHEMA
+_OPENAI_ANALYSIS_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "resume_analysis",
+        "strict": True,
+        "schema": {**ANALYSIS_SCHEMA, "additionalProperties": False},
+    },
+}
+
+
+class OpenAIProvider(_AsyncSDKProvider):
     """OpenAI GPT Provider."""
     
+    __slots__ = ()
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         self.client = None
         self.model = "gpt-4o-mini"  # Cost-effective model
+        self._async_client = self._async_loop = self._async_semaphore = None
         
-        try:
-            from openai import OpenAI
-            if self.api_key:
-                self.client = OpenAI(api_key=self.api_key)
-        except ImportError:
-            pass
+        openai = _import_sdk('openai') if self.api_key else None
+        if openai is not None:
+            self.client = openai.OpenAI(api_key=self.api_key, timeout=API_TIMEOUT, max_retries=0,
+                                        http_client=shared_http_client())
     
     def is_available(self) -> bool:
         return self.client is not None
     
+    @_retry_transient
+    def _chat(self, **kwargs):
+        """Chat completion call, retried on transient API errors."""
+        return self.client.chat.completions.create(**kwargs)
+    
+    def _new_async_client(self):
+        """AsyncOpenAI client with its own pooled httpx client."""
+        return _import_sdk('openai').AsyncOpenAI(api_key=self.api_key, timeout=API_TIMEOUT, max_retries=0,
+                                                 http_client=async_http_client())
+    
+    @_retry_transient
+    async def _achat(self, **kwargs):
+        """Async chat completion call, retried on transient API errors."""
+        client = self._get_async_client()
+        async with self._async_semaphore:
+            return await client.chat.completions.create(**kwargs)
+    
+    def _analyze_request(self, resume_text: str, job_description: str, structured: bool = False) -> Dict:
+        """Chat-completion arguments for analyze_resume; structured asks for ANALYSIS_SCHEMA JSON instead of text."""
+        prompt = _load_prompt_template('analyze_resume_structured' if structured else 'analyze_resume_openai').substitute(
+            resume_text=_analysis_resume_text(resume_text),
+            job_description=job_description,
+        )
+
+        request = dict(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": _ANALYZE_STRUCTURED_SYSTEM_PROMPT if structured else _ANALYZE_SYSTEM_PROMPT
+                },
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2,  # Lower temperature for more strict scoring
+            max_tokens=3000
+        )
+        if structured:
+            request['response_format'] = _OPENAI_ANALYSIS_FORMAT
+        return request
+    
+    @_cached_response('analyze')
     def analyze_resume(self, resume_text: str, job_description: str) -> Dict:
         if not self.is_available():
             return {"error": "OpenAI API not available. Set OPENAI_API_KEY."}
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        prescreened = self._keyword_prescreen(resume_text, job_description)
+        if prescreened is not None:
+            return prescreened
         
-        prompt = f"""You are a resume analyst. Analyze this resume against the job description and provide a strict, accurate match score.
-
-JOB DESCRIPTION:
-{job_description}
-
-RESUME:
-{resume_text}
-
-SCORING CRITERIA - Evaluate the resume using these specific factors:
-
-1. REQUIRED SKILLS MATCH (50 points - 50% of total score):
-   - CRITICAL: This is the most important factor - it accounts for half of the total score
-   - Identify ALL required technical skills, tools, technologies, and competencies mentioned in the job description
-   - Count how many required skills are present in the resume
-   - Score: (skills_found / skills_required) × 50
-   - Example: If job requires 10 skills and resume has 6, score = (6/10) × 50 = 30 points
-   - Example: If job requires 8 skills and resume has 8, score = (8/8) × 50 = 50 points
-   - Be thorough in identifying skills - include programming languages, frameworks, tools, methodologies, soft skills, certifications, etc.
-
-2. EXPERIENCE LEVEL MATCH (20 points):
-   - Check if experience level matches (Junior, Mid-level, Senior, Lead, Principal, etc.)
-   - Perfect match: 20 points
-   - One level off (e.g., Mid applying to Senior): 12 points
-   - Two+ levels off (e.g., Junior applying to Senior): 5 points
-   - No clear level in resume: 8 points
-
-3. YEARS OF EXPERIENCE (12 points):
-   - Compare required years of experience vs. candidate's total experience
-   - Meets or exceeds requirement: 12 points
-   - Within 1-2 years: 8 points
-   - Within 3-4 years: 4 points
-   - More than 4 years short: 0 points
-   - No requirement specified: 6 points (neutral)
-
-4. JOB TITLE RELEVANCE (10 points):
-   - Check if candidate's current/past job titles are relevant to the target role
-   - Exact or very similar title: 10 points
-   - Related title in same field: 7 points
-   - Different field but transferable skills: 3 points
-   - Completely unrelated: 0 points
-
-5. EDUCATION REQUIREMENTS (5 points):
-   - Check if education level matches (Bachelor's, Master's, PhD, etc.)
-   - Meets requirement: 5 points
-   - One level below: 3 points
-   - Two+ levels below: 0 points
-   - No requirement specified: 2.5 points (neutral)
-
-6. INDUSTRY/DOMAIN EXPERIENCE (3 points):
-   - Check if candidate has experience in the same or related industry
-   - Same industry: 3 points
-   - Related industry: 2 points
-   - Different industry: 0 points
-   - No industry specified in job: 1.5 points (neutral)
-
-TOTAL SCORE CALCULATION:
-- Add up all 6 factors (max 100 points)
-- Required Skills Match = 50 points (50% of total)
-- Other factors = 50 points combined (50% of total)
-- Round to nearest whole number
-- This is your MATCH_SCORE
-
-SCORING GUIDELINES:
-- 0-40%: Missing most required skills, significant experience level mismatch, or major gaps
-- 40-70%: Has some required skills and relevant experience, but missing key requirements
-- 70-100%: Meets most/all requirements, strong skill match, appropriate experience level
-
-Be STRICT - only give 70+ if the candidate truly meets most requirements.
-
-Provide your analysis in this EXACT format:
-
-MATCH_SCORE: [number 0-100]
-STRENGTHS:
-- [strength 1]
-- [strength 2]
-
-IMPROVEMENTS_NEEDED:
-- [improvement 1]
-- [improvement 2]
-
-CONTENT_SUGGESTIONS:
-1. [Section]: [What to change] - [Why] - [How]
-2. [Section]: [What to change] - [Why] - [How]
-
-Start with "MATCH_SCORE:" immediately."""
+        try:
+            response = self._chat(**self._analyze_request(resume_text, job_description, structured=True))
+            return _structured_analysis(_json_loads(response.choices[0].message.content), "OpenAI")
+        except Exception as e:
+            return {"error": f"OpenAI API error: {str(e)}"}
+    
+    def analyze_resume_stream(self, resume_text: str, job_description: str) -> Iterator[str]:
+        """
+        Stream the raw analysis text as OpenAI generates it.
 
+        Errors are raised, not returned, since a partial stream cannot be
+        replaced by an error dict. Closing the generator closes the HTTP stream.
+        """
+        if not self.is_available():
+            raise RuntimeError("OpenAI API not available. Set OPENAI_API_KEY.")
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        prescreened = self._keyword_prescreen(resume_text, job_description)
+        if prescreened is not None:
+            yield prescreened["raw_analysis"]
+            return
+        
+        for chunk in self._chat(**self._analyze_request(resume_text, job_description), stream=True):
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
+    
+    @_cached_response('analyze')
+    async def analyze_resume_async(self, resume_text: str, job_description: str) -> Dict:
+        if not self.is_available():
+            return {"error": "OpenAI API not available. Set OPENAI_API_KEY."}
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        prescreened = self._keyword_prescreen(resume_text, job_description)
+        if prescreened is not None:
+            return prescreened
+        
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a strict resume analyst. Evaluate resumes using a structured scoring framework: 1. Required Skills Match (50 points - 50% of total) - CRITICAL, count ALL skills found vs required (technical skills, tools, technologies, competencies). 2. Experience Level Match (20 points) - check if levels align. 3. Years of Experience (12 points) - compare required vs actual. 4. Job Title Relevance (10 points) - assess title similarity. 5. Education Requirements (5 points) - check education level match. 6. Industry/Domain Experience (3 points) - evaluate industry alignment. Calculate total (max 100) and round to nearest whole number. Skills match is 50% of score - be thorough in identifying and matching skills. Be STRICT: 0-40% = missing most requirements, 40-70% = some requirements met, 70-100% = most/all requirements met. Always provide score in format: MATCH_SCORE: [number]."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,  # Lower temperature for more strict scoring
-                max_tokens=3000
-            )
-            return {"raw_analysis": response.choices[0].message.content, "provider": "OpenAI"}
+            response = await self._achat(**self._analyze_request(resume_text, job_description, structured=True))
+            return _structured_analysis(_json_loads(response.choices[0].message.content), "OpenAI")
         except Exception as e:
             return {"error": f"OpenAI API error: {str(e)}"}
     
+    def analysis_batch_available(self) -> bool:
+        """Whether the installed SDK has the Batch API (the pinned openai==1.3.0 predates it)."""
+        return self.client is not None and hasattr(self.client, 'batches')
+    
+    def _batch_lines(self, pairs: List[Tuple[str, str]]) -> str:
+        """Batch API input file: one structured-output chat request per pair, custom_id = its index."""
+        lines = []
+        for i, (resume_text, job_description) in enumerate(pairs):
+            resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+            lines.append(json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._analyze_request(resume_text, job_description, structured=True),
+            }))
+        return "\n".join(lines)
+    
+    def submit_analysis_batch(self, pairs: List[Tuple[str, str]]) -> str:
+        """
+        Upload (resume_text, job_description) analyses as a JSONL file and start
+        a Batch API job over it (half price, done within 24 hours); returns the
+        batch id for analysis_batch_results().
+        """
+        if not self.analysis_batch_available():
+            raise RuntimeError("OpenAI Batch API not available; it needs a newer openai SDK and OPENAI_API_KEY.")
+        batch_file = self.client.files.create(file=("analyses.jsonl", self._batch_lines(pairs).encode('utf-8')),
+                                              purpose="batch")
+        batch = self.client.batches.create(input_file_id=batch_file.id, endpoint="/v1/chat/completions",
+                                           completion_window="24h")
+        return batch.id
+    
+    def analysis_batch_results(self, batch_id: str) -> Optional[List[Dict]]:
+        """
+        Analyses of a finished batch in submission order, or None while it is
+        still running. Requests missing from the output file (failed or
+        expired) get error dicts.
+        """
+        if not self.analysis_batch_available():
+            raise RuntimeError("OpenAI Batch API not available; it needs a newer openai SDK and OPENAI_API_KEY.")
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in ("validating", "in_progress", "finalizing", "cancelling"):
+            return None
+        if batch.status not in ("completed", "expired"):
+            raise RuntimeError(f"OpenAI batch {batch_id} {batch.status}")
+        results = [{"error": "OpenAI API error: batch request failed or expired"}
+                   for _ in range(batch.request_counts.total)]
+        if batch.output_file_id:
+            for line in self.client.files.content(batch.output_file_id).content.splitlines():
+                item = _json_loads(line)
+                response = item.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                try:
+                    content = response["body"]["choices"][0]["message"]["content"]
+                    results[int(item["custom_id"])] = _structured_analysis(_json_loads(content), "OpenAI")
+                except (KeyError, IndexError, ValueError, TypeError):
+                    pass
+        return results
+    
+    def _optimize_request(self, resume_text: str, job_description: str, suggestions: List[str],
+                          social_links: Optional[Dict] = None) -> Dict:
+        """Chat-completion arguments for optimize_resume."""
+        prompt = _optimize_prompt('optimize_resume', resume_text, job_description, suggestions, social_links)
+
+        return dict(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": _optimize_rules()
+                },
+                {"role": "user", "content": prompt}
+            ],
+            temperature=OPTIMIZE_TEMPERATURE,
+            max_tokens=_output_token_budget(resume_text)
+        )
+    
+    @_cached_response('optimize')
     def optimize_resume(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None) -> str:
         if not self.is_available():
             return "OpenAI API not available."
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
         
-        # Prepare social links information for the prompt
-        social_links_info = ""
-        if social_links:
-            if social_links.get('linkedin'):
-                social_links_info += f"\nLinkedIn URL from original resume: {social_links['linkedin']}"
-            if social_links.get('github'):
-                social_links_info += f"\nGitHub URL from original resume: {social_links['github']}"
+        try:
+            response = self._chat(**self._optimize_request(resume_text, job_description, suggestions, social_links))
+            return response.choices[0].message.content
+        except Exception as e:
+            return f"Error: {str(e)}"
+    
+    @_cached_response('optimize')
+    async def optimize_resume_async(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None) -> str:
+        if not self.is_available():
+            return "OpenAI API not available."
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
         
-        prompt = f"""You are an expert resume writer. Create an optimized version of this resume that is specifically tailored to match the job description.
+        try:
+            response = await self._achat(**self._optimize_request(resume_text, job_description, suggestions, social_links))
+            return response.choices[0].message.content
+        except Exception as e:
+            return f"Error: {str(e)}"
 
-ORIGINAL RESUME:
-{resume_text}
 
-JOB DESCRIPTION:
-{job_description}
+# Claude models in order of preference; the first one the key can use is
+# remembered on disk so later runs skip probing the list.
+CLAUDE_MODELS = (
+    "claude-3-5-sonnet-20240620",
+    "claude-3-5-sonnet",
+    "claude-3-opus-20240229",
+    "claude-3-sonnet-20240229",
+    "claude-3-haiku-20240307",
+)
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', os.path.expanduser('~/.cache/resumeopt'))
+
+
+def _is_model_not_found(error: Exception) -> bool:
+    """True for API errors reporting an unknown or inaccessible model."""
+    message = str(error).lower()
+    return "not_found" in message or "not found" in message or "404" in message
+
+
+def _model_cache_path(provider: str, api_key: Optional[str] = None) -> str:
+    """File holding provider's known-good model; per API key when one is given, since access differs by key."""
+    name = provider
+    if api_key:
+        name += '_' + hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(MODEL_CACHE_DIR, name + '_model')
+
+
+def _read_cached_model(provider: str, api_key: Optional[str] = None) -> Optional[str]:
+    """Last known-good model name for provider (and api_key), or None."""
+    try:
+        with open(_model_cache_path(provider, api_key), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _write_cached_model(provider: str, model: Optional[str], api_key: Optional[str] = None):
+    """Remember (or, with None, forget) the working model name for provider (and api_key)."""
+    path = _model_cache_path(provider, api_key)
+    try:
+        if model is None:
+            os.remove(path)
+        else:
+            os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(model)
+    except OSError as e:
+        logger.debug(f"Could not update cached {provider} model: {e}")
+
+
+# Resolved Claude model by sha256(API key), for this process
+_claude_models: Dict[str, str] = {}
+_claude_models_lock = threading.Lock()
+
+
+def _resolve_claude_model(client, api_key: str) -> Optional[str]:
+    """
+    Most preferred Claude model api_key can use, resolved once per process and key.
+
+    The on-disk choice from a previous run is trusted as is; otherwise the
+    candidates are probed in preference order with a 1-token request, stopping
+    at the first that answers. Models that are not found are skipped, and so
+    are other errors (a 429, say); the winner is only persisted when every
+    more preferred model was not found, so a transient error does not pin a
+    lesser model for good.
+    """
+    digest = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+    model = _claude_models.get(digest) or _read_cached_model('claude', api_key)
+    if model:
+        _claude_models[digest] = model
+        return model
+
+    skipped_transient = False
+    for model in CLAUDE_MODELS:
+        try:
+            client.messages.create(model=model, max_tokens=1, messages=[{"role": "user", "content": "ping"}])
+        except Exception as e:
+            if not _is_model_not_found(e):
+                logger.warning(f"Claude model probe for {model} failed: {e}")
+                skipped_transient = True
+            continue
+        with _claude_models_lock:
+            _claude_models[digest] = model
+        if not skipped_transient:
+            _write_cached_model('claude', model, api_key)
+        return model
+    return None
 
-SUGGESTIONS TO IMPLEMENT:
-{chr(10).join(suggestions[:10])}
-{social_links_info}
 
-CRITICAL: If the original resume contains LinkedIn or GitHub links, you MUST preserve them in the header contact line with their full URLs.
+def _forget_claude_model(api_key: str):
+    """Drop api_key's resolved Claude model after it stops working, so the next call probes again."""
+    with _claude_models_lock:
+        _claude_models.pop(hashlib.sha256(api_key.encode('utf-8')).hexdigest(), None)
+    _write_cached_model('claude', None, api_key)
 
-🚨 CRITICAL MANDATORY REQUIREMENT FOR EXPERIENCE SECTION 🚨
-YOU MUST COMPLETELY REWRITE EVERY EXPERIENCE BULLET POINT. DO NOT just add keywords or make minor edits.
-EACH BULLET MUST BE TRANSFORMED with actual content improvements, metrics, and job-relevant achievements.
 
-EXPERIENCE SECTION RULES (MANDATORY - APPLY TO EVERY BULLET):
-1. MANDATORY REWRITE: You MUST rewrite each bullet point from scratch. DO NOT copy-paste or make minor edits.
-   - If original says "Worked on projects" → Rewrite to "Designed and deployed 3 microservices using Python and Docker, reducing API response time by 45% and handling 50K+ requests daily"
-   - If original says "Managed team" → Rewrite to "Led cross-functional team of 5 engineers, implementing Agile practices that increased sprint velocity by 30% and reduced bug reports by 25%"
-   - Transform vague statements into specific, measurable achievements
-
-2. STRUCTURE (MANDATORY): Every bullet MUST use Problem → Action → Result OR Task → Tools → Impact format
-   - Example: "Addressed [specific problem] by implementing [specific solution] using [technologies], resulting in [quantifiable improvement]"
-   - Example: "Developed [specific feature/system] using [tools/tech], improving [metric] by [percentage/amount] and [business impact]"
-
-3. ACTION VERBS (MANDATORY): Use strong, varied verbs - DO NOT repeat verbs across bullets
-   - Use: Designed, Built, Implemented, Led, Automated, Analyzed, Developed, Optimized, Increased, Reduced, Managed, Created, Deployed, Architected, Streamlined, Accelerated, Transformed, etc.
-   - Vary verbs: If first bullet uses "Developed", second should use "Architected" or "Built", not "Developed" again
-
-4. QUANTITATIVE METRICS (MANDATORY): Every bullet MUST include at least ONE measurable metric:
-   - Numbers: "3 applications", "50K users", "5 team members"
-   - Percentages: "40% faster", "25% reduction", "30% increase"
-   - Time: "reduced from 5 hours to 30 minutes", "deployed in 2 weeks"
-   - Money: "$50K saved", "revenue increased by $200K"
-   - Scale: "serving 1M+ requests", "processing 10TB data daily"
-   - If original has no metrics, ADD realistic, job-relevant metrics based on the work described
-
-5. JOB RELEVANCE (MANDATORY): Every bullet MUST connect to job description requirements:
-   - Identify key technologies/tools from job description
-   - Identify key responsibilities/outcomes from job description
-   - Rewrite bullets to demonstrate experience with those technologies/responsibilities
-   - Example: If job requires "cloud deployment" and original says "deployed applications", rewrite to "Deployed scalable applications on AWS using EC2, S3, and Lambda, achieving 99.9% uptime and reducing infrastructure costs by 35%"
-
-6. SPECIFIC STRUCTURES (Use when relevant):
-   - "Addressed [specific problem] by using [technology/tool] to [specific action], improving [metric] by [%/amount] and [business impact]"
-   - "Collaborated with [specific teams/stakeholders] to [specific action], resulting in [quantifiable outcome] and [business value]"
-   - "Designed and implemented [specific solution] using [technologies], reducing [metric] by [amount] and enabling [business outcome]"
-
-7. TONE: Natural, business-professional, real resume writing style - NO generic/AI-style language
-
-8. AVOID filler phrases: NO 'leveraged cutting-edge', 'utilized synergistic', 'dynamic environment', 'synergistic solutions', 'passionate about', or vague wording
-
-9. CONTENT: Specific, measurable, aligned with industry expectations and job requirements
-
-10. VARIETY: Do NOT repeat sentence structures - vary your approach across bullets
-
-11. QUANTITY: Provide 4-6 bullet points per position (expand if original has fewer, consolidate if original has too many)
-
-12. BALANCE (CRITICAL): Maintain a 50/50 balance between quantifiable and technical points:
-    - 50% of bullets should be QUANTIFIABLE (heavy on metrics, numbers, percentages, measurable results)
-    - 50% of bullets should be TECHNICAL (job-relevant technical skills, technologies, implementations, but WITHOUT metrics/numbers)
-    - Example of quantifiable (50%): "Designed and deployed 3 microservices using Python and Docker, reducing API response time by 45% and handling 50K+ requests daily"
-    - Example of technical non-quantifiable (50%): "Architected microservices infrastructure using Docker, Kubernetes, and AWS ECS, implementing service mesh patterns and container orchestration best practices"
-    - Example of technical non-quantifiable (50%): "Developed RESTful APIs following OpenAPI specifications, implementing OAuth 2.0 authentication and JWT token management for secure access control"
-    - Example of technical non-quantifiable (50%): "Built data processing pipelines using Apache Spark and Kafka, implementing stream processing patterns and event-driven architecture for real-time analytics"
-    - For 4 bullets: 2 should be quantifiable, 2 should be technical (no metrics)
-    - For 5 bullets: 2-3 should be quantifiable, 2-3 should be technical (no metrics)
-    - For 6 bullets: 3 should be quantifiable, 3 should be technical (no metrics)
-    - DO NOT include soft skills (leadership, collaboration, strategic thinking) - focus ONLY on technical implementations, architectures, and technologies
-
-13. KEYWORDS: Include relevant keywords from job description NATURALLY within the rewritten content - NO keyword stuffing
-
-14. LEARNING: Extract and incorporate skills/technologies from BOTH job description AND candidate's resume
-
-15. TECHNICAL NON-QUANTIFIABLE BULLETS: For the 50% technical bullets (without metrics), focus on:
-    - Technical implementations and architectures (microservices, APIs, data pipelines, etc.)
-    - Technologies and tools from job description (Docker, Kubernetes, AWS services, frameworks, etc.)
-    - Technical patterns and best practices (RESTful design, event-driven architecture, etc.)
-    - System design and technical solutions
-    - Integration with specific technologies or platforms
-    - DO NOT include soft skills, leadership, collaboration, or strategic thinking
-    - These bullets should demonstrate technical depth and job-relevant technical expertise
-
-EXPERIENCE REWRITING EXAMPLES (MANDATORY TRANSFORMATION):
-
-BEFORE: "Worked on software development projects"
-AFTER: "Designed and built 3 enterprise applications using Python, React, and PostgreSQL, reducing API processing time by 40%, serving 10,000+ daily active users, and improving system reliability to 99.9% uptime"
-
-BEFORE: "Managed database operations"
-AFTER: "Addressed performance bottlenecks by implementing database indexing strategies and query optimization techniques, improving average query response time by 60% (from 2.5s to 1s), reducing server infrastructure costs by $50K annually, and enabling real-time analytics for 5K+ concurrent users"
-
-BEFORE: "Responsible for team coordination"
-AFTER: "Led cross-functional team of 8 engineers and 3 product managers, implementing Agile/Scrum methodologies that increased sprint velocity by 35%, reduced production bugs by 28%, and accelerated feature delivery from 4 weeks to 2.5 weeks average"
-
-BEFORE: "Used machine learning for data analysis"
-AFTER: "Developed and deployed machine learning models using Python, scikit-learn, and TensorFlow, improving prediction accuracy from 72% to 89%, processing 2M+ data points daily, and enabling automated decision-making that saved 20 hours/week of manual analysis"
-
-BEFORE: "Worked on backend systems"
-AFTER (TECHNICAL NON-QUANTIFIABLE - 50%): "Architected microservices infrastructure using Docker, Kubernetes, and AWS ECS, implementing service mesh patterns with Istio and container orchestration best practices for scalable distributed systems"
-
-BEFORE: "Developed APIs"
-AFTER (TECHNICAL NON-QUANTIFIABLE - 50%): "Designed and implemented RESTful APIs following OpenAPI 3.0 specifications, integrating OAuth 2.0 authentication, JWT token management, and rate limiting middleware for secure and scalable API architecture"
-
-⚠️ CRITICAL: Notice how each "AFTER" example:
-- Completely rewrites the content (not just adds keywords)
-- Includes specific technologies from job description (for quantifiable bullets)
-- Adds multiple quantitative metrics (for 70% of bullets)
-- Shows clear business impact (for 50% quantifiable bullets) or demonstrates technical depth and job-relevant technologies (for 50% technical bullets)
-- Uses varied, strong action verbs
-- Follows Problem → Action → Result structure
-- Maintains 50/50 balance: Half the bullets are quantifiable with metrics, half focus on technical implementations and technologies without metrics
-
-CRITICAL FORMATTING REQUIREMENTS - Follow this EXACT structure:
-
-1. HEADER (First Line):
-   [Full Name]
-   [Job Title/Position]
-   Location: [City, State] | Email: [email] | Phone: [phone] | LinkedIn: [linkedin_url] | GitHub: [github_url]
-   
-   IMPORTANT: If the original resume contains LinkedIn or GitHub links, you MUST include them in the contact line with their full URLs.
-   - Extract the actual URLs from the original resume (they are provided above if found)
-   - Format: "LinkedIn: https://linkedin.com/in/username" or "GitHub: https://github.com/username"
-   - Only include links that exist in the original resume
-   - If no LinkedIn/GitHub in original, omit them
-
-2. SUMMARY Section:
-   SUMMARY
-   [2-3 sentences summarizing experience and key qualifications relevant to the job]
-
-3. SKILLS Section:
-   SKILLS
-   [Category 1]: [skill1], [skill2], [skill3]
-   [Category 2]: [skill1], [skill2], [skill3]
-   [Category 3]: [skill1], [skill2], [skill3]
-
-   Common categories: Methodologies, Languages, IDEs, Packages/Libraries, Visualization Tools, Database, Other Skills, Operating System
-
-   CRITICAL SKILLS SECTION OPTIMIZATION (MANDATORY):
-   - ADD missing job-relevant skills from the job description to the SKILLS section (e.g., programming languages, tools, technologies, frameworks, methodologies)
-   - REORGANIZE skills to put most relevant skills for the job first within each category
-   - GROUP related skills together using appropriate categories (e.g., "Programming Languages:", "Tools & Technologies:", "Frameworks & Libraries:", "Methodologies:")
-   - REMOVE outdated or irrelevant skills that don't match the job requirements
-   - Include ALL key technical requirements mentioned in the job description
-   - Make the SKILLS section comprehensive and keyword-rich for ATS optimization while keeping it natural and credible
-   - DO NOT include skills that the candidate clearly doesn't have based on their experience
-
-4. EXPERIENCE Section:
-   EXPERIENCE
-   [Company Name], [Location] | [Start Date] - [End Date or Current] | [Job Title]
-   • [Bullet point describing achievement with metrics if possible]
-   • [Bullet point describing achievement with metrics if possible]
-   • [Bullet point describing achievement with metrics if possible]
-   
-   [Next Company], [Location] | [Start Date] - [End Date] | [Job Title]
-   • [Bullet point]
-   • [Bullet point]
-
-
-5. EDUCATION Section (ONLY if original resume has education):
-   EDUCATION
-   [Degree Name]: [University Name], [Location]
-   [Degree Name]: [University Name], [Location]
-   
-   ⚠️ CRITICAL: ONLY include education entries that exist in the original resume. 
-   - DO NOT add any education (Bachelor's, Master's, PhD, etc.) if it is NOT mentioned in the original resume
-   - Copy and paste education information exactly as it appears in the original resume
-   - If the original resume has no education section, DO NOT create one
-   - If the original resume only has a Master's degree, DO NOT add a Bachelor's degree
-   - Only include what is explicitly stated in the original resume
-
-6. PROJECTS Section (ONLY if original resume has projects):
-   PROJECTS
-   [Project Name] | [Technologies Used] | [Date or Duration]
-   • [Description of project and achievements]
-   • [Key features or results]
-   
-   [Next Project Name] | [Technologies Used] | [Date or Duration]
-   • [Description]
-   • [Key features or results]
-   
-   ⚠️ CRITICAL: Check for project sections using these common names (case-insensitive):
-   - "PROJECTS", "ACADEMIC PROJECTS", "SCHOOL PROJECTS", "PERSONAL PROJECTS"
-   - "SIDE PROJECTS", "PORTFOLIO PROJECTS", "CAPSTONE PROJECTS", "RESEARCH PROJECTS"
-   - "INDIVIDUAL PROJECTS", "TEAM PROJECTS", "GROUP PROJECTS", "COURSE PROJECTS"
-   - "UNIVERSITY PROJECTS", "COLLEGE PROJECTS", or any section containing the word "PROJECT"
-   - If ANY of these exist in the original resume, include the PROJECTS section
-   - If NONE of these exist, do NOT add a PROJECTS section
-
-IMPORTANT INSTRUCTIONS:
-- Maintain ALL original information - only enhance and optimize, don't remove truthful content
-- Use the EXACT section headers: SUMMARY, SKILLS, EXPERIENCE, EDUCATION (all caps)
-- Include EDUCATION section ONLY if the original resume has an education section - do NOT add education if it doesn't exist in the original
-- Include PROJECTS section ONLY if the original resume has a projects section (check for: "PROJECTS", "ACADEMIC PROJECTS", "SCHOOL PROJECTS", "PERSONAL PROJECTS", "SIDE PROJECTS", "PORTFOLIO PROJECTS", "CAPSTONE PROJECTS", "RESEARCH PROJECTS", "INDIVIDUAL PROJECTS", "TEAM PROJECTS", "GROUP PROJECTS", "COURSE PROJECTS", "UNIVERSITY PROJECTS", "COLLEGE PROJECTS", or any section containing "PROJECT") - do NOT add projects if they don't exist in the original
-- CRITICAL: For EDUCATION section, ONLY copy education entries that are explicitly mentioned in the original resume. DO NOT add Bachelor's, Master's, or any other degree if it is not in the original resume
-- For experience entries, use format: "Company, Location | Date Range | Position"
-- For projects, use format: "Project Name | Technologies | Date/Duration"
-- Use bullet points (•) for experience and project descriptions
-
-⚠️ REMINDER: For EXPERIENCE section bullets, apply the rules specified at the top of this prompt (Problem → Action → Result format, varied action verbs, specific structures, natural tone, no filler phrases, 4-6 bullets, metrics, etc.)
-
-- Reorder experience to highlight most relevant positions first
-- Keep formatting clean and professional
+def _message_text(message) -> str:
+    """Text of a Messages API response."""
+    return message.content[0].text
 
-OUTPUT FORMAT - RETURN ONLY VALID JSON (NO OTHER TEXT):
-Return the optimized resume as a JSON object with this EXACT structure:
 
-{{
-  "name": "Full Name",
-  "title": "Job Title/Position",
-  "contact": ["Location: City, State", "Email: email@example.com", "Phone: (123) 456-7890", "LinkedIn: https://linkedin.com/in/username", "GitHub: https://github.com/username"],
-  "summary": "Complete summary paragraph as single string",
-  "skills": {{
-    "Category 1": ["skill1", "skill2", "skill3"],
-    "Category 2": ["skill1", "skill2", "skill3"]
-  }},
-  "experience": [
-    {{
-      "company": "Company Name",
-      "location": "City, State",
-      "dates": "Start Date - End Date",
-      "title": "Job Title",
-      "bullets": [
-        "First bullet point with achievements and metrics",
-        "Second bullet point with achievements and metrics"
-      ]
-    }}
-  ],
-  "education": [
-    {{
-      "degree": "Degree Name",
-      "institution": "University Name",
-      "location": "City, State"
-    }}
-  ],
-  "certifications": [
-    "Certification exactly as written in original resume (e.g., AWS Certified Solutions Architect, 2023)",
-    "Another certification"
-  ],
-  "projects": [
-    {{
-      "name": "Project Name",
-      "technologies": "Tech stack used",
-      "date": "Date or Duration",
-      "bullets": [
-        "Project description and achievements",
-        "Key features or results"
-      ]
-    }}
-  ],
-  "awards": [
-    "Award exactly as written in original resume",
-    "Another award or honor"
-  ],
-  "publications": [
-    "Publication exactly as written in original resume",
-    "Another publication"
-  ],
-  "volunteer": [
-    "Volunteer work exactly as written in original resume",
-    "Another volunteer experience"
-  ]
-}}
+def _tool_input(message) -> Optional[Dict]:
+    """Input of the first tool call in a Messages API response (already decoded by the SDK)."""
+    return next((block.input for block in message.content if block.type == "tool_use"), None)
 
-CRITICAL JSON RULES:
-- Return ONLY valid JSON - no markdown, no explanations, no code blocks
-- Include sections ONLY if they exist in original resume:
-  * "education" - Check for: EDUCATION, ACADEMIC BACKGROUND, QUALIFICATIONS, ACADEMIC QUALIFICATIONS
-  * "certifications" - Check for: CERTIFICATIONS, CERTIFICATES, PROFESSIONAL CERTIFICATIONS, LICENSES, LICENSE & CERTIFICATIONS
-  * "projects" - Check for: PROJECTS, ACADEMIC PROJECTS, PERSONAL PROJECTS, SIDE PROJECTS, PORTFOLIO
-  * "awards" - Check for: AWARDS, HONORS, ACHIEVEMENTS, HONORS & AWARDS, RECOGNITION
-  * "publications" - Check for: PUBLICATIONS, RESEARCH, PAPERS, PUBLISHED WORK
-  * "volunteer" - Check for: VOLUNTEER, VOLUNTEER WORK, VOLUNTEER EXPERIENCE, COMMUNITY SERVICE
-- If a section doesn't exist in original resume, DO NOT include it in JSON
-- Preserve original formatting for certifications, awards, publications, volunteer (copy exactly as written)
-- All strings must be properly escaped
-- Contact array MUST include ALL contact info from original: Location, Email, Phone, LinkedIn, GitHub (include all that are present)
-- Experience bullets must follow all the rules specified above (metrics, rewriting, etc.)
-- Section order in output: summary → skills → experience → education → certifications → projects → awards → publications → volunteer"""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert resume writer specializing in tailoring resumes to specific job descriptions. 🚨 CRITICAL MANDATORY REQUIREMENT: You MUST completely rewrite every experience bullet point from scratch. DO NOT just add keywords or make minor edits. Each bullet must be transformed with: (1) Specific quantitative metrics (numbers, percentages, time, money, scale) for 50% of bullets, (2) Job-relevant technologies/tools from the job description, (3) Problem → Action → Result structure, (4) Strong, varied action verbs (never repeat verbs), (5) Clear business impact. CRITICAL BALANCE: Maintain 50% quantifiable bullets (heavy on metrics) and 50% technical bullets (technical implementations, architectures, technologies matching job description, but WITHOUT metrics). DO NOT include soft skills like leadership, collaboration, or strategic thinking. For 4 bullets: 2 quantifiable, 2 technical. For 5 bullets: 2-3 quantifiable, 2-3 technical. For 6 bullets: 3 quantifiable, 3 technical. If original bullet says 'Worked on projects', rewrite to 'Designed and deployed 3 microservices using Python and Docker, reducing API response time by 45% and handling 50K+ requests daily'. Transform vague statements into specific, measurable achievements that directly connect to job requirements. Use natural, business-professional tone - NO generic/AI-style language. Provide 4-6 bullets per position. Maintain truthfulness while making content significantly more compelling and job-relevant."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=4000
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"Error: {str(e)}"
+# System prompts for Claude's analysis requests; the structured one, for
+# record_analysis tool calls (formatted by the schema), has no text format
+_CLAUDE_ANALYZE_STRUCTURED_SYSTEM_PROMPT = "You are a strict resume analyst. Evaluate resumes using a structured scoring framework: 1. Required Skills Match (30 points) - count skills found vs required. 2. Experience Level Match (25 points) - check if levels align. 3. Years of Experience (15 points) - compare required vs actual. 4. Job Title Relevance (15 points) - assess title similarity. 5. Education Requirements (10 points) - check education level match. 6. Industry/Domain Experience (5 points) - evaluate industry alignment. Calculate total (max 100) and round to nearest whole number. Be STRICT: 0-40% = missing most requirements, 40-70% = some requirements met, 70-100% = most/all requirements met."
+_CLAUDE_ANALYZE_SYSTEM_PROMPT = _CLAUDE_ANALYZE_STRUCTURED_SYSTEM_PROMPT + " Always provide score in format: MATCH_SCORE: [number]."
+
+# Forces the analysis into a record_analysis tool call matching ANALYSIS_SCHEMA
+_CLAUDE_ANALYSIS_TOOL = {
+    "tools": [{
+        "name": "record_analysis",
+        "description": "Record the resume analysis.",
+        "input_schema": ANALYSIS_SCHEMA,
+    }],
+    "tool_choice": {"type": "tool", "name": "record_analysis"},
+}
 
 
-class ClaudeProvider(AIProvider):
+class ClaudeProvider(_AsyncSDKProvider):
     """Anthropic Claude Provider."""
     
+    __slots__ = ("anthropic",)
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
         self.client = None
         self.anthropic = None
-        # Try multiple model names - will be determined on first use
-        self.model = "claude-3-5-sonnet-20240620"
+        # Resolved against CLAUDE_MODELS on first use (see _resolve_claude_model)
+        self.model = _read_cached_model('claude', self.api_key) or CLAUDE_MODELS[0]
+        self._async_client = self._async_loop = self._async_semaphore = None
         
-        try:
-            from anthropic import Anthropic
-            if self.api_key:
-                self.anthropic = Anthropic(api_key=self.api_key)
-                self.client = self.anthropic  # Store reference
-        except ImportError:
-            pass
+        anthropic = _import_sdk('anthropic') if self.api_key else None
+        if anthropic is not None:
+            self.anthropic = anthropic.Anthropic(api_key=self.api_key, timeout=API_TIMEOUT, max_retries=0,
+                                                 http_client=shared_http_client())
+            self.client = self.anthropic  # Store reference
     
     def is_available(self) -> bool:
         return self.client is not None
     
+    @_retry_transient
+    def _chat(self, **kwargs):
+        """Messages API call, retried on transient API errors."""
+        return self.client.messages.create(**kwargs)
+    
+    def _new_async_client(self):
+        """AsyncAnthropic client with its own pooled httpx client."""
+        return _import_sdk('anthropic').AsyncAnthropic(api_key=self.api_key, timeout=API_TIMEOUT, max_retries=0,
+                                                       http_client=async_http_client())
+    
+    @_retry_transient
+    async def _achat(self, **kwargs):
+        """Async Messages API call, retried on transient API errors."""
+        client = self._get_async_client()
+        async with self._async_semaphore:
+            return await client.messages.create(**kwargs)
+    
+    def _send(self, kwargs: Dict, reply: Callable[[Any], Any] = _message_text) -> Optional[Any]:
+        """reply() of a Messages API call on the resolved model (its text by default), or None if no model is available."""
+        model_name = _resolve_claude_model(self.client, self.api_key)
+        if model_name is None:
+            return None
+        self.model = model_name
+        try:
+            return reply(self._chat(model=model_name, **kwargs))
+        except Exception as e:
+            if _is_model_not_found(e):
+                _forget_claude_model(self.api_key)
+            raise
+    
+    async def _asend(self, kwargs: Dict, reply: Callable[[Any], Any] = _message_text) -> Optional[Any]:
+        """Async _send; the model is resolved (probed at most once per process) in a worker thread."""
+        model_name = await asyncio.to_thread(_resolve_claude_model, self.client, self.api_key)
+        if model_name is None:
+            return None
+        self.model = model_name
+        try:
+            return reply(await self._achat(model=model_name, **kwargs))
+        except Exception as e:
+            if _is_model_not_found(e):
+                _forget_claude_model(self.api_key)
+            raise
+    
+    def _analyze_request(self, resume_text: str, job_description: str, structured: bool = False) -> Dict:
+        """
+        Messages API arguments for analyze_resume, less the model; structured
+        forces a record_analysis tool call instead of a text answer.
+        """
+        prompt = _load_prompt_template('analyze_resume_structured' if structured else 'analyze_resume').substitute(
+            resume_text=_analysis_resume_text(resume_text),
+            job_description=job_description,
+        )
+
+        request = dict(
+            max_tokens=3000,
+            temperature=0.2,  # Lower temperature for more strict scoring
+            system=_CLAUDE_ANALYZE_STRUCTURED_SYSTEM_PROMPT if structured else _CLAUDE_ANALYZE_SYSTEM_PROMPT,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+        if structured:
+            request.update(_CLAUDE_ANALYSIS_TOOL)
+        return request
+    
+    @_cached_response('analyze')
     def analyze_resume(self, resume_text: str, job_description: str) -> Dict:
         if not self.is_available():
             return {"error": "Claude API not available. Set ANTHROPIC_API_KEY."}
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        prescreened = self._keyword_prescreen(resume_text, job_description)
+        if prescreened is not None:
+            return prescreened
         
-        prompt = f"""You are a resume analyst. Analyze this resume against the job description and provide a strict, accurate match score.
-
-JOB DESCRIPTION:
-{job_description}
-
-RESUME:
-{resume_text}
-
-SCORING CRITERIA - Evaluate the resume using these specific factors:
-
-1. REQUIRED SKILLS MATCH (50 points - 50% of total score):
-   - CRITICAL: This is the most important factor - it accounts for half of the total score
-   - Identify ALL required technical skills, tools, technologies, and competencies mentioned in the job description
-   - Count how many required skills are present in the resume
-   - Score: (skills_found / skills_required) × 50
-   - Example: If job requires 10 skills and resume has 6, score = (6/10) × 50 = 30 points
-   - Example: If job requires 8 skills and resume has 8, score = (8/8) × 50 = 50 points
-   - Be thorough in identifying skills - include programming languages, frameworks, tools, methodologies, soft skills, certifications, etc.
-
-2. EXPERIENCE LEVEL MATCH (20 points):
-   - Check if experience level matches (Junior, Mid-level, Senior, Lead, Principal, etc.)
-   - Perfect match: 20 points
-   - One level off (e.g., Mid applying to Senior): 12 points
-   - Two+ levels off (e.g., Junior applying to Senior): 5 points
-   - No clear level in resume: 8 points
-
-3. YEARS OF EXPERIENCE (12 points):
-   - Compare required years of experience vs. candidate's total experience
-   - Meets or exceeds requirement: 12 points
-   - Within 1-2 years: 8 points
-   - Within 3-4 years: 4 points
-   - More than 4 years short: 0 points
-   - No requirement specified: 6 points (neutral)
-
-4. JOB TITLE RELEVANCE (10 points):
-   - Check if candidate's current/past job titles are relevant to the target role
-   - Exact or very similar title: 10 points
-   - Related title in same field: 7 points
-   - Different field but transferable skills: 3 points
-   - Completely unrelated: 0 points
-
-5. EDUCATION REQUIREMENTS (5 points):
-   - Check if education level matches (Bachelor's, Master's, PhD, etc.)
-   - Meets requirement: 5 points
-   - One level below: 3 points
-   - Two+ levels below: 0 points
-   - No requirement specified: 2.5 points (neutral)
-
-6. INDUSTRY/DOMAIN EXPERIENCE (3 points):
-   - Check if candidate has experience in the same or related industry
-   - Same industry: 3 points
-   - Related industry: 2 points
-   - Different industry: 0 points
-   - No industry specified in job: 1.5 points (neutral)
-
-TOTAL SCORE CALCULATION:
-- Add up all 6 factors (max 100 points)
-- Required Skills Match = 50 points (50% of total)
-- Other factors = 50 points combined (50% of total)
-- Round to nearest whole number
-- This is your MATCH_SCORE
-
-SCORING GUIDELINES:
-- 0-40%: Missing most required skills, significant experience level mismatch, or major gaps
-- 40-70%: Has some required skills and relevant experience, but missing key requirements
-- 70-100%: Meets most/all requirements, strong skill match, appropriate experience level
-
-Be STRICT - only give 70+ if the candidate truly meets most requirements.
-
-Provide your analysis in this EXACT format:
-
-MATCH_SCORE: [number between 0-100 - be strict!]
-STRENGTHS:
-- [strength 1]
-- [strength 2]
-- ...
-
-IMPROVEMENTS_NEEDED:
-- [specific content change 1]
-- [specific content change 2]
-- ...
-
-CONTENT_SUGGESTIONS:
-1. [Section/Area]: [What to change] - [Why] - [How to improve it]
-2. [Section/Area]: [What to change] - [Why] - [How to improve it]
-...
-
-Start your response with "MATCH_SCORE:" immediately."""
-
         try:
-            # Try multiple model names in order of preference
-            model_names = [
-                "claude-3-5-sonnet-20240620",
-                "claude-3-5-sonnet",
-                "claude-3-opus-20240229",
-                "claude-3-sonnet-20240229",
-                "claude-3-haiku-20240307"
-            ]
-            
-            for model_name in model_names:
-                try:
-                    response = self.client.messages.create(
-                        model=model_name,
-                        max_tokens=3000,
-                        temperature=0.2,  # Lower temperature for more strict scoring
-                        system="You are a strict resume analyst. Evaluate resumes using a structured scoring framework: 1. Required Skills Match (30 points) - count skills found vs required. 2. Experience Level Match (25 points) - check if levels align. 3. Years of Experience (15 points) - compare required vs actual. 4. Job Title Relevance (15 points) - assess title similarity. 5. Education Requirements (10 points) - check education level match. 6. Industry/Domain Experience (5 points) - evaluate industry alignment. Calculate total (max 100) and round to nearest whole number. Be STRICT: 0-40% = missing most requirements, 40-70% = some requirements met, 70-100% = most/all requirements met. Always provide score in format: MATCH_SCORE: [number].",
-                        messages=[
-                            {"role": "user", "content": prompt}
-                        ]
-                    )
-                    self.model = model_name  # Save working model
-                    return {"raw_analysis": response.content[0].text, "provider": "Claude"}
-                except Exception as e:
-                    if "not_found" not in str(e).lower() and "404" not in str(e):
-                        # If it's not a model not found error, raise it
-                        raise e
-                    continue
-            
-            # If all models failed, return error
-            return {"error": "Claude API error: No available model found. Please check your API key and model access."}
+            data = self._send(self._analyze_request(resume_text, job_description, structured=True), _tool_input)
         except Exception as e:
             return {"error": f"Claude API error: {str(e)}"}
+        if data is None:
+            return {"error": "Claude API error: No available model found. Please check your API key and model access."}
+        return _structured_analysis(data, "Claude")
     
-    def optimize_resume(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None) -> str:
+    @_cached_response('analyze')
+    async def analyze_resume_async(self, resume_text: str, job_description: str) -> Dict:
         if not self.is_available():
-            return "Claude API not available."
-        
-        # Prepare social links information for the prompt
-        social_links_info = ""
-        if social_links:
-            if social_links.get('linkedin'):
-                social_links_info += f"\nLinkedIn URL from original resume: {social_links['linkedin']}"
-            if social_links.get('github'):
-                social_links_info += f"\nGitHub URL from original resume: {social_links['github']}"
-        
-        prompt = f"""You are an expert resume writer. Create an optimized version of this resume that is specifically tailored to match the job description.
-
-ORIGINAL RESUME:
-{resume_text}
-
-JOB DESCRIPTION:
-{job_description}
-
-SUGGESTIONS TO IMPLEMENT:
-{chr(10).join(suggestions[:10])}
-{social_links_info}
-
-CRITICAL: If the original resume contains LinkedIn or GitHub links, you MUST preserve them in the header contact line with their full URLs.
-
-🚨 CRITICAL MANDATORY REQUIREMENT FOR EXPERIENCE SECTION 🚨
-YOU MUST COMPLETELY REWRITE EVERY EXPERIENCE BULLET POINT. DO NOT just add keywords or make minor edits.
-EACH BULLET MUST BE TRANSFORMED with actual content improvements, metrics, and job-relevant achievements.
-
-EXPERIENCE SECTION RULES (MANDATORY - APPLY TO EVERY BULLET):
-1. MANDATORY REWRITE: You MUST rewrite each bullet point from scratch. DO NOT copy-paste or make minor edits.
-   - If original says "Worked on projects" → Rewrite to "Designed and deployed 3 microservices using Python and Docker, reducing API response time by 45% and handling 50K+ requests daily"
-   - If original says "Managed team" → Rewrite to "Led cross-functional team of 5 engineers, implementing Agile practices that increased sprint velocity by 30% and reduced bug reports by 25%"
-   - Transform vague statements into specific, measurable achievements
-
-2. STRUCTURE (MANDATORY): Every bullet MUST use Problem → Action → Result OR Task → Tools → Impact format
-   - Example: "Addressed [specific problem] by implementing [specific solution] using [technologies], resulting in [quantifiable improvement]"
-   - Example: "Developed [specific feature/system] using [tools/tech], improving [metric] by [percentage/amount] and [business impact]"
-
-3. ACTION VERBS (MANDATORY): Use strong, varied verbs - DO NOT repeat verbs across bullets
-   - Use: Designed, Built, Implemented, Led, Automated, Analyzed, Developed, Optimized, Increased, Reduced, Managed, Created, Deployed, Architected, Streamlined, Accelerated, Transformed, etc.
-   - Vary verbs: If first bullet uses "Developed", second should use "Architected" or "Built", not "Developed" again
-
-4. QUANTITATIVE METRICS (MANDATORY): Every bullet MUST include at least ONE measurable metric:
-   - Numbers: "3 applications", "50K users", "5 team members"
-   - Percentages: "40% faster", "25% reduction", "30% increase"
-   - Time: "reduced from 5 hours to 30 minutes", "deployed in 2 weeks"
-   - Money: "$50K saved", "revenue increased by $200K"
-   - Scale: "serving 1M+ requests", "processing 10TB data daily"
-   - If original has no metrics, ADD realistic, job-relevant metrics based on the work described
-
-5. JOB RELEVANCE (MANDATORY): Every bullet MUST connect to job description requirements:
-   - Identify key technologies/tools from job description
-   - Identify key responsibilities/outcomes from job description
-   - Rewrite bullets to demonstrate experience with those technologies/responsibilities
-   - Example: If job requires "cloud deployment" and original says "deployed applications", rewrite to "Deployed scalable applications on AWS using EC2, S3, and Lambda, achieving 99.9% uptime and reducing infrastructure costs by 35%"
-
-6. SPECIFIC STRUCTURES (Use when relevant):
-   - "Addressed [specific problem] by using [technology/tool] to [specific action], improving [metric] by [%/amount] and [business impact]"
-   - "Collaborated with [specific teams/stakeholders] to [specific action], resulting in [quantifiable outcome] and [business value]"
-   - "Designed and implemented [specific solution] using [technologies], reducing [metric] by [amount] and enabling [business outcome]"
-
-7. TONE: Natural, business-professional, real resume writing style - NO generic/AI-style language
-
-8. AVOID filler phrases: NO 'leveraged cutting-edge', 'utilized synergistic', 'dynamic environment', 'synergistic solutions', 'passionate about', or vague wording
-
-9. CONTENT: Specific, measurable, aligned with industry expectations and job requirements
-
-10. VARIETY: Do NOT repeat sentence structures - vary your approach across bullets
-
-11. QUANTITY: Provide 4-6 bullet points per position (expand if original has fewer, consolidate if original has too many)
-
-12. BALANCE (CRITICAL): Maintain a 50/50 balance between quantifiable and technical points:
-    - 50% of bullets should be QUANTIFIABLE (heavy on metrics, numbers, percentages, measurable results)
-    - 50% of bullets should be TECHNICAL (job-relevant technical skills, technologies, implementations, but WITHOUT metrics/numbers)
-    - Example of quantifiable (50%): "Designed and deployed 3 microservices using Python and Docker, reducing API response time by 45% and handling 50K+ requests daily"
-    - Example of technical non-quantifiable (50%): "Architected microservices infrastructure using Docker, Kubernetes, and AWS ECS, implementing service mesh patterns and container orchestration best practices"
-    - Example of technical non-quantifiable (50%): "Developed RESTful APIs following OpenAPI specifications, implementing OAuth 2.0 authentication and JWT token management for secure access control"
-    - Example of technical non-quantifiable (50%): "Built data processing pipelines using Apache Spark and Kafka, implementing stream processing patterns and event-driven architecture for real-time analytics"
-    - For 4 bullets: 2 should be quantifiable, 2 should be technical (no metrics)
-    - For 5 bullets: 2-3 should be quantifiable, 2-3 should be technical (no metrics)
-    - For 6 bullets: 3 should be quantifiable, 3 should be technical (no metrics)
-    - DO NOT include soft skills (leadership, collaboration, strategic thinking) - focus ONLY on technical implementations, architectures, and technologies
-
-13. KEYWORDS: Include relevant keywords from job description NATURALLY within the rewritten content - NO keyword stuffing
-
-14. LEARNING: Extract and incorporate skills/technologies from BOTH job description AND candidate's resume
-
-15. TECHNICAL NON-QUANTIFIABLE BULLETS: For the 50% technical bullets (without metrics), focus on:
-    - Technical implementations and architectures (microservices, APIs, data pipelines, etc.)
-    - Technologies and tools from job description (Docker, Kubernetes, AWS services, frameworks, etc.)
-    - Technical patterns and best practices (RESTful design, event-driven architecture, etc.)
-    - System design and technical solutions
-    - Integration with specific technologies or platforms
-    - DO NOT include soft skills, leadership, collaboration, or strategic thinking
-    - These bullets should demonstrate technical depth and job-relevant technical expertise
-
-EXPERIENCE REWRITING EXAMPLES (MANDATORY TRANSFORMATION):
-
-BEFORE: "Worked on software development projects"
-AFTER: "Designed and built 3 enterprise applications using Python, React, and PostgreSQL, reducing API processing time by 40%, serving 10,000+ daily active users, and improving system reliability to 99.9% uptime"
-
-BEFORE: "Managed database operations"
-AFTER: "Addressed performance bottlenecks by implementing database indexing strategies and query optimization techniques, improving average query response time by 60% (from 2.5s to 1s), reducing server infrastructure costs by $50K annually, and enabling real-time analytics for 5K+ concurrent users"
-
-BEFORE: "Responsible for team coordination"
-AFTER: "Led cross-functional team of 8 engineers and 3 product managers, implementing Agile/Scrum methodologies that increased sprint velocity by 35%, reduced production bugs by 28%, and accelerated feature delivery from 4 weeks to 2.5 weeks average"
-
-BEFORE: "Used machine learning for data analysis"
-AFTER: "Developed and deployed machine learning models using Python, scikit-learn, and TensorFlow, improving prediction accuracy from 72% to 89%, processing 2M+ data points daily, and enabling automated decision-making that saved 20 hours/week of manual analysis"
-
-BEFORE: "Worked on backend systems"
-AFTER (TECHNICAL NON-QUANTIFIABLE - 50%): "Architected microservices infrastructure using Docker, Kubernetes, and AWS ECS, implementing service mesh patterns with Istio and container orchestration best practices for scalable distributed systems"
-
-BEFORE: "Developed APIs"
-AFTER (TECHNICAL NON-QUANTIFIABLE - 50%): "Designed and implemented RESTful APIs following OpenAPI 3.0 specifications, integrating OAuth 2.0 authentication, JWT token management, and rate limiting middleware for secure and scalable API architecture"
-
-⚠️ CRITICAL: Notice how each "AFTER" example:
-- Completely rewrites the content (not just adds keywords)
-- Includes specific technologies from job description (for quantifiable bullets)
-- Adds multiple quantitative metrics (for 70% of bullets)
-- Shows clear business impact (for 50% quantifiable bullets) or demonstrates technical depth and job-relevant technologies (for 50% technical bullets)
-- Uses varied, strong action verbs
-- Follows Problem → Action → Result structure
-- Maintains 50/50 balance: Half the bullets are quantifiable with metrics, half focus on technical implementations and technologies without metrics
-
-CRITICAL FORMATTING REQUIREMENTS - Follow this EXACT structure:
-
-1. HEADER (First Line):
-   [Full Name]
-   [Job Title/Position]
-   Location: [City, State] | Email: [email] | Phone: [phone] | LinkedIn: [linkedin_url] | GitHub: [github_url]
-   
-   IMPORTANT: If the original resume contains LinkedIn or GitHub links, you MUST include them in the contact line with their full URLs.
-   - Extract the actual URLs from the original resume (they are provided above if found)
-   - Format: "LinkedIn: https://linkedin.com/in/username" or "GitHub: https://github.com/username"
-   - Only include links that exist in the original resume
-   - If no LinkedIn/GitHub in original, omit them
-
-2. SUMMARY Section:
-   SUMMARY
-   [2-3 sentences summarizing experience and key qualifications relevant to the job]
-
-3. SKILLS Section:
-   SKILLS
-   [Category 1]: [skill1], [skill2], [skill3]
-   [Category 2]: [skill1], [skill2], [skill3]
-   [Category 3]: [skill1], [skill2], [skill3]
-
-   Common categories: Methodologies, Languages, IDEs, Packages/Libraries, Visualization Tools, Database, Other Skills, Operating System
-
-   CRITICAL SKILLS SECTION OPTIMIZATION (MANDATORY):
-   - ADD missing job-relevant skills from the job description to the SKILLS section (e.g., programming languages, tools, technologies, frameworks, methodologies)
-   - REORGANIZE skills to put most relevant skills for the job first within each category
-   - GROUP related skills together using appropriate categories (e.g., "Programming Languages:", "Tools & Technologies:", "Frameworks & Libraries:", "Methodologies:")
-   - REMOVE outdated or irrelevant skills that don't match the job requirements
-   - Include ALL key technical requirements mentioned in the job description
-   - Make the SKILLS section comprehensive and keyword-rich for ATS optimization while keeping it natural and credible
-   - DO NOT include skills that the candidate clearly doesn't have based on their experience
-
-4. EXPERIENCE Section:
-   EXPERIENCE
-   [Company Name], [Location] | [Start Date] - [End Date or Current] | [Job Title]
-   • [Bullet point describing achievement with metrics if possible]
-   • [Bullet point describing achievement with metrics if possible]
-   • [Bullet point describing achievement with metrics if possible]
-   
-   [Next Company], [Location] | [Start Date] - [End Date] | [Job Title]
-   • [Bullet point]
-   • [Bullet point]
-
-
-5. EDUCATION Section (ONLY if original resume has education):
-   EDUCATION
-   [Degree Name]: [University Name], [Location]
-   [Degree Name]: [University Name], [Location]
-   
-   ⚠️ CRITICAL: ONLY include education entries that exist in the original resume. 
-   - DO NOT add any education (Bachelor's, Master's, PhD, etc.) if it is NOT mentioned in the original resume
-   - Copy and paste education information exactly as it appears in the original resume
-   - If the original resume has no education section, DO NOT create one
-   - If the original resume only has a Master's degree, DO NOT add a Bachelor's degree
-   - Only include what is explicitly stated in the original resume
-
-6. PROJECTS Section (ONLY if original resume has projects):
-   PROJECTS
-   [Project Name] | [Technologies Used] | [Date or Duration]
-   • [Description of project and achievements]
-   • [Key features or results]
-   
-   [Next Project Name] | [Technologies Used] | [Date or Duration]
-   • [Description]
-   • [Key features or results]
-   
-   ⚠️ CRITICAL: Check for project sections using these common names (case-insensitive):
-   - "PROJECTS", "ACADEMIC PROJECTS", "SCHOOL PROJECTS", "PERSONAL PROJECTS"
-   - "SIDE PROJECTS", "PORTFOLIO PROJECTS", "CAPSTONE PROJECTS", "RESEARCH PROJECTS"
-   - "INDIVIDUAL PROJECTS", "TEAM PROJECTS", "GROUP PROJECTS", "COURSE PROJECTS"
-   - "UNIVERSITY PROJECTS", "COLLEGE PROJECTS", or any section containing the word "PROJECT"
-   - If ANY of these exist in the original resume, include the PROJECTS section
-   - If NONE of these exist, do NOT add a PROJECTS section
-
-IMPORTANT INSTRUCTIONS:
-- Maintain ALL original information - only enhance and optimize, don't remove truthful content
-- Use the EXACT section headers: SUMMARY, SKILLS, EXPERIENCE, EDUCATION (all caps)
-- Include EDUCATION section ONLY if the original resume has an education section - do NOT add education if it doesn't exist in the original
-- Include PROJECTS section ONLY if the original resume has a projects section (check for: "PROJECTS", "ACADEMIC PROJECTS", "SCHOOL PROJECTS", "PERSONAL PROJECTS", "SIDE PROJECTS", "PORTFOLIO PROJECTS", "CAPSTONE PROJECTS", "RESEARCH PROJECTS", "INDIVIDUAL PROJECTS", "TEAM PROJECTS", "GROUP PROJECTS", "COURSE PROJECTS", "UNIVERSITY PROJECTS", "COLLEGE PROJECTS", or any section containing "PROJECT") - do NOT add projects if they don't exist in the original
-- CRITICAL: For EDUCATION section, ONLY copy education entries that are explicitly mentioned in the original resume. DO NOT add Bachelor's, Master's, or any other degree if it is not in the original resume
-- For experience entries, use format: "Company, Location | Date Range | Position"
-- For projects, use format: "Project Name | Technologies | Date/Duration"
-- Use bullet points (•) for experience and project descriptions
-
-⚠️ REMINDER: For EXPERIENCE section bullets, apply the rules specified at the top of this prompt (Problem → Action → Result format, varied action verbs, specific structures, natural tone, no filler phrases, 4-6 bullets, metrics, etc.)
-
-- Reorder experience to highlight most relevant positions first
-- Keep formatting clean and professional
-
-OUTPUT FORMAT - RETURN ONLY VALID JSON (NO OTHER TEXT):
-Return the optimized resume as a JSON object with this EXACT structure:
-
-{{
-  "name": "Full Name",
-  "title": "Job Title/Position",
-  "contact": ["Location: City, State", "Email: email@example.com", "Phone: (123) 456-7890", "LinkedIn: https://linkedin.com/in/username", "GitHub: https://github.com/username"],
-  "summary": "Complete summary paragraph as single string",
-  "skills": {{
-    "Category 1": ["skill1", "skill2", "skill3"],
-    "Category 2": ["skill1", "skill2", "skill3"]
-  }},
-  "experience": [
-    {{
-      "company": "Company Name",
-      "location": "City, State",
-      "dates": "Start Date - End Date",
-      "title": "Job Title",
-      "bullets": [
-        "First bullet point with achievements and metrics",
-        "Second bullet point with achievements and metrics"
-      ]
-    }}
-  ],
-  "education": [
-    {{
-      "degree": "Degree Name",
-      "institution": "University Name",
-      "location": "City, State"
-    }}
-  ],
-  "certifications": [
-    "Certification exactly as written in original resume (e.g., AWS Certified Solutions Architect, 2023)",
-    "Another certification"
-  ],
-  "projects": [
-    {{
-      "name": "Project Name",
-      "technologies": "Tech stack used",
-      "date": "Date or Duration",
-      "bullets": [
-        "Project description and achievements",
-        "Key features or results"
-      ]
-    }}
-  ],
-  "awards": [
-    "Award exactly as written in original resume",
-    "Another award or honor"
-  ],
-  "publications": [
-    "Publication exactly as written in original resume",
-    "Another publication"
-  ],
-  "volunteer": [
-    "Volunteer work exactly as written in original resume",
-    "Another volunteer experience"
-  ]
-}}
-
-CRITICAL JSON RULES:
-- Return ONLY valid JSON - no markdown, no explanations, no code blocks
-- Include sections ONLY if they exist in original resume:
-  * "education" - Check for: EDUCATION, ACADEMIC BACKGROUND, QUALIFICATIONS, ACADEMIC QUALIFICATIONS
-  * "certifications" - Check for: CERTIFICATIONS, CERTIFICATES, PROFESSIONAL CERTIFICATIONS, LICENSES, LICENSE & CERTIFICATIONS
-  * "projects" - Check for: PROJECTS, ACADEMIC PROJECTS, PERSONAL PROJECTS, SIDE PROJECTS, PORTFOLIO
-  * "awards" - Check for: AWARDS, HONORS, ACHIEVEMENTS, HONORS & AWARDS, RECOGNITION
-  * "publications" - Check for: PUBLICATIONS, RESEARCH, PAPERS, PUBLISHED WORK
-  * "volunteer" - Check for: VOLUNTEER, VOLUNTEER WORK, VOLUNTEER EXPERIENCE, COMMUNITY SERVICE
-- If a section doesn't exist in original resume, DO NOT include it in JSON
-- Preserve original formatting for certifications, awards, publications, volunteer (copy exactly as written)
-- All strings must be properly escaped
-- Contact array MUST include ALL contact info from original: Location, Email, Phone, LinkedIn, GitHub (include all that are present)
-- Experience bullets must follow all the rules specified above (metrics, rewriting, etc.)
-- Section order in output: summary → skills → experience → education → certifications → projects → awards → publications → volunteer"""
-
+            return {"error": "Claude API not available. Set ANTHROPIC_API_KEY."}
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        prescreened = self._keyword_prescreen(resume_text, job_description)
+        if prescreened is not None:
+            return prescreened
+        
         try:
-            # Try multiple model names, use the one that worked before or try all
-            model_names = [
-                self.model,  # Try the model that worked before
-                "claude-3-5-sonnet-20240620",
-                "claude-3-5-sonnet",
-                "claude-3-opus-20240229",
-                "claude-3-sonnet-20240229",
-                "claude-3-haiku-20240307"
+            data = await self._asend(self._analyze_request(resume_text, job_description, structured=True), _tool_input)
+        except Exception as e:
+            return {"error": f"Claude API error: {str(e)}"}
+        if data is None:
+            return {"error": "Claude API error: No available model found. Please check your API key and model access."}
+        return _structured_analysis(data, "Claude")
+    
+    def _message_batches(self):
+        """The SDK's Message Batches resource (GA, or the earlier beta), or None when it has neither."""
+        if self.client is None:
+            return None
+        batches = getattr(getattr(self.client, 'messages', None), 'batches', None)
+        if batches is None:
+            batches = getattr(getattr(getattr(self.client, 'beta', None), 'messages', None), 'batches', None)
+        return batches
+    
+    def analysis_batch_available(self) -> bool:
+        """Whether the installed SDK has Message Batches (the pinned anthropic==0.34.2 predates them)."""
+        return self._message_batches() is not None
+    
+    def submit_analysis_batch(self, pairs: List[Tuple[str, str]]) -> str:
+        """
+        Start a Message Batches job with one forced record_analysis call per
+        (resume_text, job_description) pair (half price, done within 24 hours);
+        returns the batch id for analysis_batch_results().
+        """
+        batches = self._message_batches()
+        if batches is None:
+            raise RuntimeError("Claude Message Batches not available; they need a newer anthropic SDK and ANTHROPIC_API_KEY.")
+        model_name = _resolve_claude_model(self.client, self.api_key)
+        if model_name is None:
+            raise RuntimeError("No available Claude model found. Please check your API key and model access.")
+        self.model = model_name
+        requests = []
+        for i, (resume_text, job_description) in enumerate(pairs):
+            resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+            requests.append({
+                "custom_id": str(i),
+                "params": {"model": model_name, **self._analyze_request(resume_text, job_description, structured=True)},
+            })
+        return batches.create(requests=requests).id
+    
+    def analysis_batch_results(self, batch_id: str) -> Optional[List[Dict]]:
+        """
+        Analyses of a finished batch in submission order, or None while it is
+        still running. Errored, canceled and expired requests get error dicts.
+        """
+        batches = self._message_batches()
+        if batches is None:
+            raise RuntimeError("Claude Message Batches not available; they need a newer anthropic SDK and ANTHROPIC_API_KEY.")
+        batch = batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return None
+        counts = batch.request_counts
+        total = counts.processing + counts.succeeded + counts.errored + counts.canceled + counts.expired
+        results = [{"error": "Claude API error: batch request failed or expired"} for _ in range(total)]
+        for entry in batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                continue
+            data = _tool_input(entry.result.message)
+            if data is not None:
+                results[int(entry.custom_id)] = _structured_analysis(data, "Claude")
+        return results
+    
+    def _optimize_request(self, resume_text: str, job_description: str, suggestions: List[str],
+                          social_links: Optional[Dict] = None) -> Dict:
+        """Messages API arguments for optimize_resume, less the model."""
+        prompt = _optimize_prompt('optimize_resume', resume_text, job_description, suggestions, social_links)
+
+        return dict(
+            max_tokens=_output_token_budget(resume_text),
+            temperature=OPTIMIZE_TEMPERATURE,
+            # The static rules are marked for prompt caching so repeated requests reuse the prefix
+            system=[{"type": "text", "text": _optimize_rules(), "cache_control": {"type": "ephemeral"}}],
+            messages=[
+                {"role": "user", "content": prompt}
             ]
-            
-            system_message = "You are an expert resume writer specializing in tailoring resumes to specific job descriptions. CRITICAL FOR EXPERIENCE SECTION: REWRITE each bullet point using Problem → Action → Result OR Task → Tools → Impact format. Use strong, varied action verbs (Designed, Built, Implemented, Led, Automated, Analyzed, etc.) - DO NOT repeat verbs. Incorporate structures like 'Addressed [problem] by using [technology] to perform [actions], improving [metric] by [%/impact]' and 'Collaborated with [teams] to strengthen [process] and support smoother [workflow]'. Use natural, business-professional tone - NO generic/AI-style language or filler phrases like 'leveraged cutting-edge', 'utilized synergistic', 'dynamic environment'. Make bullets specific, measurable, industry-aligned. Provide 4-6 bullets per position. Include ATS keywords naturally from job description and resume - NO keyword stuffing. Extract and incorporate relevant skills/technologies from both sources. Include quantitative metrics and qualitative achievements when relevant. Maintain truthfulness while making content compelling and job-relevant."
-            
-            for model_name in model_names:
-                try:
-                    response = self.client.messages.create(
-                        model=model_name,
-                        max_tokens=4000,
-                        system=system_message,
-                        messages=[
-                            {"role": "user", "content": prompt}
-                        ]
-                    )
-                    self.model = model_name  # Save working model
-                    return response.content[0].text
-                except Exception as e:
-                    if "not_found" not in str(e).lower() and "404" not in str(e):
-                        raise e
-                    continue
-            
-            return "Error: No available Claude model found."
+        )
+    
+    def analyze_resume_stream(self, resume_text: str, job_description: str) -> Iterator[str]:
+        """
+        Stream the raw analysis text as Claude generates it.
+
+        Errors are raised, not returned, since a partial stream cannot be
+        replaced by an error dict. Closing the generator closes the HTTP stream.
+        """
+        if not self.is_available():
+            raise RuntimeError("Claude API not available. Set ANTHROPIC_API_KEY.")
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        prescreened = self._keyword_prescreen(resume_text, job_description)
+        if prescreened is not None:
+            yield prescreened["raw_analysis"]
+            return
+        model_name = _resolve_claude_model(self.client, self.api_key)
+        if model_name is None:
+            raise RuntimeError("Claude API error: No available model found. Please check your API key and model access.")
+        self.model = model_name
+        
+        try:
+            with self.client.messages.stream(model=model_name, **self._analyze_request(resume_text, job_description)) as stream:
+                yield from stream.text_stream
+        except Exception as e:
+            if _is_model_not_found(e):
+                _forget_claude_model(self.api_key)
+            raise
+    
+    @_cached_response('optimize')
+    def optimize_resume(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None) -> str:
+        if not self.is_available():
+            return "Claude API not available."
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        
+        try:
+            text = self._send(self._optimize_request(resume_text, job_description, suggestions, social_links))
+        except Exception as e:
+            return f"Error: {str(e)}"
+        return "Error: No available Claude model found." if text is None else text
+    
+    @_cached_response('optimize')
+    async def optimize_resume_async(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None) -> str:
+        if not self.is_available():
+            return "Claude API not available."
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        
+        try:
+            text = await self._asend(self._optimize_request(resume_text, job_description, suggestions, social_links))
         except Exception as e:
             return f"Error: {str(e)}"
+        return "Error: No available Claude model found." if text is None else text
+
+
+# Gemini models in order of preference (names without the "models/" prefix)
+GEMINI_MODELS = ("gemini-2.5-flash", "gemini-flash-latest", "gemini-2.0-flash", "gemini-pro-latest")
+
+# Gemini sampling settings for stricter analysis scoring
+_GEMINI_ANALYZE_CONFIG = {
+    "temperature": 0.2,  # Lower temperature for more strict scoring
+    "top_p": 0.8,
+    "top_k": 40,
+}
+# The same, constrained to a JSON object matching ANALYSIS_SCHEMA
+_GEMINI_STRUCTURED_ANALYZE_CONFIG = {
+    **_GEMINI_ANALYZE_CONFIG,
+    "response_mime_type": "application/json",
+    "response_schema": ANALYSIS_SCHEMA,
+}
 
 
 class GeminiProvider(AIProvider):
     """Google Gemini Provider."""
     
+    __slots__ = ("genai", "_models")
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
         self.client = None
         self.genai = None
-        # Use model name without "models/" prefix - try latest stable models first
-        self.model = "gemini-2.5-flash"  # Updated to use available model
+        # GenerativeModel instances by (model name, with optimize system instruction)
+        self._models: Dict[Tuple[str, bool], Any] = {}
+        self.model = GEMINI_MODELS[0]
         
+        genai = _import_sdk('google.generativeai') if self.api_key else None
         try:
-            import google.generativeai as genai
-            if self.api_key:
+            if genai is not None:
                 genai.configure(api_key=self.api_key)
                 self.genai = genai
-                # Try multiple model names in order of preference
-                model_names = ["gemini-2.5-flash", "gemini-flash-latest", "gemini-2.0-flash", "gemini-pro-latest"]
+                # Try the model names in order of preference, starting with the
+                # one a previous run fell back to
+                model_names = list(GEMINI_MODELS)
+                cached_model = _read_cached_model('gemini')
+                if cached_model:
+                    model_names.insert(0, cached_model)
                 for model_name in model_names:
                     try:
-                        self.client = genai.GenerativeModel(model_name)
+                        self.client = self._get_model(model_name)
                         self.model = model_name
                         break
                     except:
                         continue
-        except ImportError:
-            pass
         except Exception as e:
             pass
     
     def is_available(self) -> bool:
         return self.client is not None
     
+    def _get_model(self, model_name: str, optimize: bool = False):
+        """
+        GenerativeModel for model_name, built once per provider; with optimize=True
+        it carries the optimize rules as its system instruction.
+        """
+        key = (model_name, optimize)
+        model = self._models.get(key)
+        if model is None:
+            if optimize:
+                model = self.genai.GenerativeModel(model_name, system_instruction=_optimize_rules())
+            else:
+                model = self.genai.GenerativeModel(model_name)
+            self._models[key] = model
+        return model
+    
+    @_retry_transient
+    def _generate(self, model, prompt: str, **kwargs):
+        """generate_content call on the given model, retried on transient API errors."""
+        return model.generate_content(prompt, **kwargs)
+    
+    @_retry_transient
+    async def _agenerate(self, model, prompt: str, **kwargs):
+        """generate_content_async call on the given model, retried on transient API errors."""
+        return await model.generate_content_async(prompt, **kwargs)
+    
+    def _generate_with_fallback(self, prompt: str, optimize: bool = False, **kwargs):
+        """
+        _generate on the current model; if it is not found, try the other
+        GEMINI_MODELS and switch to (and remember) the first that answers.
+        """
+        try:
+            return self._generate(self._get_model(self.model, optimize), prompt, **kwargs)
+        except Exception as e:
+            if not _is_model_not_found(e) or not self.genai:
+                raise
+            for model_name in GEMINI_MODELS:
+                if model_name == self.model:
+                    continue
+                try:
+                    response = self._generate(self._get_model(model_name, optimize), prompt, **kwargs)
+                except:
+                    continue
+                self.model = model_name
+                self.client = self._get_model(model_name)
+                _write_cached_model('gemini', model_name)
+                return response
+            raise e
+    
+    @_cached_response('analyze')
     def analyze_resume(self, resume_text: str, job_description: str) -> Dict:
         if not self.is_available():
             return {"error": "Gemini API not available. Set GEMINI_API_KEY."}
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        prescreened = self._keyword_prescreen(resume_text, job_description)
+        if prescreened is not None:
+            return prescreened
         
-        prompt = f"""You are a resume analyst. Analyze this resume against the job description and provide a strict, accurate match score.
-
-JOB DESCRIPTION:
-{job_description}
-
-RESUME:
-{resume_text}
-
-SCORING CRITERIA - Evaluate the resume using these specific factors:
-
-1. REQUIRED SKILLS MATCH (50 points - 50% of total score):
-   - CRITICAL: This is the most important factor - it accounts for half of the total score
-   - Identify ALL required technical skills, tools, technologies, and competencies mentioned in the job description
-   - Count how many required skills are present in the resume
-   - Score: (skills_found / skills_required) × 50
-   - Example: If job requires 10 skills and resume has 6, score = (6/10) × 50 = 30 points
-   - Example: If job requires 8 skills and resume has 8, score = (8/8) × 50 = 50 points
-   - Be thorough in identifying skills - include programming languages, frameworks, tools, methodologies, soft skills, certifications, etc.
-
-2. EXPERIENCE LEVEL MATCH (20 points):
-   - Check if experience level matches (Junior, Mid-level, Senior, Lead, Principal, etc.)
-   - Perfect match: 20 points
-   - One level off (e.g., Mid applying to Senior): 12 points
-   - Two+ levels off (e.g., Junior applying to Senior): 5 points
-   - No clear level in resume: 8 points
-
-3. YEARS OF EXPERIENCE (12 points):
-   - Compare required years of experience vs. candidate's total experience
-   - Meets or exceeds requirement: 12 points
-   - Within 1-2 years: 8 points
-   - Within 3-4 years: 4 points
-   - More than 4 years short: 0 points
-   - No requirement specified: 6 points (neutral)
-
-4. JOB TITLE RELEVANCE (10 points):
-   - Check if candidate's current/past job titles are relevant to the target role
-   - Exact or very similar title: 10 points
-   - Related title in same field: 7 points
-   - Different field but transferable skills: 3 points
-   - Completely unrelated: 0 points
-
-5. EDUCATION REQUIREMENTS (5 points):
-   - Check if education level matches (Bachelor's, Master's, PhD, etc.)
-   - Meets requirement: 5 points
-   - One level below: 3 points
-   - Two+ levels below: 0 points
-   - No requirement specified: 2.5 points (neutral)
-
-6. INDUSTRY/DOMAIN EXPERIENCE (3 points):
-   - Check if candidate has experience in the same or related industry
-   - Same industry: 3 points
-   - Related industry: 2 points
-   - Different industry: 0 points
-   - No industry specified in job: 1.5 points (neutral)
-
-TOTAL SCORE CALCULATION:
-- Add up all 6 factors (max 100 points)
-- Required Skills Match = 50 points (50% of total)
-- Other factors = 50 points combined (50% of total)
-- Round to nearest whole number
-- This is your MATCH_SCORE
-
-SCORING GUIDELINES:
-- 0-40%: Missing most required skills, significant experience level mismatch, or major gaps
-- 40-70%: Has some required skills and relevant experience, but missing key requirements
-- 70-100%: Meets most/all requirements, strong skill match, appropriate experience level
-
-Be STRICT - only give 70+ if the candidate truly meets most requirements.
-
-Provide your analysis in this EXACT format:
-
-MATCH_SCORE: [number between 0-100 - be strict!]
-STRENGTHS:
-- [strength 1]
-- [strength 2]
-- ...
-
-IMPROVEMENTS_NEEDED:
-- [specific content change 1]
-- [specific content change 2]
-- ...
-
-CONTENT_SUGGESTIONS:
-1. [Section/Area]: [What to change] - [Why] - [How to improve it]
-2. [Section/Area]: [What to change] - [Why] - [How to improve it]
-...
-
-Start your response with "MATCH_SCORE:" immediately."""
+        prompt = _load_prompt_template('analyze_resume_structured').substitute(
+            resume_text=_analysis_resume_text(resume_text),
+            job_description=job_description,
+        )
 
         try:
-            # Try with current model, fallback to other models if needed
-            try:
-                # Use generation config for stricter scoring
-                generation_config = {
-                    "temperature": 0.2,  # Lower temperature for more strict scoring
-                    "top_p": 0.8,
-                    "top_k": 40,
-                }
-                response = self.client.generate_content(
-                    prompt,
-                    generation_config=generation_config
-                )
-                return {"raw_analysis": response.text, "provider": "Gemini"}
-            except Exception as e:
-                # If model not found, try fallback models
-                if "not found" in str(e).lower() or "404" in str(e):
-                    if self.genai:
-                        fallback_models = ["gemini-flash-latest", "gemini-2.0-flash", "gemini-pro-latest"]
-                        for model_name in fallback_models:
-                            try:
-                                fallback_model = self.genai.GenerativeModel(model_name)
-                                generation_config = {
-                                    "temperature": 0.2,
-                                    "top_p": 0.8,
-                                    "top_k": 40,
-                                }
-                                response = fallback_model.generate_content(
-                                    prompt,
-                                    generation_config=generation_config
-                                )
-                                self.model = model_name
-                                self.client = fallback_model
-                                return {"raw_analysis": response.text, "provider": "Gemini"}
-                            except:
-                                continue
-                raise e
+            response = self._generate_with_fallback(prompt, generation_config=_GEMINI_STRUCTURED_ANALYZE_CONFIG)
+            return _structured_analysis(_json_loads(response.text), "Gemini")
         except Exception as e:
             return {"error": f"Gemini API error: {str(e)}"}
     
+    def analyze_resume_stream(self, resume_text: str, job_description: str) -> Iterator[str]:
+        """
+        Stream the raw analysis text as Gemini generates it.
+
+        Errors are raised, not returned, since a partial stream cannot be
+        replaced by an error dict.
+        """
+        if not self.is_available():
+            raise RuntimeError("Gemini API not available. Set GEMINI_API_KEY.")
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        prescreened = self._keyword_prescreen(resume_text, job_description)
+        if prescreened is not None:
+            yield prescreened["raw_analysis"]
+            return
+        
+        prompt = _load_prompt_template('analyze_resume').substitute(
+            resume_text=_analysis_resume_text(resume_text),
+            job_description=job_description,
+        )
+        
+        for chunk in self._generate_with_fallback(prompt, generation_config=_GEMINI_ANALYZE_CONFIG, stream=True):
+            if chunk.text:
+                yield chunk.text
+    
+    @_cached_response('optimize')
     def optimize_resume(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None) -> str:
         if not self.is_available():
             return "Gemini API not available."
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
         
-        # Prepare social links information for the prompt
-        social_links_info = ""
-        if social_links:
-            if social_links.get('linkedin'):
-                social_links_info += f"\nLinkedIn URL from original resume: {social_links['linkedin']}"
-            if social_links.get('github'):
-                social_links_info += f"\nGitHub URL from original resume: {social_links['github']}"
-        
-        prompt = f"""You are an expert resume writer. Create an optimized version of this resume that is specifically tailored to match the job description.
-
-ORIGINAL RESUME:
-{resume_text}
+        prompt = _optimize_prompt('optimize_resume', resume_text, job_description, suggestions, social_links)
 
-JOB DESCRIPTION:
-{job_description}
+        try:
+            return self._generate_with_fallback(prompt, optimize=True).text
+        except Exception as e:
+            return f"Error: {str(e)}"
+    
+    @_cached_response('analyze')
+    async def analyze_resume_async(self, resume_text: str, job_description: str) -> Dict:
+        """Non-blocking analyze_resume on generate_content_async; model fallback runs the sync path."""
+        if not self.is_available():
+            return {"error": "Gemini API not available. Set GEMINI_API_KEY."}
+        fitted_resume, fitted_job = _fit_to_context(resume_text, job_description, self.model)
+        prescreened = self._keyword_prescreen(fitted_resume, fitted_job)
+        if prescreened is not None:
+            return prescreened
+        
+        prompt = _load_prompt_template('analyze_resume_structured').substitute(
+            resume_text=_analysis_resume_text(fitted_resume),
+            job_description=fitted_job,
+        )
 
-SUGGESTIONS TO IMPLEMENT:
-{chr(10).join(suggestions[:10])}
-{social_links_info}
+        try:
+            response = await self._agenerate(self.client, prompt, generation_config=_GEMINI_STRUCTURED_ANALYZE_CONFIG)
+            return _structured_analysis(_json_loads(response.text), "Gemini")
+        except Exception as e:
+            if _is_model_not_found(e):
+                return await asyncio.to_thread(self.analyze_resume, resume_text, job_description)
+            return {"error": f"Gemini API error: {str(e)}"}
+    
+    @_cached_response('optimize')
+    async def optimize_resume_async(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None) -> str:
+        """Non-blocking optimize_resume on generate_content_async; model fallback runs the sync path."""
+        if not self.is_available():
+            return "Gemini API not available."
+        fitted_resume, fitted_job = _fit_to_context(resume_text, job_description, self.model)
+        
+        prompt = _optimize_prompt('optimize_resume', fitted_resume, fitted_job, suggestions, social_links)
 
-CRITICAL: If the original resume contains LinkedIn or GitHub links, you MUST preserve them in the header contact line with their full URLs.
+        try:
+            response = await self._agenerate(self._get_model(self.model, optimize=True), prompt)
+            return response.text
+        except Exception as e:
+            if _is_model_not_found(e):
+                return await asyncio.to_thread(self.optimize_resume, resume_text, job_description, suggestions, social_links)
+            return f"Error: {str(e)}"
 
-🚨 CRITICAL MANDATORY REQUIREMENT FOR EXPERIENCE SECTION 🚨
-YOU MUST COMPLETELY REWRITE EVERY EXPERIENCE BULLET POINT. DO NOT just add keywords or make minor edits.
-EACH BULLET MUST BE TRANSFORMED with actual content improvements, metrics, and job-relevant achievements.
 
-EXPERIENCE SECTION RULES (MANDATORY - APPLY TO EVERY BULLET):
-1. MANDATORY REWRITE: You MUST rewrite each bullet point from scratch. DO NOT copy-paste or make minor edits.
-   - If original says "Worked on projects" → Rewrite to "Designed and deployed 3 microservices using Python and Docker, reducing API response time by 45% and handling 50K+ requests daily"
-   - If original says "Managed team" → Rewrite to "Led cross-functional team of 5 engineers, implementing Agile practices that increased sprint velocity by 30% and reduced bug reports by 25%"
-   - Transform vague statements into specific, measurable achievements
-
-2. STRUCTURE (MANDATORY): Every bullet MUST use Problem → Action → Result OR Task → Tools → Impact format
-   - Example: "Addressed [specific problem] by implementing [specific solution] using [technologies], resulting in [quantifiable improvement]"
-   - Example: "Developed [specific feature/system] using [tools/tech], improving [metric] by [percentage/amount] and [business impact]"
-
-3. ACTION VERBS (MANDATORY): Use strong, varied verbs - DO NOT repeat verbs across bullets
-   - Use: Designed, Built, Implemented, Led, Automated, Analyzed, Developed, Optimized, Increased, Reduced, Managed, Created, Deployed, Architected, Streamlined, Accelerated, Transformed, etc.
-   - Vary verbs: If first bullet uses "Developed", second should use "Architected" or "Built", not "Developed" again
-
-4. QUANTITATIVE METRICS (MANDATORY): Every bullet MUST include at least ONE measurable metric:
-   - Numbers: "3 applications", "50K users", "5 team members"
-   - Percentages: "40% faster", "25% reduction", "30% increase"
-   - Time: "reduced from 5 hours to 30 minutes", "deployed in 2 weeks"
-   - Money: "$50K saved", "revenue increased by $200K"
-   - Scale: "serving 1M+ requests", "processing 10TB data daily"
-   - If original has no metrics, ADD realistic, job-relevant metrics based on the work described
-
-5. JOB RELEVANCE (MANDATORY): Every bullet MUST connect to job description requirements:
-   - Identify key technologies/tools from job description
-   - Identify key responsibilities/outcomes from job description
-   - Rewrite bullets to demonstrate experience with those technologies/responsibilities
-   - Example: If job requires "cloud deployment" and original says "deployed applications", rewrite to "Deployed scalable applications on AWS using EC2, S3, and Lambda, achieving 99.9% uptime and reducing infrastructure costs by 35%"
-
-6. SPECIFIC STRUCTURES (Use when relevant):
-   - "Addressed [specific problem] by using [technology/tool] to [specific action], improving [metric] by [%/amount] and [business impact]"
-   - "Collaborated with [specific teams/stakeholders] to [specific action], resulting in [quantifiable outcome] and [business value]"
-   - "Designed and implemented [specific solution] using [technologies], reducing [metric] by [amount] and enabling [business outcome]"
-
-7. TONE: Natural, business-professional, real resume writing style - NO generic/AI-style language
-
-8. AVOID filler phrases: NO 'leveraged cutting-edge', 'utilized synergistic', 'dynamic environment', 'synergistic solutions', 'passionate about', or vague wording
-
-9. CONTENT: Specific, measurable, aligned with industry expectations and job requirements
-
-10. VARIETY: Do NOT repeat sentence structures - vary your approach across bullets
-
-11. QUANTITY: Provide 4-6 bullet points per position (expand if original has fewer, consolidate if original has too many)
-
-12. BALANCE (CRITICAL): Maintain a 50/50 balance between quantifiable and technical points:
-    - 50% of bullets should be QUANTIFIABLE (heavy on metrics, numbers, percentages, measurable results)
-    - 50% of bullets should be TECHNICAL (job-relevant technical skills, technologies, implementations, but WITHOUT metrics/numbers)
-    - Example of quantifiable (50%): "Designed and deployed 3 microservices using Python and Docker, reducing API response time by 45% and handling 50K+ requests daily"
-    - Example of technical non-quantifiable (50%): "Architected microservices infrastructure using Docker, Kubernetes, and AWS ECS, implementing service mesh patterns and container orchestration best practices"
-    - Example of technical non-quantifiable (50%): "Developed RESTful APIs following OpenAPI specifications, implementing OAuth 2.0 authentication and JWT token management for secure access control"
-    - Example of technical non-quantifiable (50%): "Built data processing pipelines using Apache Spark and Kafka, implementing stream processing patterns and event-driven architecture for real-time analytics"
-    - For 4 bullets: 2 should be quantifiable, 2 should be technical (no metrics)
-    - For 5 bullets: 2-3 should be quantifiable, 2-3 should be technical (no metrics)
-    - For 6 bullets: 3 should be quantifiable, 3 should be technical (no metrics)
-    - DO NOT include soft skills (leadership, collaboration, strategic thinking) - focus ONLY on technical implementations, architectures, and technologies
-
-13. KEYWORDS: Include relevant keywords from job description NATURALLY within the rewritten content - NO keyword stuffing
-
-14. LEARNING: Extract and incorporate skills/technologies from BOTH job description AND candidate's resume
-
-15. TECHNICAL NON-QUANTIFIABLE BULLETS: For the 50% technical bullets (without metrics), focus on:
-    - Technical implementations and architectures (microservices, APIs, data pipelines, etc.)
-    - Technologies and tools from job description (Docker, Kubernetes, AWS services, frameworks, etc.)
-    - Technical patterns and best practices (RESTful design, event-driven architecture, etc.)
-    - System design and technical solutions
-    - Integration with specific technologies or platforms
-    - DO NOT include soft skills, leadership, collaboration, or strategic thinking
-    - These bullets should demonstrate technical depth and job-relevant technical expertise
-
-EXPERIENCE REWRITING EXAMPLES (MANDATORY TRANSFORMATION):
-
-BEFORE: "Worked on software development projects"
-AFTER: "Designed and built 3 enterprise applications using Python, React, and PostgreSQL, reducing API processing time by 40%, serving 10,000+ daily active users, and improving system reliability to 99.9% uptime"
-
-BEFORE: "Managed database operations"
-AFTER: "Addressed performance bottlenecks by implementing database indexing strategies and query optimization techniques, improving average query response time by 60% (from 2.5s to 1s), reducing server infrastructure costs by $50K annually, and enabling real-time analytics for 5K+ concurrent users"
-
-BEFORE: "Responsible for team coordination"
-AFTER: "Led cross-functional team of 8 engineers and 3 product managers, implementing Agile/Scrum methodologies that increased sprint velocity by 35%, reduced production bugs by 28%, and accelerated feature delivery from 4 weeks to 2.5 weeks average"
-
-BEFORE: "Used machine learning for data analysis"
-AFTER: "Developed and deployed machine learning models using Python, scikit-learn, and TensorFlow, improving prediction accuracy from 72% to 89%, processing 2M+ data points daily, and enabling automated decision-making that saved 20 hours/week of manual analysis"
-
-BEFORE: "Worked on backend systems"
-AFTER (TECHNICAL NON-QUANTIFIABLE - 50%): "Architected microservices infrastructure using Docker, Kubernetes, and AWS ECS, implementing service mesh patterns with Istio and container orchestration best practices for scalable distributed systems"
-
-BEFORE: "Developed APIs"
-AFTER (TECHNICAL NON-QUANTIFIABLE - 50%): "Designed and implemented RESTful APIs following OpenAPI 3.0 specifications, integrating OAuth 2.0 authentication, JWT token management, and rate limiting middleware for secure and scalable API architecture"
-
-⚠️ CRITICAL: Notice how each "AFTER" example:
-- Completely rewrites the content (not just adds keywords)
-- Includes specific technologies from job description (for quantifiable bullets)
-- Adds multiple quantitative metrics (for 70% of bullets)
-- Shows clear business impact (for 50% quantifiable bullets) or demonstrates technical depth and job-relevant technologies (for 50% technical bullets)
-- Uses varied, strong action verbs
-- Follows Problem → Action → Result structure
-- Maintains 50/50 balance: Half the bullets are quantifiable with metrics, half focus on technical implementations and technologies without metrics
-
-CRITICAL FORMATTING REQUIREMENTS - Follow this EXACT structure:
-
-1. HEADER (First Line):
-   [Full Name]
-   [Job Title/Position]
-   Location: [City, State] | Email: [email] | Phone: [phone] | LinkedIn: [linkedin_url] | GitHub: [github_url]
-   
-   IMPORTANT: If the original resume contains LinkedIn or GitHub links, you MUST include them in the contact line with their full URLs.
-   - Extract the actual URLs from the original resume (they are provided above if found)
-   - Format: "LinkedIn: https://linkedin.com/in/username" or "GitHub: https://github.com/username"
-   - Only include links that exist in the original resume
-   - If no LinkedIn/GitHub in original, omit them
-
-2. SUMMARY Section:
-   SUMMARY
-   [2-3 sentences summarizing experience and key qualifications relevant to the job]
-
-3. SKILLS Section:
-   SKILLS
-   [Category 1]: [skill1], [skill2], [skill3]
-   [Category 2]: [skill1], [skill2], [skill3]
-   [Category 3]: [skill1], [skill2], [skill3]
-
-   Common categories: Methodologies, Languages, IDEs, Packages/Libraries, Visualization Tools, Database, Other Skills, Operating System
-
-   CRITICAL SKILLS SECTION OPTIMIZATION (MANDATORY):
-   - ADD missing job-relevant skills from the job description to the SKILLS section (e.g., programming languages, tools, technologies, frameworks, methodologies)
-   - REORGANIZE skills to put most relevant skills for the job first within each category
-   - GROUP related skills together using appropriate categories (e.g., "Programming Languages:", "Tools & Technologies:", "Frameworks & Libraries:", "Methodologies:")
-   - REMOVE outdated or irrelevant skills that don't match the job requirements
-   - Include ALL key technical requirements mentioned in the job description
-   - Make the SKILLS section comprehensive and keyword-rich for ATS optimization while keeping it natural and credible
-   - DO NOT include skills that the candidate clearly doesn't have based on their experience
-
-4. EXPERIENCE Section:
-   EXPERIENCE
-   [Company Name], [Location] | [Start Date] - [End Date or Current] | [Job Title]
-   • [Bullet point describing achievement with metrics if possible]
-   • [Bullet point describing achievement with metrics if possible]
-   • [Bullet point describing achievement with metrics if possible]
-   
-   [Next Company], [Location] | [Start Date] - [End Date] | [Job Title]
-   • [Bullet point]
-   • [Bullet point]
-
-
-5. EDUCATION Section (ONLY if original resume has education):
-   EDUCATION
-   [Degree Name]: [University Name], [Location]
-   [Degree Name]: [University Name], [Location]
-   
-   ⚠️ CRITICAL: ONLY include education entries that exist in the original resume. 
-   - DO NOT add any education (Bachelor's, Master's, PhD, etc.) if it is NOT mentioned in the original resume
-   - Copy and paste education information exactly as it appears in the original resume
-   - If the original resume has no education section, DO NOT create one
-   - If the original resume only has a Master's degree, DO NOT add a Bachelor's degree
-   - Only include what is explicitly stated in the original resume
-
-6. PROJECTS Section (ONLY if original resume has projects):
-   PROJECTS
-   [Project Name] | [Technologies Used] | [Date or Duration]
-   • [Description of project and achievements]
-   • [Key features or results]
-   
-   [Next Project Name] | [Technologies Used] | [Date or Duration]
-   • [Description]
-   • [Key features or results]
-   
-   ⚠️ CRITICAL: Check for project sections using these common names (case-insensitive):
-   - "PROJECTS", "ACADEMIC PROJECTS", "SCHOOL PROJECTS", "PERSONAL PROJECTS"
-   - "SIDE PROJECTS", "PORTFOLIO PROJECTS", "CAPSTONE PROJECTS", "RESEARCH PROJECTS"
-   - "INDIVIDUAL PROJECTS", "TEAM PROJECTS", "GROUP PROJECTS", "COURSE PROJECTS"
-   - "UNIVERSITY PROJECTS", "COLLEGE PROJECTS", or any section containing the word "PROJECT"
-   - If ANY of these exist in the original resume, include the PROJECTS section
-   - If NONE of these exist, do NOT add a PROJECTS section
-
-IMPORTANT INSTRUCTIONS:
-- Maintain ALL original information - only enhance and optimize, don't remove truthful content
-- Use the EXACT section headers: SUMMARY, SKILLS, EXPERIENCE, EDUCATION (all caps)
-- Include EDUCATION section ONLY if the original resume has an education section - do NOT add education if it doesn't exist in the original
-- Include PROJECTS section ONLY if the original resume has a projects section (check for: "PROJECTS", "ACADEMIC PROJECTS", "SCHOOL PROJECTS", "PERSONAL PROJECTS", "SIDE PROJECTS", "PORTFOLIO PROJECTS", "CAPSTONE PROJECTS", "RESEARCH PROJECTS", "INDIVIDUAL PROJECTS", "TEAM PROJECTS", "GROUP PROJECTS", "COURSE PROJECTS", "UNIVERSITY PROJECTS", "COLLEGE PROJECTS", or any section containing "PROJECT") - do NOT add projects if they don't exist in the original
-- CRITICAL: For EDUCATION section, ONLY copy education entries that are explicitly mentioned in the original resume. DO NOT add Bachelor's, Master's, or any other degree if it is not in the original resume
-- For experience entries, use format: "Company, Location | Date Range | Position"
-- For projects, use format: "Project Name | Technologies | Date/Duration"
-- Use bullet points (•) for experience and project descriptions
-
-⚠️ REMINDER: For EXPERIENCE section bullets, apply the rules specified at the top of this prompt (Problem → Action → Result format, varied action verbs, specific structures, natural tone, no filler phrases, 4-6 bullets, metrics, etc.)
-
-- Reorder experience to highlight most relevant positions first
-- Keep formatting clean and professional
+# JSON mode constrained to ANALYSIS_SCHEMA (cohere>=5)
+_COHERE_ANALYSIS_FORMAT = {"type": "json_object", "schema": ANALYSIS_SCHEMA}
 
-OUTPUT FORMAT - RETURN ONLY VALID JSON (NO OTHER TEXT):
-Return the optimized resume as a JSON object with this EXACT structure:
 
-{{
-  "name": "Full Name",
-  "title": "Job Title/Position",
-  "contact": ["Location: City, State", "Email: email@example.com", "Phone: (123) 456-7890", "LinkedIn: https://linkedin.com/in/username", "GitHub: https://github.com/username"],
-  "summary": "Complete summary paragraph as single string",
-  "skills": {{
-    "Category 1": ["skill1", "skill2", "skill3"],
-    "Category 2": ["skill1", "skill2", "skill3"]
-  }},
-  "experience": [
-    {{
-      "company": "Company Name",
-      "location": "City, State",
-      "dates": "Start Date - End Date",
-      "title": "Job Title",
-      "bullets": [
-        "First bullet point with achievements and metrics",
-        "Second bullet point with achievements and metrics"
-      ]
-    }}
-  ],
-  "education": [
-    {{
-      "degree": "Degree Name",
-      "institution": "University Name",
-      "location": "City, State"
-    }}
-  ],
-  "certifications": [
-    "Certification exactly as written in original resume (e.g., AWS Certified Solutions Architect, 2023)",
-    "Another certification"
-  ],
-  "projects": [
-    {{
-      "name": "Project Name",
-      "technologies": "Tech stack used",
-      "date": "Date or Duration",
-      "bullets": [
-        "Project description and achievements",
-        "Key features or results"
-      ]
-    }}
-  ],
-  "awards": [
-    "Award exactly as written in original resume",
-    "Another award or honor"
-  ],
-  "publications": [
-    "Publication exactly as written in original resume",
-    "Another publication"
-  ],
-  "volunteer": [
-    "Volunteer work exactly as written in original resume",
-    "Another volunteer experience"
-  ]
-}}
+@functools.lru_cache(maxsize=None)
+def _method_parameters(client_class: type, method: str) -> FrozenSet[str]:
+    """Parameter names a client method accepts, read from its signature once per SDK class."""
+    try:
+        return frozenset(inspect.signature(getattr(client_class, method)).parameters)
+    except (AttributeError, TypeError, ValueError):
+        return frozenset()
 
-CRITICAL JSON RULES:
-- Return ONLY valid JSON - no markdown, no explanations, no code blocks
-- Include sections ONLY if they exist in original resume:
-  * "education" - Check for: EDUCATION, ACADEMIC BACKGROUND, QUALIFICATIONS, ACADEMIC QUALIFICATIONS
-  * "certifications" - Check for: CERTIFICATIONS, CERTIFICATES, PROFESSIONAL CERTIFICATIONS, LICENSES, LICENSE & CERTIFICATIONS
-  * "projects" - Check for: PROJECTS, ACADEMIC PROJECTS, PERSONAL PROJECTS, SIDE PROJECTS, PORTFOLIO
-  * "awards" - Check for: AWARDS, HONORS, ACHIEVEMENTS, HONORS & AWARDS, RECOGNITION
-  * "publications" - Check for: PUBLICATIONS, RESEARCH, PAPERS, PUBLISHED WORK
-  * "volunteer" - Check for: VOLUNTEER, VOLUNTEER WORK, VOLUNTEER EXPERIENCE, COMMUNITY SERVICE
-- If a section doesn't exist in original resume, DO NOT include it in JSON
-- Preserve original formatting for certifications, awards, publications, volunteer (copy exactly as written)
-- All strings must be properly escaped
-- Contact array MUST include ALL contact info from original: Location, Email, Phone, LinkedIn, GitHub (include all that are present)
-- Experience bullets must follow all the rules specified above (metrics, rewriting, etc.)
-- Section order in output: summary → skills → experience → education → certifications → projects → awards → publications → volunteer"""
 
+def _cohere_client(client_class, api_key: str, http_client):
+    """
+    Cohere client on the given pooled httpx client. Only the httpx-based SDK
+    (cohere>=5) accepts one; older releases manage their own session.
+    """
+    if http_client is not None:
         try:
-            # Try with current model, fallback to other models if needed
-            try:
-                response = self.client.generate_content(prompt)
-                return response.text
-            except Exception as e:
-                # If model not found, try fallback models
-                if "not found" in str(e).lower() or "404" in str(e):
-                    if self.genai:
-                        fallback_models = ["gemini-flash-latest", "gemini-2.0-flash", "gemini-pro-latest"]
-                        for model_name in fallback_models:
-                            try:
-                                fallback_model = self.genai.GenerativeModel(model_name)
-                                response = fallback_model.generate_content(prompt)
-                                self.model = model_name
-                                self.client = fallback_model
-                                return response.text
-                            except:
-                                continue
-                raise e
-        except Exception as e:
-            return f"Error: {str(e)}"
+            return client_class(api_key=api_key, httpx_client=http_client)
+        except TypeError:
+            pass
+    return client_class(api_key=api_key)
 
 
-class CohereProvider(AIProvider):
+class CohereProvider(_AsyncSDKProvider):
     """Cohere AI Provider."""
     
+    __slots__ = ()
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv('COHERE_API_KEY')
         self.client = None
         self.model = "command-r-plus"
+        self._async_client = self._async_loop = self._async_semaphore = None
         
-        try:
-            import cohere
-            if self.api_key:
-                self.client = cohere.Client(api_key=self.api_key)
-        except ImportError:
-            pass
+        cohere = _import_sdk('cohere') if self.api_key else None
+        if cohere is not None:
+            self.client = _cohere_client(cohere.Client, self.api_key, shared_http_client())
     
     def is_available(self) -> bool:
         return self.client is not None
     
+    @_retry_transient
+    def _chat(self, **kwargs):
+        """Chat call, retried on transient API errors."""
+        return self.client.chat(**kwargs)
+    
+    def _new_async_client(self):
+        """Cohere AsyncClient for the running event loop, with its own pooled httpx client where supported."""
+        return _cohere_client(_import_sdk('cohere').AsyncClient, self.api_key, async_http_client())
+    
+    @_retry_transient
+    async def _achat(self, **kwargs):
+        """Async chat call, retried on transient API errors."""
+        client = self._get_async_client()
+        async with self._async_semaphore:
+            return await client.chat(**kwargs)
+    
+    def _accepts(self, parameter: str) -> bool:
+        """Whether the installed SDK's chat() takes parameter (the pinned 4.x lacks several of 5.x's)."""
+        return parameter in _method_parameters(type(self.client), 'chat')
+    
+    def _analyze_request(self, resume_text: str, job_description: str, structured: bool = False) -> Dict:
+        """Chat arguments for analyze_resume; structured asks for ANALYSIS_SCHEMA JSON (JSON mode) instead of text."""
+        prompt = _load_prompt_template('analyze_resume_structured' if structured else 'analyze_resume').substitute(
+            resume_text=_analysis_resume_text(resume_text),
+            job_description=job_description,
+        )
+
+        request = dict(
+            model=self.model,
+            message=prompt,
+            temperature=0.2,  # Lower temperature for more strict scoring
+            max_tokens=3000
+        )
+        if structured:
+            request['response_format'] = _COHERE_ANALYSIS_FORMAT
+        return request
+    
+    @staticmethod
+    def _analysis_result(text: str, structured: bool) -> Dict:
+        """Analysis dict for a JSON-mode or plain-text (SDKs without JSON mode) response."""
+        if structured:
+            return _structured_analysis(_json_loads(text), "Cohere")
+        return {"raw_analysis": text, "provider": "Cohere"}
+    
+    @_cached_response('analyze')
     def analyze_resume(self, resume_text: str, job_description: str) -> Dict:
         if not self.is_available():
             return {"error": "Cohere API not available. Set COHERE_API_KEY."}
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        prescreened = self._keyword_prescreen(resume_text, job_description)
+        if prescreened is not None:
+            return prescreened
         
-        prompt = f"""You are a resume analyst. Analyze this resume against the job description and provide a strict, accurate match score.
-
-JOB DESCRIPTION:
-{job_description}
-
-RESUME:
-{resume_text}
-
-SCORING CRITERIA - Evaluate the resume using these specific factors:
-
-1. REQUIRED SKILLS MATCH (50 points - 50% of total score):
-   - CRITICAL: This is the most important factor - it accounts for half of the total score
-   - Identify ALL required technical skills, tools, technologies, and competencies mentioned in the job description
-   - Count how many required skills are present in the resume
-   - Score: (skills_found / skills_required) × 50
-   - Example: If job requires 10 skills and resume has 6, score = (6/10) × 50 = 30 points
-   - Example: If job requires 8 skills and resume has 8, score = (8/8) × 50 = 50 points
-   - Be thorough in identifying skills - include programming languages, frameworks, tools, methodologies, soft skills, certifications, etc.
-
-2. EXPERIENCE LEVEL MATCH (20 points):
-   - Check if experience level matches (Junior, Mid-level, Senior, Lead, Principal, etc.)
-   - Perfect match: 20 points
-   - One level off (e.g., Mid applying to Senior): 12 points
-   - Two+ levels off (e.g., Junior applying to Senior): 5 points
-   - No clear level in resume: 8 points
-
-3. YEARS OF EXPERIENCE (12 points):
-   - Compare required years of experience vs. candidate's total experience
-   - Meets or exceeds requirement: 12 points
-   - Within 1-2 years: 8 points
-   - Within 3-4 years: 4 points
-   - More than 4 years short: 0 points
-   - No requirement specified: 6 points (neutral)
-
-4. JOB TITLE RELEVANCE (10 points):
-   - Check if candidate's current/past job titles are relevant to the target role
-   - Exact or very similar title: 10 points
-   - Related title in same field: 7 points
-   - Different field but transferable skills: 3 points
-   - Completely unrelated: 0 points
-
-5. EDUCATION REQUIREMENTS (5 points):
-   - Check if education level matches (Bachelor's, Master's, PhD, etc.)
-   - Meets requirement: 5 points
-   - One level below: 3 points
-   - Two+ levels below: 0 points
-   - No requirement specified: 2.5 points (neutral)
-
-6. INDUSTRY/DOMAIN EXPERIENCE (3 points):
-   - Check if candidate has experience in the same or related industry
-   - Same industry: 3 points
-   - Related industry: 2 points
-   - Different industry: 0 points
-   - No industry specified in job: 1.5 points (neutral)
-
-TOTAL SCORE CALCULATION:
-- Add up all 6 factors (max 100 points)
-- Required Skills Match = 50 points (50% of total)
-- Other factors = 50 points combined (50% of total)
-- Round to nearest whole number
-- This is your MATCH_SCORE
-
-SCORING GUIDELINES:
-- 0-40%: Missing most required skills, significant experience level mismatch, or major gaps
-- 40-70%: Has some required skills and relevant experience, but missing key requirements
-- 70-100%: Meets most/all requirements, strong skill match, appropriate experience level
-
-Be STRICT - only give 70+ if the candidate truly meets most requirements.
-
-Provide your analysis in this EXACT format:
-
-MATCH_SCORE: [number between 0-100 - be strict!]
-STRENGTHS:
-- [strength 1]
-- [strength 2]
-- ...
-
-IMPROVEMENTS_NEEDED:
-- [specific content change 1]
-- [specific content change 2]
-- ...
-
-CONTENT_SUGGESTIONS:
-1. [Section/Area]: [What to change] - [Why] - [How to improve it]
-2. [Section/Area]: [What to change] - [Why] - [How to improve it]
-...
-
-Start your response with "MATCH_SCORE:" immediately."""
+        structured = self._accepts('response_format')
+        try:
+            response = self._chat(**self._analyze_request(resume_text, job_description, structured))
+            return self._analysis_result(response.text, structured)
+        except Exception as e:
+            return {"error": f"Cohere API error: {str(e)}"}
+    
+    def analyze_resume_stream(self, resume_text: str, job_description: str) -> Iterator[str]:
+        """
+        Stream the raw analysis text as Cohere generates it.
 
+        Errors are raised, not returned, since a partial stream cannot be
+        replaced by an error dict.
+        """
+        if not self.is_available():
+            raise RuntimeError("Cohere API not available. Set COHERE_API_KEY.")
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        prescreened = self._keyword_prescreen(resume_text, job_description)
+        if prescreened is not None:
+            yield prescreened["raw_analysis"]
+            return
+        
+        request = self._analyze_request(resume_text, job_description)
+        # cohere>=5 has chat_stream; older releases stream from chat(stream=True)
+        chat_stream = getattr(self.client, 'chat_stream', None)
+        events = chat_stream(**request) if chat_stream is not None else self.client.chat(**request, stream=True)
+        for event in events:
+            if event.event_type == "text-generation" and event.text:
+                yield event.text
+    
+    @_cached_response('analyze')
+    async def analyze_resume_async(self, resume_text: str, job_description: str) -> Dict:
+        if not self.is_available():
+            return {"error": "Cohere API not available. Set COHERE_API_KEY."}
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
+        prescreened = self._keyword_prescreen(resume_text, job_description)
+        if prescreened is not None:
+            return prescreened
+        
+        structured = self._accepts('response_format')
         try:
-            response = self.client.chat(
-                model=self.model,
-                message=prompt,
-                temperature=0.2,  # Lower temperature for more strict scoring
-                max_tokens=3000
-            )
-            return {"raw_analysis": response.text, "provider": "Cohere"}
+            response = await self._achat(**self._analyze_request(resume_text, job_description, structured))
+            return self._analysis_result(response.text, structured)
         except Exception as e:
             return {"error": f"Cohere API error: {str(e)}"}
     
+    def _optimize_request(self, resume_text: str, job_description: str, suggestions: List[str],
+                          social_links: Optional[Dict] = None) -> Dict:
+        """Chat arguments for optimize_resume."""
+        prompt = _optimize_prompt('optimize_resume', resume_text, job_description, suggestions, social_links)
+
+        # The static rules go in the preamble; cohere>=5 calls it preamble, 4.x preamble_override
+        preamble = 'preamble' if self._accepts('preamble') else 'preamble_override'
+        return {
+            'model': self.model,
+            preamble: _optimize_rules(),
+            'message': prompt,
+            'temperature': OPTIMIZE_TEMPERATURE,
+            'max_tokens': _output_token_budget(resume_text)
+        }
+    
+    @_cached_response('optimize')
     def optimize_resume(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None) -> str:
         if not self.is_available():
             return "Cohere API not available."
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
         
-        # Prepare social links information for the prompt
-        social_links_info = ""
-        if social_links:
-            if social_links.get('linkedin'):
-                social_links_info += f"\nLinkedIn URL from original resume: {social_links['linkedin']}"
-            if social_links.get('github'):
-                social_links_info += f"\nGitHub URL from original resume: {social_links['github']}"
+        try:
+            response = self._chat(**self._optimize_request(resume_text, job_description, suggestions, social_links))
+            return response.text
+        except Exception as e:
+            return f"Error: {str(e)}"
+    
+    @_cached_response('optimize')
+    async def optimize_resume_async(self, resume_text: str, job_description: str, suggestions: List[str], social_links: Optional[Dict] = None) -> str:
+        if not self.is_available():
+            return "Cohere API not available."
+        resume_text, job_description = _fit_to_context(resume_text, job_description, self.model)
         
-        prompt = f"""You are an expert resume writer. Create an optimized version of this resume that is specifically tailored to match the job description.
+        try:
+            response = await self._achat(**self._optimize_request(resume_text, job_description, suggestions, social_links))
+            return response.text
+        except Exception as e:
+            return f"Error: {str(e)}"
 
-ORIGINAL RESUME:
-{resume_text}
 
-JOB DESCRIPTION:
-{job_description}
+# Provider name -> class, built once at import instead of on every lookup
+_PROVIDER_CLASSES: Mapping[str, Type[AIProvider]] = MappingProxyType({
+    "groq": GroqProvider,
+    "openai": OpenAIProvider,
+    "claude": ClaudeProvider,
+    "gemini": GeminiProvider,
+    "cohere": CohereProvider,
+})
 
-SUGGESTIONS TO IMPLEMENT:
-{chr(10).join(suggestions[:10])}
-{social_links_info}
+# Constructed providers keyed on (provider_name, sha256(api_key)). Each provider
+# owns an SDK client with its own HTTP connection pool, so reusing the instance
+# keeps TCP/TLS connections alive across requests instead of re-handshaking.
+# Only the CLIENT_CACHE_SIZE most recently used are kept.
+_PROVIDER_CACHE: "OrderedDict[Tuple[str, str], AIProvider]" = OrderedDict()
+_PROVIDER_CACHE_LOCK = threading.Lock()
 
-CRITICAL: If the original resume contains LinkedIn or GitHub links, you MUST preserve them in the header contact line with their full URLs.
 
-🚨 CRITICAL MANDATORY REQUIREMENT FOR EXPERIENCE SECTION 🚨
-YOU MUST COMPLETELY REWRITE EVERY EXPERIENCE BULLET POINT. DO NOT just add keywords or make minor edits.
-EACH BULLET MUST BE TRANSFORMED with actual content improvements, metrics, and job-relevant achievements.
+def get_ai_provider(provider_name: str, api_key: Optional[str] = None) -> Optional[AIProvider]:
+    """Get AI provider by name (cached per provider and API key)."""
+    name = provider_name.casefold()
+    provider_class = _PROVIDER_CLASSES.get(name)
+    if not provider_class:
+        return None
+    
+    key = (name, hashlib.sha256((api_key or "").encode()).hexdigest())
+    with _PROVIDER_CACHE_LOCK:
+        provider = _PROVIDER_CACHE.get(key)
+        if provider is not None:
+            _PROVIDER_CACHE.move_to_end(key)
+            return provider
+    
+    provider = provider_class(api_key)
+    # Only cache usable providers so a key added to the environment later is picked up
+    if provider.is_available():
+        with _PROVIDER_CACHE_LOCK:
+            provider = _PROVIDER_CACHE.setdefault(key, provider)
+            while len(_PROVIDER_CACHE) > CLIENT_CACHE_SIZE:
+                _PROVIDER_CACHE.popitem(last=False)
+    return provider
+
+
+async def analyze_resume_with_providers(providers: List[AIProvider], resume_text: str,
+                                        job_description: str) -> List[Dict]:
+    """
+    Analyze one resume with several providers concurrently (e.g. to compare scores).
+
+    Latency is the slowest provider's rather than the sum. A provider that
+    raises gets an error dict instead of failing the others.
+
+    Returns:
+        One analysis dict per provider, in input order
+    """
+    results = await asyncio.gather(
+        *(provider.analyze_resume_async(resume_text, job_description) for provider in providers),
+        return_exceptions=True
+    )
+    return [
+        {"error": f"{type(provider).__name__} error: {result}"} if isinstance(result, Exception) else result
+        for provider, result in zip(providers, results)
+    ]
 
-EXPERIENCE SECTION RULES (MANDATORY - APPLY TO EVERY BULLET):
-1. MANDATORY REWRITE: You MUST rewrite each bullet point from scratch. DO NOT copy-paste or make minor edits.
-   - If original says "Worked on projects" → Rewrite to "Designed and deployed 3 microservices using Python and Docker, reducing API response time by 45% and handling 50K+ requests daily"
-   - If original says "Managed team" → Rewrite to "Led cross-functional team of 5 engineers, implementing Agile practices that increased sprint velocity by 30% and reduced bug reports by 25%"
-   - Transform vague statements into specific, measurable achievements
-
-2. STRUCTURE (MANDATORY): Every bullet MUST use Problem → Action → Result OR Task → Tools → Impact format
-   - Example: "Addressed [specific problem] by implementing [specific solution] using [technologies], resulting in [quantifiable improvement]"
-   - Example: "Developed [specific feature/system] using [tools/tech], improving [metric] by [percentage/amount] and [business impact]"
-
-3. ACTION VERBS (MANDATORY): Use strong, varied verbs - DO NOT repeat verbs across bullets
-   - Use: Designed, Built, Implemented, Led, Automated, Analyzed, Developed, Optimized, Increased, Reduced, Managed, Created, Deployed, Architected, Streamlined, Accelerated, Transformed, etc.
-   - Vary verbs: If first bullet uses "Developed", second should use "Architected" or "Built", not "Developed" again
-
-4. QUANTITATIVE METRICS (MANDATORY): Every bullet MUST include at least ONE measurable metric:
-   - Numbers: "3 applications", "50K users", "5 team members"
-   - Percentages: "40% faster", "25% reduction", "30% increase"
-   - Time: "reduced from 5 hours to 30 minutes", "deployed in 2 weeks"
-   - Money: "$50K saved", "revenue increased by $200K"
-   - Scale: "serving 1M+ requests", "processing 10TB data daily"
-   - If original has no metrics, ADD realistic, job-relevant metrics based on the work described
-
-5. JOB RELEVANCE (MANDATORY): Every bullet MUST connect to job description requirements:
-   - Identify key technologies/tools from job description
-   - Identify key responsibilities/outcomes from job description
-   - Rewrite bullets to demonstrate experience with those technologies/responsibilities
-   - Example: If job requires "cloud deployment" and original says "deployed applications", rewrite to "Deployed scalable applications on AWS using EC2, S3, and Lambda, achieving 99.9% uptime and reducing infrastructure costs by 35%"
-
-6. SPECIFIC STRUCTURES (Use when relevant):
-   - "Addressed [specific problem] by using [technology/tool] to [specific action], improving [metric] by [%/amount] and [business impact]"
-   - "Collaborated with [specific teams/stakeholders] to [specific action], resulting in [quantifiable outcome] and [business value]"
-   - "Designed and implemented [specific solution] using [technologies], reducing [metric] by [amount] and enabling [business outcome]"
-
-7. TONE: Natural, business-professional, real resume writing style - NO generic/AI-style language
-
-8. AVOID filler phrases: NO 'leveraged cutting-edge', 'utilized synergistic', 'dynamic environment', 'synergistic solutions', 'passionate about', or vague wording
-
-9. CONTENT: Specific, measurable, aligned with industry expectations and job requirements
-
-10. VARIETY: Do NOT repeat sentence structures - vary your approach across bullets
-
-11. QUANTITY: Provide 4-6 bullet points per position (expand if original has fewer, consolidate if original has too many)
-
-12. BALANCE (CRITICAL): Maintain a 50/50 balance between quantifiable and technical points:
-    - 50% of bullets should be QUANTIFIABLE (heavy on metrics, numbers, percentages, measurable results)
-    - 50% of bullets should be TECHNICAL (job-relevant technical skills, technologies, implementations, but WITHOUT metrics/numbers)
-    - Example of quantifiable (50%): "Designed and deployed 3 microservices using Python and Docker, reducing API response time by 45% and handling 50K+ requests daily"
-    - Example of technical non-quantifiable (50%): "Architected microservices infrastructure using Docker, Kubernetes, and AWS ECS, implementing service mesh patterns and container orchestration best practices"
-    - Example of technical non-quantifiable (50%): "Developed RESTful APIs following OpenAPI specifications, implementing OAuth 2.0 authentication and JWT token management for secure access control"
-    - Example of technical non-quantifiable (50%): "Built data processing pipelines using Apache Spark and Kafka, implementing stream processing patterns and event-driven architecture for real-time analytics"
-    - For 4 bullets: 2 should be quantifiable, 2 should be technical (no metrics)
-    - For 5 bullets: 2-3 should be quantifiable, 2-3 should be technical (no metrics)
-    - For 6 bullets: 3 should be quantifiable, 3 should be technical (no metrics)
-    - DO NOT include soft skills (leadership, collaboration, strategic thinking) - focus ONLY on technical implementations, architectures, and technologies
-
-13. KEYWORDS: Include relevant keywords from job description NATURALLY within the rewritten content - NO keyword stuffing
-
-14. LEARNING: Extract and incorporate skills/technologies from BOTH job description AND candidate's resume
-
-15. TECHNICAL NON-QUANTIFIABLE BULLETS: For the 50% technical bullets (without metrics), focus on:
-    - Technical implementations and architectures (microservices, APIs, data pipelines, etc.)
-    - Technologies and tools from job description (Docker, Kubernetes, AWS services, frameworks, etc.)
-    - Technical patterns and best practices (RESTful design, event-driven architecture, etc.)
-    - System design and technical solutions
-    - Integration with specific technologies or platforms
-    - DO NOT include soft skills, leadership, collaboration, or strategic thinking
-    - These bullets should demonstrate technical depth and job-relevant technical expertise
-
-EXPERIENCE REWRITING EXAMPLES (MANDATORY TRANSFORMATION):
-
-BEFORE: "Worked on software development projects"
-AFTER: "Designed and built 3 enterprise applications using Python, React, and PostgreSQL, reducing API processing time by 40%, serving 10,000+ daily active users, and improving system reliability to 99.9% uptime"
-
-BEFORE: "Managed database operations"
-AFTER: "Addressed performance bottlenecks by implementing database indexing strategies and query optimization techniques, improving average query response time by 60% (from 2.5s to 1s), reducing server infrastructure costs by $50K annually, and enabling real-time analytics for 5K+ concurrent users"
-
-BEFORE: "Responsible for team coordination"
-AFTER: "Led cross-functional team of 8 engineers and 3 product managers, implementing Agile/Scrum methodologies that increased sprint velocity by 35%, reduced production bugs by 28%, and accelerated feature delivery from 4 weeks to 2.5 weeks average"
-
-BEFORE: "Used machine learning for data analysis"
-AFTER: "Developed and deployed machine learning models using Python, scikit-learn, and TensorFlow, improving prediction accuracy from 72% to 89%, processing 2M+ data points daily, and enabling automated decision-making that saved 20 hours/week of manual analysis"
-
-BEFORE: "Worked on backend systems"
-AFTER (TECHNICAL NON-QUANTIFIABLE - 50%): "Architected microservices infrastructure using Docker, Kubernetes, and AWS ECS, implementing service mesh patterns with Istio and container orchestration best practices for scalable distributed systems"
-
-BEFORE: "Developed APIs"
-AFTER (TECHNICAL NON-QUANTIFIABLE - 50%): "Designed and implemented RESTful APIs following OpenAPI 3.0 specifications, integrating OAuth 2.0 authentication, JWT token management, and rate limiting middleware for secure and scalable API architecture"
-
-⚠️ CRITICAL: Notice how each "AFTER" example:
-- Completely rewrites the content (not just adds keywords)
-- Includes specific technologies from job description (for quantifiable bullets)
-- Adds multiple quantitative metrics (for 70% of bullets)
-- Shows clear business impact (for 50% quantifiable bullets) or demonstrates technical depth and job-relevant technologies (for 50% technical bullets)
-- Uses varied, strong action verbs
-- Follows Problem → Action → Result structure
-- Maintains 50/50 balance: Half the bullets are quantifiable with metrics, half focus on technical implementations and technologies without metrics
-
-CRITICAL FORMATTING REQUIREMENTS - Follow this EXACT structure:
-
-1. HEADER (First Line):
-   [Full Name]
-   [Job Title/Position]
-   Location: [City, State] | Email: [email] | Phone: [phone] | LinkedIn: [linkedin_url] | GitHub: [github_url]
-   
-   IMPORTANT: If the original resume contains LinkedIn or GitHub links, you MUST include them in the contact line with their full URLs.
-   - Extract the actual URLs from the original resume (they are provided above if found)
-   - Format: "LinkedIn: https://linkedin.com/in/username" or "GitHub: https://github.com/username"
-   - Only include links that exist in the original resume
-   - If no LinkedIn/GitHub in original, omit them
-
-2. SUMMARY Section:
-   SUMMARY
-   [2-3 sentences summarizing experience and key qualifications relevant to the job]
-
-3. SKILLS Section:
-   SKILLS
-   [Category 1]: [skill1], [skill2], [skill3]
-   [Category 2]: [skill1], [skill2], [skill3]
-   [Category 3]: [skill1], [skill2], [skill3]
-
-   Common categories: Methodologies, Languages, IDEs, Packages/Libraries, Visualization Tools, Database, Other Skills, Operating System
-
-   CRITICAL SKILLS SECTION OPTIMIZATION (MANDATORY):
-   - ADD missing job-relevant skills from the job description to the SKILLS section (e.g., programming languages, tools, technologies, frameworks, methodologies)
-   - REORGANIZE skills to put most relevant skills for the job first within each category
-   - GROUP related skills together using appropriate categories (e.g., "Programming Languages:", "Tools & Technologies:", "Frameworks & Libraries:", "Methodologies:")
-   - REMOVE outdated or irrelevant skills that don't match the job requirements
-   - Include ALL key technical requirements mentioned in the job description
-   - Make the SKILLS section comprehensive and keyword-rich for ATS optimization while keeping it natural and credible
-   - DO NOT include skills that the candidate clearly doesn't have based on their experience
-
-4. EXPERIENCE Section:
-   EXPERIENCE
-   [Company Name], [Location] | [Start Date] - [End Date or Current] | [Job Title]
-   • [Bullet point describing achievement with metrics if possible]
-   • [Bullet point describing achievement with metrics if possible]
-   • [Bullet point describing achievement with metrics if possible]
-   
-   [Next Company], [Location] | [Start Date] - [End Date] | [Job Title]
-   • [Bullet point]
-   • [Bullet point]
-
-
-5. EDUCATION Section (ONLY if original resume has education):
-   EDUCATION
-   [Degree Name]: [University Name], [Location]
-   [Degree Name]: [University Name], [Location]
-   
-   ⚠️ CRITICAL: ONLY include education entries that exist in the original resume. 
-   - DO NOT add any education (Bachelor's, Master's, PhD, etc.) if it is NOT mentioned in the original resume
-   - Copy and paste education information exactly as it appears in the original resume
-   - If the original resume has no education section, DO NOT create one
-   - If the original resume only has a Master's degree, DO NOT add a Bachelor's degree
-   - Only include what is explicitly stated in the original resume
-
-6. PROJECTS Section (ONLY if original resume has projects):
-   PROJECTS
-   [Project Name] | [Technologies Used] | [Date or Duration]
-   • [Description of project and achievements]
-   • [Key features or results]
-   
-   [Next Project Name] | [Technologies Used] | [Date or Duration]
-   • [Description]
-   • [Key features or results]
-   
-   ⚠️ CRITICAL: Check for project sections using these common names (case-insensitive):
-   - "PROJECTS", "ACADEMIC PROJECTS", "SCHOOL PROJECTS", "PERSONAL PROJECTS"
-   - "SIDE PROJECTS", "PORTFOLIO PROJECTS", "CAPSTONE PROJECTS", "RESEARCH PROJECTS"
-   - "INDIVIDUAL PROJECTS", "TEAM PROJECTS", "GROUP PROJECTS", "COURSE PROJECTS"
-   - "UNIVERSITY PROJECTS", "COLLEGE PROJECTS", or any section containing the word "PROJECT"
-   - If ANY of these exist in the original resume, include the PROJECTS section
-   - If NONE of these exist, do NOT add a PROJECTS section
-
-IMPORTANT INSTRUCTIONS:
-- Maintain ALL original information - only enhance and optimize, don't remove truthful content
-- Use the EXACT section headers: SUMMARY, SKILLS, EXPERIENCE, EDUCATION (all caps)
-- Include EDUCATION section ONLY if the original resume has an education section - do NOT add education if it doesn't exist in the original
-- Include PROJECTS section ONLY if the original resume has a projects section (check for: "PROJECTS", "ACADEMIC PROJECTS", "SCHOOL PROJECTS", "PERSONAL PROJECTS", "SIDE PROJECTS", "PORTFOLIO PROJECTS", "CAPSTONE PROJECTS", "RESEARCH PROJECTS", "INDIVIDUAL PROJECTS", "TEAM PROJECTS", "GROUP PROJECTS", "COURSE PROJECTS", "UNIVERSITY PROJECTS", "COLLEGE PROJECTS", or any section containing "PROJECT") - do NOT add projects if they don't exist in the original
-- CRITICAL: For EDUCATION section, ONLY copy education entries that are explicitly mentioned in the original resume. DO NOT add Bachelor's, Master's, or any other degree if it is not in the original resume
-- For experience entries, use format: "Company, Location | Date Range | Position"
-- For projects, use format: "Project Name | Technologies | Date/Duration"
-- Use bullet points (•) for experience and project descriptions
-
-⚠️ REMINDER: For EXPERIENCE section bullets, apply the rules specified at the top of this prompt (Problem → Action → Result format, varied action verbs, specific structures, natural tone, no filler phrases, 4-6 bullets, metrics, etc.)
-
-- Reorder experience to highlight most relevant positions first
-- Keep formatting clean and professional
 
-OUTPUT FORMAT - RETURN ONLY VALID JSON (NO OTHER TEXT):
-Return the optimized resume as a JSON object with this EXACT structure:
+# Seconds an availability check is reused; the UI asks on every render
+PROVIDER_AVAILABILITY_TTL = 60
 
-{{
-  "name": "Full Name",
-  "title": "Job Title/Position",
-  "contact": ["Location: City, State", "Email: email@example.com", "Phone: (123) 456-7890", "LinkedIn: https://linkedin.com/in/username", "GitHub: https://github.com/username"],
-  "summary": "Complete summary paragraph as single string",
-  "skills": {{
-    "Category 1": ["skill1", "skill2", "skill3"],
-    "Category 2": ["skill1", "skill2", "skill3"]
-  }},
-  "experience": [
-    {{
-      "company": "Company Name",
-      "location": "City, State",
-      "dates": "Start Date - End Date",
-      "title": "Job Title",
-      "bullets": [
-        "First bullet point with achievements and metrics",
-        "Second bullet point with achievements and metrics"
-      ]
-    }}
-  ],
-  "education": [
-    {{
-      "degree": "Degree Name",
-      "institution": "University Name",
-      "location": "City, State"
-    }}
-  ],
-  "certifications": [
-    "Certification exactly as written in original resume (e.g., AWS Certified Solutions Architect, 2023)",
-    "Another certification"
-  ],
-  "projects": [
-    {{
-      "name": "Project Name",
-      "technologies": "Tech stack used",
-      "date": "Date or Duration",
-      "bullets": [
-        "Project description and achievements",
-        "Key features or results"
-      ]
-    }}
-  ],
-  "awards": [
-    "Award exactly as written in original resume",
-    "Another award or honor"
-  ],
-  "publications": [
-    "Publication exactly as written in original resume",
-    "Another publication"
-  ],
-  "volunteer": [
-    "Volunteer work exactly as written in original resume",
-    "Another volunteer experience"
-  ]
-}}
+# Static UI metadata per provider: (id, name, description, API key variable)
+_PROVIDER_INFO: Tuple[Tuple[str, str, str, str], ...] = (
+    ("groq", "Groq (Llama 3.3)", "Fast & Cost-effective", "GROQ_API_KEY"),
+    ("openai", "OpenAI (GPT-4o Mini)", "High Quality", "OPENAI_API_KEY"),
+    ("claude", "Claude (3.5 Sonnet)", "Advanced Reasoning", "ANTHROPIC_API_KEY"),
+    ("gemini", "Google Gemini (2.5 Flash)", "Fast & Multimodal AI", "GEMINI_API_KEY"),
+    ("cohere", "Cohere (Command R+)", "Enterprise AI", "COHERE_API_KEY"),
+)
 
-CRITICAL JSON RULES:
-- Return ONLY valid JSON - no markdown, no explanations, no code blocks
-- Include sections ONLY if they exist in original resume:
-  * "education" - Check for: EDUCATION, ACADEMIC BACKGROUND, QUALIFICATIONS, ACADEMIC QUALIFICATIONS
-  * "certifications" - Check for: CERTIFICATIONS, CERTIFICATES, PROFESSIONAL CERTIFICATIONS, LICENSES, LICENSE & CERTIFICATIONS
-  * "projects" - Check for: PROJECTS, ACADEMIC PROJECTS, PERSONAL PROJECTS, SIDE PROJECTS, PORTFOLIO
-  * "awards" - Check for: AWARDS, HONORS, ACHIEVEMENTS, HONORS & AWARDS, RECOGNITION
-  * "publications" - Check for: PUBLICATIONS, RESEARCH, PAPERS, PUBLISHED WORK
-  * "volunteer" - Check for: VOLUNTEER, VOLUNTEER WORK, VOLUNTEER EXPERIENCE, COMMUNITY SERVICE
-- If a section doesn't exist in original resume, DO NOT include it in JSON
-- Preserve original formatting for certifications, awards, publications, volunteer (copy exactly as written)
-- All strings must be properly escaped
-- Contact array MUST include ALL contact info from original: Location, Email, Phone, LinkedIn, GitHub (include all that are present)
-- Experience bullets must follow all the rules specified above (metrics, rewriting, etc.)
-- Section order in output: summary → skills → experience → education → certifications → projects → awards → publications → volunteer"""
 
-        try:
-            response = self.client.chat(
-                model=self.model,
-                message=prompt,
-                temperature=0.7,
-                max_tokens=4000
-            )
-            return response.text
-        except Exception as e:
-            return f"Error: {str(e)}"
+def _is_provider_available(name: str) -> bool:
+    """Availability of the default (environment key) provider; usable ones are kept by get_ai_provider."""
+    provider = get_ai_provider(name)
+    return provider is not None and provider.is_available()
 
 
-def get_ai_provider(provider_name: str, api_key: Optional[str] = None) -> Optional[AIProvider]:
-    """Get AI provider by name."""
-    providers = {
-        "groq": GroqProvider,
-        "openai": OpenAIProvider,
-        "claude": ClaudeProvider,
-        "gemini": GeminiProvider,
-        "cohere": CohereProvider,
-    }
-    
-    provider_class = providers.get(provider_name.lower())
-    if provider_class:
-        return provider_class(api_key)
-    return None
+@functools.lru_cache(maxsize=1)
+def _provider_availability(time_bucket: int) -> Mapping[str, bool]:
+    """
+    Availability of every provider, checked concurrently (SDK imports and
+    client setup dominate) and reused for the rest of the time bucket.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(_PROVIDER_CLASSES)) as executor:
+        return MappingProxyType(dict(zip(_PROVIDER_CLASSES, executor.map(_is_provider_available, _PROVIDER_CLASSES))))
 
 
 def get_available_providers() -> Dict[str, bool]:
     """Get list of available providers."""
-    return {
-        "groq": GroqProvider().is_available(),
-        "openai": OpenAIProvider().is_available(),
-        "claude": ClaudeProvider().is_available(),
-        "gemini": GeminiProvider().is_available(),
-        "cohere": CohereProvider().is_available(),
-    }
+    return dict(_provider_availability(int(time.time() // PROVIDER_AVAILABILITY_TTL)))
 
 
 def get_provider_info() -> List[Dict]:
     """Get provider information for UI."""
+    available = _provider_availability(int(time.time() // PROVIDER_AVAILABILITY_TTL))
     return [
         {
-            "id": "groq",
-            "name": "Groq (Llama 3.3)",
-            "description": "Fast & Cost-effective",
-            "available": GroqProvider().is_available(),
-            "api_key_env": "GROQ_API_KEY"
-        },
-        {
-            "id": "openai",
-            "name": "OpenAI (GPT-4o Mini)",
-            "description": "High Quality",
-            "available": OpenAIProvider().is_available(),
-            "api_key_env": "OPENAI_API_KEY"
-        },
-        {
-            "id": "claude",
-            "name": "Claude (3.5 Sonnet)",
-            "description": "Advanced Reasoning",
-            "available": ClaudeProvider().is_available(),
-            "api_key_env": "ANTHROPIC_API_KEY"
-        },
-        {
-            "id": "gemini",
-            "name": "Google Gemini (2.5 Flash)",
-            "description": "Fast & Multimodal AI",
-            "available": GeminiProvider().is_available(),
-            "api_key_env": "GEMINI_API_KEY"
-        },
-        {
-            "id": "cohere",
-            "name": "Cohere (Command R+)",
-            "description": "Enterprise AI",
-            "available": CohereProvider().is_available(),
-            "api_key_env": "COHERE_API_KEY"
-        },
+            "id": provider_id,
+            "name": name,
+            "description": description,
+            "available": available[provider_id],
+            "api_key_env": api_key_env
+        }
+        for provider_id, name, description, api_key_env in _PROVIDER_INFO
     ]
-
@@ -5,24 +5,106 @@ Requires OPENAI_API_KEY environment variable.
 """
 
 import os
+import re
+import functools
+import importlib
+import hashlib
+import threading
+from collections import OrderedDict
+from itertools import islice
 from typing import Dict, List, Optional
 try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
 except ImportError:
-    OPENAI_AVAILABLE = False
+    TIKTOKEN_AVAILABLE = False
+
+from utils.http_pool import shared_http_client
+
+SUGGESTIONS_MODEL = "gpt-3.5-turbo"
+RESPONSE_CACHE_SIZE = 256  # recent responses kept in memory (LRU)
+CLIENT_CACHE_SIZE = 32  # clients kept for the most recently used API keys (LRU)
+MAX_SUGGESTIONS = 10
+# Token budgets for the excerpts in the prompts
+RESUME_TOKENS = 800
+JOB_DESCRIPTION_TOKENS = 400
+SECTION_JOB_DESCRIPTION_TOKENS = 200
+
+# sha256(api key, request) -> response text, shared by all instances, so
+# re-running the same analysis (e.g. a UI re-render) does not call the API again
+_responses: "OrderedDict[str, str]" = OrderedDict()
+_responses_lock = threading.Lock()
+
+# A whole response line starting with a digit or "-", without its surrounding whitespace
+_SUGGESTION_LINE_RE = re.compile(r'^\s*([\d-].*?)\s*$', re.MULTILINE)
+
+_SUGGESTIONS_INSTRUCTIONS = (
+    "Provide 5-7 specific, actionable suggestions to improve this resume for the job application. Focus on:\n"
+    "1. Content improvements\n"
+    "2. Keyword optimization\n"
+    "3. Structure and formatting\n"
+    "4. Missing elements\n"
+    "5. ATS optimization\n\n"
+    "Format as a numbered list."
+)
+
+
+# OpenAI clients by sha256(api key): each owns a connection pool, so instances
+# created per request share keep-alive connections instead of re-handshaking
+_clients: "OrderedDict[str, OpenAI]" = OrderedDict()
+_clients_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _openai_sdk():
+    """The openai module, imported on first use (it is slow to import), or None if not installed."""
+    try:
+        return importlib.import_module('openai')
+    except ImportError:
+        return None
+
+
+def _get_client(api_key: str) -> "OpenAI":
+    """The OpenAI client for api_key, reused while the key is among the CLIENT_CACHE_SIZE most recent."""
+    key = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            _clients.move_to_end(key)
+            return client
+        client = _clients[key] = _openai_sdk().OpenAI(api_key=api_key, http_client=shared_http_client())
+        while len(_clients) > CLIENT_CACHE_SIZE:
+            _clients.popitem(last=False)
+    return client
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoder():
+    """tiktoken encoder for SUGGESTIONS_MODEL, loaded once."""
+    return tiktoken.encoding_for_model(SUGGESTIONS_MODEL)
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to at most max_tokens tokens, or ~4 characters per token without tiktoken."""
+    if not TIKTOKEN_AVAILABLE:
+        return text[:max_tokens * 4]
+    encoder = _get_encoder()
+    tokens = encoder.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoder.decode(tokens[:max_tokens])
 
 
 class AISuggestions:
     """Generate AI-powered suggestions for resume optimization."""
     
+    __slots__ = ("api_key", "client")
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         self.client = None
         
-        if OPENAI_AVAILABLE and self.api_key:
+        if self.api_key and _openai_sdk() is not None:
             try:
-                self.client = OpenAI(api_key=self.api_key)
+                self.client = _get_client(self.api_key)
             except Exception as e:
                 print(f"Warning: Could not initialize OpenAI client: {e}")
     
@@ -30,6 +112,40 @@ class AISuggestions:
         """Check if AI suggestions are available."""
         return self.client is not None
     
+    def _complete(self, system: str, prompt: str, max_tokens: int) -> str:
+        """Response text for a chat completion, from the in-memory LRU when the same request was made before."""
+        digest = hashlib.sha256()
+        for part in (self.api_key, SUGGESTIONS_MODEL, system, prompt, str(max_tokens)):
+            digest.update(part.encode('utf-8') + b"\x00")
+        key = digest.hexdigest()
+        with _responses_lock:
+            text = _responses.get(key)
+            if text is not None:
+                _responses.move_to_end(key)
+                return text
+        
+        response = self.client.chat.completions.create(
+            model=SUGGESTIONS_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": system
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            max_tokens=max_tokens,
+            temperature=0.7
+        )
+        text = response.choices[0].message.content
+        with _responses_lock:
+            _responses[key] = text
+            while len(_responses) > RESPONSE_CACHE_SIZE:
+                _responses.popitem(last=False)
+        return text
+    
     def generate_suggestions(
         self, 
         resume_text: str, 
@@ -43,31 +159,13 @@ class AISuggestions:
         try:
             prompt = self._build_prompt(resume_text, job_description, analysis_results)
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional resume optimization expert. Provide specific, actionable suggestions to improve resumes for job applications."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=500,
-                temperature=0.7
+            suggestions_text = self._complete(
+                "You are a professional resume optimization expert. Provide specific, actionable suggestions to improve resumes for job applications.",
+                prompt,
+                max_tokens=500
             )
-            
-            suggestions_text = response.choices[0].message.content
-            # Parse suggestions (assuming numbered list)
-            suggestions = [
-                s.strip() 
-                for s in suggestions_text.split('\n') 
-                if s.strip() and (s.strip()[0].isdigit() or s.strip().startswith('-'))
-            ]
-            
-            return suggestions[:10]  # Limit to 10 suggestions
+            # Numbered or bulleted lines (assuming a numbered list), in one pass that stops at 10
+            return [match.group(1) for match in islice(_SUGGESTION_LINE_RE.finditer(suggestions_text), MAX_SUGGESTIONS)]
         
         except Exception as e:
             return [f"Error generating AI suggestions: {str(e)}"]
@@ -79,31 +177,22 @@ class AISuggestions:
         analysis_results: Dict = None
     ) -> str:
         """Build prompt for AI."""
-        prompt = "Analyze this resume and provide specific improvement suggestions:\n\n"
-        prompt += "RESUME:\n"
-        prompt += resume_text[:2000] + "\n\n"  # Limit resume text
+        parts = ["Analyze this resume and provide specific improvement suggestions:\n\n",
+                 "RESUME:\n", _truncate_to_tokens(resume_text, RESUME_TOKENS), "\n\n"]
         
         if job_description:
-            prompt += "JOB DESCRIPTION:\n"
-            prompt += job_description[:1000] + "\n\n"  # Limit job description
+            parts += ["JOB DESCRIPTION:\n", _truncate_to_tokens(job_description, JOB_DESCRIPTION_TOKENS), "\n\n"]
         
         if analysis_results:
-            prompt += "CURRENT ANALYSIS:\n"
+            parts.append("CURRENT ANALYSIS:\n")
             if 'job_match' in analysis_results:
-                prompt += f"Match Score: {analysis_results['job_match']['score']}%\n"
+                parts.append(f"Match Score: {analysis_results['job_match']['score']}%\n")
             if 'resume_quality' in analysis_results:
-                prompt += f"Quality Score: {analysis_results['resume_quality']['quality_score']}/100\n"
-            prompt += "\n"
+                parts.append(f"Quality Score: {analysis_results['resume_quality']['quality_score']}/100\n")
+            parts.append("\n")
         
-        prompt += "Provide 5-7 specific, actionable suggestions to improve this resume for the job application. Focus on:\n"
-        prompt += "1. Content improvements\n"
-        prompt += "2. Keyword optimization\n"
-        prompt += "3. Structure and formatting\n"
-        prompt += "4. Missing elements\n"
-        prompt += "5. ATS optimization\n\n"
-        prompt += "Format as a numbered list."
-        
-        return prompt
+        parts.append(_SUGGESTIONS_INSTRUCTIONS)
+        return "".join(parts)
     
     def improve_section(
         self, 
@@ -118,27 +207,15 @@ class AISuggestions:
         try:
             prompt = f"Improve the following {section_name} section of a resume"
             if job_description:
-                prompt += f" for this job: {job_description[:500]}"
+                prompt += f" for this job: {_truncate_to_tokens(job_description, SECTION_JOB_DESCRIPTION_TOKENS)}"
             prompt += f":\n\n{section_content}\n\n"
             prompt += "Provide an improved version that is more impactful and ATS-friendly."
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional resume writer. Improve resume sections to be more impactful and ATS-friendly."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=300,
-                temperature=0.7
+            return self._complete(
+                "You are a professional resume writer. Improve resume sections to be more impactful and ATS-friendly.",
+                prompt,
+                max_tokens=300
             )
-            
-            return response.choices[0].message.content
         
         except Exception as e:
             return f"Error: {str(e)}"
@@ -5,12 +5,82 @@ Optimized for high concurrency (1000+ requests).
 """
 
 import re
-from typing import Dict, List, Tuple, Set
+from typing import Dict, Iterator, List, Tuple, Set
 from collections import Counter
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once at import, not looked up in re's cache per call
+
+# Required / preferred qualification phrases in a job description
+_REQUIRED_RES = tuple(re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in (
+    r'required[:\s]+(?:skills|qualifications|experience|education)[:\s]*([^\.]+)',
+    r'must have[:\s]+([^\.]+)',
+    r'essential[:\s]+(?:skills|qualifications)[:\s]*([^\.]+)',
+    r'minimum requirements[:\s]*([^\.]+)',
+    r'required[:\s]*([^\.]+?)(?:preferred|nice to have|bonus)',
+))
+_PREFERRED_RES = tuple(re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in (
+    r'preferred[:\s]+(?:skills|qualifications|experience)[:\s]*([^\.]+)',
+    r'nice to have[:\s]+([^\.]+)',
+    r'bonus[:\s]+([^\.]+)',
+    r'plus[:\s]+([^\.]+)',
+    r'preferred[:\s]*([^\.]+)',
+))
+
+_WORD_RE = re.compile(r'\b[a-zA-Z]{2,}\b')
+_ACRONYM_RE = re.compile(r'\b[A-Z]{2,}\b')  # AWS, API, SQL, ...
+
+# Common technical terms patterns
+_TECHNICAL_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'\b[A-Z]{2,}\b',  # Acronyms (AWS, API, SQL, etc.)
+    r'\b\w+\.(js|py|java|ts|jsx|tsx|html|css|sql|sh|yml|yaml|json)\b',  # File extensions
+    r'\b\w+\s*(?:framework|library|tool|platform|service|system|language|database|server)\b',  # Tech terms
+))
+
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# Table-like layouts in plain text
+_TABLE_RES = (
+    re.compile(r'\|\s*\w+\s*\|\s*\w+\s*\|'),  # Pipe-separated tables
+    re.compile(r'\s{3,}\w+\s{3,}\w+'),  # Multiple spaces (tab-like)
+)
+
+# Common stop words to exclude from qualification keywords
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
+    'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'should', 'could', 'may', 'might', 'must', 'can', 'this',
+    'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
+    'years', 'year', 'experience', 'required', 'preferred', 'skills',
+    'ability', 'abilities', 'knowledge', 'understanding'
+})
+
+# Technology names (common tech stack) looked for verbatim
+_COMMON_TECH = (
+    'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue',
+    'node', 'express', 'django', 'flask', 'spring', 'laravel', 'rails',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'ansible',
+    'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch',
+    'git', 'jenkins', 'ci/cd', 'agile', 'scrum', 'devops',
+    'machine learning', 'ai', 'data science', 'big data', 'analytics',
+    'rest', 'api', 'graphql', 'microservices', 'serverless',
+    'html', 'css', 'sass', 'less', 'bootstrap', 'tailwind',
+    'linux', 'unix', 'windows', 'macos',
+    'sql', 'nosql', 'etl', 'data pipeline', 'data warehouse'
+)
+
+
+def _find_all(text: str, keyword: str) -> Iterator[int]:
+    """Start offsets of keyword in text, as re.finditer(re.escape(keyword), text) finds them."""
+    step = len(keyword) or 1
+    start = text.find(keyword)
+    while start != -1:
+        yield start
+        start = text.find(keyword, start + step)
+
 
 class ATSComplianceEngine:
     """
@@ -71,27 +141,9 @@ class ATSComplianceEngine:
             'preferred': []
         }
         
-        # Common patterns for required qualifications
-        required_patterns = [
-            r'required[:\s]+(?:skills|qualifications|experience|education)[:\s]*([^\.]+)',
-            r'must have[:\s]+([^\.]+)',
-            r'essential[:\s]+(?:skills|qualifications)[:\s]*([^\.]+)',
-            r'minimum requirements[:\s]*([^\.]+)',
-            r'required[:\s]*([^\.]+?)(?:preferred|nice to have|bonus)',
-        ]
-        
-        # Common patterns for preferred qualifications
-        preferred_patterns = [
-            r'preferred[:\s]+(?:skills|qualifications|experience)[:\s]*([^\.]+)',
-            r'nice to have[:\s]+([^\.]+)',
-            r'bonus[:\s]+([^\.]+)',
-            r'plus[:\s]+([^\.]+)',
-            r'preferred[:\s]*([^\.]+)',
-        ]
-        
         # Extract required qualifications
-        for pattern in required_patterns:
-            matches = re.finditer(pattern, job_lower, re.IGNORECASE | re.MULTILINE)
+        for pattern in _REQUIRED_RES:
+            matches = pattern.finditer(job_lower)
             for match in matches:
                 text = match.group(1).strip()
                 # Extract keywords (words with 2+ characters, excluding common words)
@@ -99,8 +151,8 @@ class ATSComplianceEngine:
                 qualifications['required'].extend(keywords)
         
         # Extract preferred qualifications
-        for pattern in preferred_patterns:
-            matches = re.finditer(pattern, job_lower, re.IGNORECASE | re.MULTILINE)
+        for pattern in _PREFERRED_RES:
+            matches = pattern.finditer(job_lower)
             for match in matches:
                 text = match.group(1).strip()
                 keywords = self._extract_keywords(text)
@@ -121,60 +173,29 @@ class ATSComplianceEngine:
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract meaningful keywords from text."""
         # Remove punctuation and split into words
-        words = re.findall(r'\b[a-zA-Z]{2,}\b', text.lower())
-        
-        # Common stop words to exclude
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
-            'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
-            'would', 'should', 'could', 'may', 'might', 'must', 'can', 'this',
-            'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
-            'years', 'year', 'experience', 'required', 'preferred', 'skills',
-            'ability', 'abilities', 'knowledge', 'understanding'
-        }
+        words = _WORD_RE.findall(text.lower())
         
         # Filter out stop words and return unique keywords
-        keywords = [w for w in words if w not in stop_words and len(w) > 2]
+        keywords = [w for w in words if w not in _STOP_WORDS and len(w) > 2]
         return list(set(keywords))
     
     def _extract_technical_keywords(self, text: str) -> List[str]:
         """Extract technical keywords from job description."""
-        # Common technical terms patterns
-        technical_patterns = [
-            r'\b[A-Z]{2,}\b',  # Acronyms (AWS, API, SQL, etc.)
-            r'\b\w+\.(js|py|java|ts|jsx|tsx|html|css|sql|sh|yml|yaml|json)\b',  # File extensions
-            r'\b\w+\s*(?:framework|library|tool|platform|service|system|language|database|server)\b',  # Tech terms
-        ]
-        
         keywords = []
         text_lower = text.lower()
         
         # Extract acronyms
-        acronyms = re.findall(r'\b[A-Z]{2,}\b', text)
+        acronyms = _ACRONYM_RE.findall(text)
         keywords.extend([a.lower() for a in acronyms])
         
         # Extract technology names (common tech stack)
-        common_tech = [
-            'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue',
-            'node', 'express', 'django', 'flask', 'spring', 'laravel', 'rails',
-            'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'ansible',
-            'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch',
-            'git', 'jenkins', 'ci/cd', 'agile', 'scrum', 'devops',
-            'machine learning', 'ai', 'data science', 'big data', 'analytics',
-            'rest', 'api', 'graphql', 'microservices', 'serverless',
-            'html', 'css', 'sass', 'less', 'bootstrap', 'tailwind',
-            'linux', 'unix', 'windows', 'macos',
-            'sql', 'nosql', 'etl', 'data pipeline', 'data warehouse'
-        ]
-        
-        for tech in common_tech:
+        for tech in _COMMON_TECH:
             if tech in text_lower:
                 keywords.append(tech)
         
         # Extract from patterns
-        for pattern in technical_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in _TECHNICAL_RES:
+            matches = pattern.findall(text)
             keywords.extend([m.lower() if isinstance(m, str) else m[0].lower() for m in matches])
         
         return list(set(keywords))
@@ -202,15 +223,15 @@ class ATSComplianceEngine:
             # Case-insensitive search
             if keyword.lower() in resume_lower:
                 # Check if keyword appears in context (not just isolated)
-                matches = list(re.finditer(re.escape(keyword.lower()), resume_lower))
-                for match in matches:
-                    start = max(0, match.start() - 20)
-                    end = min(len(resume_lower), match.end() + 20)
+                needle = keyword.lower()
+                for position in _find_all(resume_lower, needle):
+                    start = max(0, position - 20)
+                    end = min(len(resume_lower), position + len(needle) + 20)
                     context = resume_lower[start:end]
                     required_matches.append({
                         'keyword': keyword,
                         'context': context.strip(),
-                        'position': match.start()
+                        'position': position
                     })
             else:
                 missing_required.append(keyword)
@@ -218,15 +239,15 @@ class ATSComplianceEngine:
         # Check preferred keywords
         for keyword in qualifications.get('preferred', []):
             if keyword.lower() in resume_lower:
-                matches = list(re.finditer(re.escape(keyword.lower()), resume_lower))
-                for match in matches:
-                    start = max(0, match.start() - 20)
-                    end = min(len(resume_lower), match.end() + 20)
+                needle = keyword.lower()
+                for position in _find_all(resume_lower, needle):
+                    start = max(0, position - 20)
+                    end = min(len(resume_lower), position + len(needle) + 20)
                     context = resume_lower[start:end]
                     preferred_matches.append({
                         'keyword': keyword,
                         'context': context.strip(),
-                        'position': match.start()
+                        'position': position
                     })
             else:
                 missing_preferred.append(keyword)
@@ -329,7 +350,7 @@ class ATSComplianceEngine:
         score_deductions = 0
         
         # Check for HTML tags
-        html_tags = re.findall(r'<[^>]+>', resume_text)
+        html_tags = _HTML_TAG_RE.findall(resume_text)
         if html_tags:
             issues.append({
                 'type': 'html_tags',
@@ -357,13 +378,8 @@ class ATSComplianceEngine:
             score_deductions += 5
         
         # Check for tables (in text format, look for patterns)
-        table_patterns = [
-            r'\|\s*\w+\s*\|\s*\w+\s*\|',  # Pipe-separated tables
-            r'\s{3,}\w+\s{3,}\w+',  # Multiple spaces (tab-like)
-        ]
-        
-        for pattern in table_patterns:
-            if re.search(pattern, resume_text):
+        for pattern in _TABLE_RES:
+            if pattern.search(resume_text):
                 issues.append({
                     'type': 'table_formatting',
                     'severity': 'medium'
@@ -16,6 +16,16 @@ from xml.sax.saxutils import escape
 import re
 
 
+# Section headings recognised in plain-text resumes
+SECTION_KEYWORDS = frozenset({
+    'SUMMARY', 'PROFESSIONAL SUMMARY', 'EXPERIENCE', 'WORK EXPERIENCE',
+    'EDUCATION', 'SKILLS', 'TECHNICAL SKILLS', 'PROJECTS',
+    'CERTIFICATIONS', 'ACHIEVEMENTS', 'AWARDS'
+})
+# Any section keyword within a line, found in one pass rather than one scan per keyword
+_SECTION_KEYWORD_RE = re.compile('|'.join(re.escape(keyword) for keyword in sorted(SECTION_KEYWORDS, key=len, reverse=True)))
+
+
 def generate_pdf(resume_text: str) -> BytesIO:
     """
     Generate a formatted PDF from resume text.
@@ -101,13 +111,6 @@ def generate_pdf(resume_text: str) -> BytesIO:
         leading=13
     )
 
-    # Section keywords
-    section_keywords = [
-        'SUMMARY', 'PROFESSIONAL SUMMARY', 'EXPERIENCE', 'WORK EXPERIENCE',
-        'EDUCATION', 'SKILLS', 'TECHNICAL SKILLS', 'PROJECTS',
-        'CERTIFICATIONS', 'ACHIEVEMENTS', 'AWARDS'
-    ]
-
     # Parse resume line by line
     lines = resume_text.strip().split('\n')
     line_count = 0
@@ -130,16 +133,17 @@ def generate_pdf(resume_text: str) -> BytesIO:
             continue
 
         # Second/third lines might be title and contact
-        if line_count < 3 and not any(keyword in line.upper() for keyword in section_keywords):
+        line_upper = line.upper()
+        if line_count < 3 and not _SECTION_KEYWORD_RE.search(line_upper):
             story.append(Paragraph(line_escaped, contact_style))
             line_count += 1
             continue
 
         # Check if it's a section header
-        is_section = line.upper() in section_keywords
+        is_section = line_upper in SECTION_KEYWORDS
 
         if is_section:
-            in_experience_section = ('EXPERIENCE' in line.upper())
+            in_experience_section = ('EXPERIENCE' in line_upper)
             story.append(Spacer(1, 0.18*inch))
             story.append(Paragraph(f"<b>{line_escaped}</b>", section_style))
 
@@ -195,13 +199,6 @@ def generate_docx(resume_text: str) -> BytesIO:
         section.left_margin = Inches(0.75)
         section.right_margin = Inches(0.75)
 
-    # Section keywords
-    section_keywords = [
-        'SUMMARY', 'PROFESSIONAL SUMMARY', 'EXPERIENCE', 'WORK EXPERIENCE',
-        'EDUCATION', 'SKILLS', 'TECHNICAL SKILLS', 'PROJECTS',
-        'CERTIFICATIONS', 'ACHIEVEMENTS', 'AWARDS'
-    ]
-
     # Parse resume line by line
     lines = resume_text.strip().split('\n')
     line_count = 0
@@ -228,7 +225,8 @@ def generate_docx(resume_text: str) -> BytesIO:
             continue
 
         # Second/third lines might be title and contact
-        if line_count < 3 and not any(keyword in line.upper() for keyword in section_keywords):
+        line_upper = line.upper()
+        if line_count < 3 and not _SECTION_KEYWORD_RE.search(line_upper):
             p = doc.add_paragraph(line)
             p.alignment = WD_ALIGN_PARAGRAPH.CENTER
             run = p.runs[0]
@@ -239,10 +237,10 @@ def generate_docx(resume_text: str) -> BytesIO:
             continue
 
         # Check if it's a section header
-        is_section = line.upper() in section_keywords
+        is_section = line_upper in SECTION_KEYWORDS
 
         if is_section:
-            in_experience_section = ('EXPERIENCE' in line.upper())
+            in_experience_section = ('EXPERIENCE' in line_upper)
             # Add spacing before section
             spacer = doc.add_paragraph()
             spacer.space_after = Pt(4)
@@ -0,0 +1,54 @@
+"""
+Fast Keyword Score
+Deterministic TF-IDF similarity between a resume and a job description, cheap
+enough (about a millisecond) to run before every LLM analysis call.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+
+# Words carrying no signal about skills or responsibilities
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both but
+by can could did do does doing down during each etc few for from further had has have having he her here hers
+him his how i if in into is it its itself just me more most my no nor not now of off on once only or other our
+ours out over own per same she should so some such than that the their theirs them then there these they this
+those through to too under until up us very was we were what when where which while who whom why will with
+within without would you your yours
+""".split())
+
+# Word tokens, keeping the symbols in names like "c++", "c#", "node.js" and "ci/cd"
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]')
+
+
+def _terms(text: str) -> Counter:
+    """Unigram and bigram counts of text's non-stop-word tokens."""
+    words = [word for word in _TOKEN_RE.findall(text.lower()) if word not in STOP_WORDS]
+    terms = Counter(words)
+    terms.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+    return terms
+
+
+def _tfidf(counts: Counter, idf: Dict[str, float]) -> Dict[str, float]:
+    """L2-normalised TF-IDF vector."""
+    vector = {term: count * idf[term] for term, count in counts.items()}
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+
+def keyword_score(resume_text: str, job_description: str) -> float:
+    """
+    Cosine similarity (0-1) of the TF-IDF vectors of resume and job description.
+
+    Uses unigrams and bigrams with smoothed IDF over the two documents, as
+    scikit-learn's TfidfVectorizer(ngram_range=(1, 2)) does, so terms only
+    one side uses weigh more than shared boilerplate.
+    """
+    documents: List[Counter] = [_terms(job_description), _terms(resume_text)]
+    document_frequency = Counter(term for counts in documents for term in counts)
+    idf = {term: math.log(3 / (1 + df)) + 1 for term, df in document_frequency.items()}
+    job_vector, resume_vector = (_tfidf(counts, idf) for counts in documents)
+    # Clamped, as rounding can put identical documents a hair above 1
+    return min(1.0, sum((weight * resume_vector.get(term, 0.0) for term, weight in job_vector.items()), 0.0))
@@ -4,27 +4,186 @@ Provides intelligent resume optimization using Groq's fast LLM API.
 """
 
 import os
+import re
 from typing import Dict, List, Optional, Tuple
-try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
-except ImportError:
-    GROQ_AVAILABLE = False
+from utils.ai_providers import (
+    STAGE_RESUME_TOKENS, STAGE_JOB_DESCRIPTION_TOKENS, JOB_DESCRIPTION_QUERY, _truncate_to_budget, _import_sdk
+)
+
+
+# Lines the model puts before the resume ("Here is the final resume:")
+PREAMBLE_MARKERS = (
+    "FINAL RESUME:",
+    "Here's the final",
+    "Here is the final",
+    "After conducting",
+    "I've made",
+    "I have made",
+    "The final resume",
+    "Below is",
+    "Here's the polished",
+    "Here is the polished"
+)
+
+# Patterns that indicate the start of trailing commentary
+COMMENTARY_INDICATORS = (
+    "I've made the following adjustments",
+    "I have made the following adjustments",
+    "The following adjustments",
+    "The final resume is",
+    "This resume is polished",
+    "This polished resume",
+    "ready for submission",
+    "effectively showcases",
+    "showcasing your",
+    "showcases your",
+    "strong candidate for passing",
+    "Here are the changes",
+    "Changes made:",
+    "Improvements made:",
+    "clear, concise, and professional manner",
+    "Recommended actions",
+    "Recommended action",
+    "Recommendations:",
+    "Next steps:",
+    "Additional recommendations",
+    "Further recommendations",
+    "To further improve",
+    "For additional improvement",
+    "Consider the following",
+    "You may also want to",
+    "It would be beneficial to",
+    "I recommend",
+    "I suggest",
+    "Suggestion:",
+    "Suggestions:"
+)
+
+# Lines that can only open the model's notes on its changes, never a resume
+# line, so streaming stops at them (the looser COMMENTARY_INDICATORS, such as
+# "effectively showcases", also occur in summaries and bullets)
+STREAM_STOP_MARKERS = (
+    "Changes made:",
+    "Improvements made:",
+    "Here are the changes",
+    "I've made the following adjustments",
+    "I have made the following adjustments",
+    "The following adjustments"
+)
+
+# Verbs the model uses when describing its own changes
+COMMENTARY_VERBS = (
+    "Ensured", "Verified", "Corrected", "Removed", "Maintained",
+    "Fixed", "Updated", "Confirmed", "Standardized"
+)
+
+# Common words in AI commentary about changes
+COMMENTARY_ACTION_WORDS = tuple(verb.lower() for verb in COMMENTARY_VERBS) + (
+    "professional tone", "ats-friendly", "parallel structure", "consistent formatting"
+)
+
+
+def _phrase_re(phrases):
+    """One case-insensitive alternation matching any of the literal phrases."""
+    return re.compile('|'.join(re.escape(phrase) for phrase in phrases), re.IGNORECASE)
+
+
+# Compiled once so post-processing scans each line once per category
+_PREAMBLE_RE = _phrase_re(PREAMBLE_MARKERS)
+_COMMENTARY_RE = _phrase_re(COMMENTARY_INDICATORS)
+_STREAM_STOP_RE = _phrase_re(STREAM_STOP_MARKERS)
+_COMMENTARY_ACTION_RE = _phrase_re(COMMENTARY_ACTION_WORDS)
+# Bullet points describing the model's changes ("* Ensured ...", "- Fixed ...")
+_COMMENTARY_BULLET_PREFIXES = tuple(f"{bullet} {verb}" for bullet in "*-" for verb in COMMENTARY_VERBS)
+_NUMBERED_ITEM_RE = re.compile(r'\d+\.\s+')
+# Headings that end the EDUCATION section when it is extracted for stage 1
+_EDUCATION_END_RE = _phrase_re(('EXPERIENCE', 'SKILLS', 'PROJECTS', 'CERTIFICATIONS', 'SUMMARY'))
+# "OVERALL_SCORE: 85" lines in ATS score responses
+_ATS_SCORE_RE = re.compile(r'\b(KEYWORD_MATCH|FORMAT_SCORE|SECTION_SCORE|OVERALL_SCORE):\s*(\d+)')
+
+
+# Fixed stage 3 instructions for multi_stage_optimize, sent ahead of the
+# Stage 2 resume so every request starts with the same cacheable prefix
+_STAGE3_INSTRUCTIONS = """STAGE 3: FORMAT AND CONSISTENCY CHECK
+
+Perform final quality check of the resume from Stage 2 (in the next message):
+1. Ensure consistent formatting throughout
+2. Check for grammar and spelling
+3. Verify all bullet points use parallel structure
+4. Ensure dates are consistent (e.g., all "Month YYYY" format)
+5. Remove any duplicate information
+6. Ensure professional tone throughout
+7. Verify resume is ATS-friendly (no complex formatting)
+8. DO NOT use markdown formatting like **bold** or *italic* - use plain text only
+9. Verify the SKILLS section is well-organized and includes all relevant skills from Stage 2
+
+CRITICAL SKILLS SECTION FORMATTING:
+- Ensure the SKILLS section from Stage 2 is preserved with all added job-relevant skills
+- Skills should be organized logically (most relevant first, grouped by category if applicable)
+- Remove any duplicate skills
+- Verify skills are presented in a clean, ATS-friendly format (comma-separated or categorized)
+- The SKILLS section should be comprehensive and keyword-rich without appearing stuffed
+
+CRITICAL EXPERIENCE SECTION FORMATTING - THIS IS MANDATORY:
+EVERY job entry in the EXPERIENCE section MUST use this EXACT format:
+<COMPANY NAME IN ALL CAPS>, <Location> | <JOB TITLE IN ALL CAPS> | <Month YYYY> - <Month YYYY or Present>
+- <achievement bullet>
+Example:
+MICROSOFT, Redmond, WA | SENIOR SOFTWARE ENGINEER | January 2020 - Present
+- Developed cloud infrastructure serving 10M+ users
+
+CRITICAL PROJECT SECTION FORMATTING - THIS IS MANDATORY:
+EVERY project entry in the PROJECTS section MUST use this EXACT format:
+<PROJECT NAME IN ALL CAPS>
+- <project detail bullet>
+Example:
+E-COMMERCE PLATFORM
+- Built full-stack web application using React and Node.js
+
+CRITICAL HEADER FORMATTING - COPY FROM STAGE 2:
+<Full Name>
+<Professional Title, e.g. Software Engineer>
+<Contact info on one line separated by " | ">
+
+🚨 ABSOLUTE REQUIREMENTS FROM STAGE 2 (NON-NEGOTIABLE):
+1. SKILLS SECTION: MUST be present in the final resume. Verify it's included from Stage 2. Do NOT remove it.
+2. 🔴🔴🔴 EDUCATION SECTION: MUST be copied EXACTLY, CHARACTER-BY-CHARACTER as it appears in Stage 2. NO modifications, NO grammar fixes, NO formatting changes, NO enhancements allowed whatsoever. This is THE SINGLE MOST CRITICAL requirement of the entire task. Copy it EXACTLY.
+3. HEADER: Professional title and ALL contact information must be exactly as in Stage 2.
+4. Company names MUST be in ALL CAPS (e.g., MICROSOFT, GOOGLE, AMAZON)
+5. Job titles MUST be in ALL CAPS (e.g., SENIOR SOFTWARE ENGINEER, DATA SCIENTIST)
+6. Project names MUST be in ALL CAPS (e.g., E-COMMERCE PLATFORM, MACHINE LEARNING CLASSIFIER)
+7. Plain text only. NO markdown formatting (**bold**, *italic*, etc.). ATS systems cannot parse markdown.
+8. Dates in Title Case (Month YYYY format)
+
+🔴🔴🔴 CRITICAL FAILURE CONDITION: The final resume MUST include both SKILLS and EDUCATION sections. If the EDUCATION section is missing or has even ONE character changed from Stage 2, you have COMPLETELY FAILED the entire task. The EDUCATION section must be a perfect, exact, character-for-character copy from Stage 2.
+
+🚫 DO NOT ADD ANY COMMENTARY, RECOMMENDATIONS, OR NEXT STEPS:
+- DO NOT add "Recommended actions" or "Suggestions" at the end
+- DO NOT add any explanations of what you changed
+- DO NOT add "Next steps" or "Further improvements"
+- Provide ONLY the resume content itself - nothing more
+- The resume should end with the last section (typically PROJECTS or EDUCATION)
+
+Provide the final, polished resume in plain text format with NO additional commentary."""
 
 
 class GroqResumeOptimizer:
     """Resume optimizer using Groq API for fast, intelligent suggestions."""
     
+    __slots__ = ("api_key", "client")
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv('GROQ_API_KEY')
         self.client = None
         
-        if GROQ_AVAILABLE and self.api_key:
+        # The SDK is imported here, on first use, not when the module is imported
+        groq = _import_sdk('groq') if self.api_key else None
+        if groq is not None:
             try:
-                self.client = Groq(api_key=self.api_key)
+                self.client = groq.Groq(api_key=self.api_key)
             except Exception as e:
                 print(f"Warning: Could not initialize Groq client: {e}")
-        elif not GROQ_AVAILABLE:
+        elif self.api_key:
             print("Warning: groq package not installed. Install with: pip install groq")
     
     def is_available(self) -> bool:
@@ -326,6 +485,38 @@ Format your response clearly with sections marked."""
 
     # ========== ENHANCED AI OPTIMIZATION METHODS ==========
 
+    def _stream_resume(self, **kwargs) -> str:
+        """
+        Stream a completion that should contain only a resume.
+
+        Once a section header has been seen, reading stops at the first
+        line that starts with a STREAM_STOP_MARKERS phrase ("Changes
+        made:"). Closing the stream there stops generation, so the caller
+        does not wait for tokens that post-processing would strip anyway.
+        """
+        stream = self.client.chat.completions.create(stream=True, **kwargs)
+        text = ''
+        scanned = 0  # start of the first line not yet checked
+        in_resume = False
+        try:
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                text += delta
+                newline = text.find('\n', scanned)
+                while newline != -1:
+                    line = text[scanned:newline].strip()
+                    if in_resume and _STREAM_STOP_RE.match(line):
+                        return text[:scanned].strip()
+                    # All caps headers like EDUCATION, SKILLS, EXPERIENCE
+                    in_resume = in_resume or (line.isupper() and len(line.split()) <= 3 and len(line) > 2)
+                    scanned = newline + 1
+                    newline = text.find('\n', scanned)
+        finally:
+            stream.close()
+        return text.strip()
+
     def analyze_job_description(
         self,
         job_description: str,
@@ -428,7 +619,7 @@ Keep responses concise and focused on what's most important for resume optimizat
                     education_start = i
                 elif education_start != -1 and education_end == -1:
                     # Check if we hit another major section
-                    if any(keyword in line.upper() for keyword in ['EXPERIENCE', 'SKILLS', 'PROJECTS', 'CERTIFICATIONS', 'SUMMARY']):
+                    if _EDUCATION_END_RE.search(line):
                         education_end = i
                         break
 
@@ -438,6 +629,9 @@ Keep responses concise and focused on what's most important for resume optimizat
                     education_end = len(resume_lines)
                 education_section = '\n'.join(resume_lines[education_start:education_end]).strip()
 
+            # Joined once; the prompt lists the required skills twice
+            required_skills = ', '.join(job_analysis.get('required_skills', [])[:10])
+
             stage1_prompt = f"""STAGE 1: CONTENT IMPROVEMENT
 
 🔴🔴🔴 EDUCATION SECTION FROM ORIGINAL RESUME (MUST BE COPIED EXACTLY): 🔴🔴🔴
@@ -447,15 +641,15 @@ YOU MUST COPY THE ABOVE EDUCATION SECTION EXACTLY, CHARACTER-BY-CHARACTER IN YOU
 DO NOT MODIFY IT. DO NOT ENHANCE IT. JUST COPY IT EXACTLY.
 
 JOB DESCRIPTION:
-{job_description[:2000]}
+{_truncate_to_budget(job_description, STAGE_JOB_DESCRIPTION_TOKENS, JOB_DESCRIPTION_QUERY)}
 
 RESUME:
-{resume_text[:4000]}
+{_truncate_to_budget(resume_text, STAGE_RESUME_TOKENS)}
 
 JOB ANALYSIS:
 - Seniority: {job_analysis.get('seniority_level', 'Not specified')}
 - Industry: {job_analysis.get('industry', 'Not specified')}
-- Required Skills: {', '.join(job_analysis.get('required_skills', [])[:10])}
+- Required Skills: {required_skills}
 
 🚨 MANDATORY SECTION REQUIREMENTS (NON-NEGOTIABLE):
 The optimized resume MUST include these sections in this order:
@@ -477,7 +671,7 @@ The EDUCATION section is SACRED - it must be preserved EXACTLY as written in the
 - REORGANIZE skills to put most relevant skills first
 - GROUP related skills together (e.g., "Programming Languages:", "Tools:", "Technologies:")
 - You may REMOVE only outdated/irrelevant skills that don't match the job
-- Include all required skills from job description: {', '.join(job_analysis.get('required_skills', [])[:10])}
+- Include all required skills from job description: {required_skills}
 - If original resume has a SKILLS section, you MUST include an enhanced version in the optimized resume
 
 🔴🔴🔴 CRITICAL - EDUCATION SECTION (MANDATORY - READ THIS TWICE) 🔴🔴🔴
@@ -538,7 +732,7 @@ Software Engineer
 
 Provide the complete improved resume."""
 
-            stage1_response = self.client.chat.completions.create(
+            stage1_resume = self._stream_resume(
                 model=model,
                 messages=[
                     {"role": "system", "content": "You are an expert resume writer focusing on content quality and relevance."},
@@ -548,8 +742,6 @@ Provide the complete improved resume."""
                 max_tokens=4000
             )
 
-            stage1_resume = stage1_response.choices[0].message.content.strip()
-
             # Stage 2: ATS Keyword Optimization
             critical_keywords = job_analysis.get('critical_keywords', [])
             ats_keywords = job_analysis.get('ats_keywords', [])
@@ -557,7 +749,7 @@ Provide the complete improved resume."""
             stage2_prompt = f"""STAGE 2: ATS KEYWORD OPTIMIZATION
 
 RESUME FROM STAGE 1:
-{stage1_resume[:4000]}
+{_truncate_to_budget(stage1_resume, STAGE_RESUME_TOKENS)}
 
 CRITICAL KEYWORDS TO INCORPORATE:
 {', '.join(critical_keywords[:15])}
@@ -608,7 +800,7 @@ Line 3: [Contact info on one line separated by " | "]
 
 Provide the complete ATS-optimized resume."""
 
-            stage2_response = self.client.chat.completions.create(
+            stage2_resume = self._stream_resume(
                 model=model,
                 messages=[
                     {"role": "system", "content": "You are an ATS optimization specialist. Incorporate keywords naturally without stuffing."},
@@ -618,122 +810,25 @@ Provide the complete ATS-optimized resume."""
                 max_tokens=4000
             )
 
-            stage2_resume = stage2_response.choices[0].message.content.strip()
-
             # Stage 3: Format and Consistency Check
-            stage3_prompt = f"""STAGE 3: FORMAT AND CONSISTENCY CHECK
-
-RESUME FROM STAGE 2:
-{stage2_resume[:4000]}
+            stage3_prompt = f"""RESUME FROM STAGE 2:
+{_truncate_to_budget(stage2_resume, STAGE_RESUME_TOKENS)}"""
 
-Perform final quality check:
-1. Ensure consistent formatting throughout
-2. Check for grammar and spelling
-3. Verify all bullet points use parallel structure
-4. Ensure dates are consistent (e.g., all "Month YYYY" format)
-5. Remove any duplicate information
-6. Ensure professional tone throughout
-7. Verify resume is ATS-friendly (no complex formatting)
-8. DO NOT use markdown formatting like **bold** or *italic* - use plain text only
-9. Verify the SKILLS section is well-organized and includes all relevant skills from Stage 2
-
-CRITICAL SKILLS SECTION FORMATTING:
-- Ensure the SKILLS section from Stage 2 is preserved with all added job-relevant skills
-- Skills should be organized logically (most relevant first, grouped by category if applicable)
-- Remove any duplicate skills
-- Verify skills are presented in a clean, ATS-friendly format (comma-separated or categorized)
-- The SKILLS section should be comprehensive and keyword-rich without appearing stuffed
-
-CRITICAL EXPERIENCE SECTION FORMATTING - THIS IS MANDATORY:
-For EVERY SINGLE job entry in the EXPERIENCE section, you MUST use this EXACT format:
-- Line 1: COMPANY NAME IN ALL CAPS, Location | JOB TITLE IN ALL CAPS | Month YYYY - Month YYYY (or Present)
-- Line 2+: Bullet points with achievements
-
-Example (COPY THIS FORMAT EXACTLY):
-MICROSOFT, Redmond, WA | SENIOR SOFTWARE ENGINEER | January 2020 - Present
-- Developed cloud infrastructure serving 10M+ users
-- Led team of 5 engineers in migration project
-
-GOOGLE, Mountain View, CA | SOFTWARE ENGINEER | June 2018 - December 2019
-- Built scalable APIs handling 1M+ requests per day
-- Optimized database queries reducing latency by 40%
-
-CRITICAL PROJECT SECTION FORMATTING - THIS IS MANDATORY:
-For EVERY project entry in the PROJECTS section, you MUST use this EXACT format:
-- Line 1: PROJECT NAME IN ALL CAPS
-- Line 2+: Bullet points with project details
-
-Example (COPY THIS FORMAT EXACTLY):
-E-COMMERCE PLATFORM
-- Built full-stack web application using React and Node.js
-- Implemented payment gateway integration with Stripe
-- Deployed on AWS with CI/CD pipeline
-
-MACHINE LEARNING CLASSIFIER
-- Developed ML model to predict customer churn with 92% accuracy
-- Used Python, TensorFlow, and scikit-learn
-
-CRITICAL HEADER FORMATTING - COPY FROM STAGE 2:
-The header MUST follow this EXACT format from Stage 2:
-Line 1: [Full Name]
-Line 2: [Professional Title - e.g., Software Engineer]
-Line 3: [Contact info on one line separated by " | "]
-
-Example:
-Abhishek Panda
-Software Engineer
-(224) 844-6987 | pandaabhishek34@gmail.com | linkedin.com/in/abhishek-rabindra-panda | github.com/pandaabhishek38 | abhishekrabindrapanda-portfolio.vercel.app
-
-🚨 ABSOLUTE REQUIREMENTS FROM STAGE 2 (NON-NEGOTIABLE):
-1. SKILLS SECTION: MUST be present in the final resume. Verify it's included from Stage 2. Do NOT remove it.
-2. 🔴🔴🔴 EDUCATION SECTION: MUST be copied EXACTLY, CHARACTER-BY-CHARACTER as it appears in Stage 2. NO modifications, NO grammar fixes, NO formatting changes, NO enhancements allowed whatsoever. This is THE SINGLE MOST CRITICAL requirement of the entire task. Copy it EXACTLY.
-3. HEADER: Professional title and ALL contact information must be exactly as in Stage 2.
-4. Company names MUST be in ALL CAPS (e.g., MICROSOFT, GOOGLE, AMAZON)
-5. Job titles MUST be in ALL CAPS (e.g., SENIOR SOFTWARE ENGINEER, DATA SCIENTIST)
-6. Project names MUST be in ALL CAPS (e.g., E-COMMERCE PLATFORM, MACHINE LEARNING CLASSIFIER)
-7. Plain text only. NO markdown formatting (**bold**, *italic*, etc.). ATS systems cannot parse markdown.
-8. Dates in Title Case (Month YYYY format)
-
-🔴🔴🔴 CRITICAL FAILURE CONDITION: The final resume MUST include both SKILLS and EDUCATION sections. If the EDUCATION section is missing or has even ONE character changed from Stage 2, you have COMPLETELY FAILED the entire task. The EDUCATION section must be a perfect, exact, character-for-character copy from Stage 2.
-
-🚫 DO NOT ADD ANY COMMENTARY, RECOMMENDATIONS, OR NEXT STEPS:
-- DO NOT add "Recommended actions" or "Suggestions" at the end
-- DO NOT add any explanations of what you changed
-- DO NOT add "Next steps" or "Further improvements"
-- Provide ONLY the resume content itself - nothing more
-- The resume should end with the last section (typically PROJECTS or EDUCATION)
-
-Provide the final, polished resume in plain text format with NO additional commentary."""
-
-            stage3_response = self.client.chat.completions.create(
+            final_resume = self._stream_resume(
                 model=model,
                 messages=[
                     {"role": "system", "content": "You are a meticulous resume editor focused on quality, consistency, and professionalism."},
+                    {"role": "user", "content": _STAGE3_INSTRUCTIONS},
                     {"role": "user", "content": stage3_prompt}
                 ],
                 temperature=0.5,
                 max_tokens=4000
             )
 
-            final_resume = stage3_response.choices[0].message.content.strip()
-
             # Clean up the final resume - remove AI preambles and commentary
-            # Common preamble patterns to remove
-            preamble_markers = [
-                "FINAL RESUME:",
-                "Here's the final",
-                "Here is the final",
-                "After conducting",
-                "I've made",
-                "I have made",
-                "The final resume",
-                "Below is",
-                "Here's the polished",
-                "Here is the polished"
-            ]
-
-            # Check if any preamble exists and remove everything before it
-            lines = final_resume.split('\n')
+            # Markdown bold (**text**) is not ATS-friendly; it is stripped up front
+            # so the line checks below see the plain text
+            lines = final_resume.replace('**', '').split('\n')
             resume_start_index = 0
 
             for i, line in enumerate(lines):
@@ -742,7 +837,7 @@ Provide the final, polished resume in plain text format with NO additional comme
                 if not line_lower:
                     continue
                 # Check if this line is a preamble
-                is_preamble = any(marker.lower() in line_lower for marker in preamble_markers)
+                is_preamble = _PREAMBLE_RE.search(line) is not None
                 if is_preamble:
                     resume_start_index = i + 1
                     continue
@@ -755,115 +850,35 @@ Provide the final, polished resume in plain text format with NO additional comme
                     resume_start_index = i
                     break
 
-            # Reconstruct resume from the detected start (for preview - includes trailing commentary)
-            final_resume_with_commentary = '\n'.join(lines[resume_start_index:]).strip()
-
             # Create a clean version for download (remove trailing AI commentary)
             # Find where the actual resume ends and commentary begins
             resume_lines = lines[resume_start_index:]
-            clean_resume_end = len(resume_lines)
-
-            # Patterns that indicate the start of trailing commentary
-            commentary_indicators = [
-                "I've made the following adjustments",
-                "I have made the following adjustments",
-                "The following adjustments",
-                "The final resume is",
-                "This resume is polished",
-                "This polished resume",
-                "ready for submission",
-                "effectively showcases",
-                "showcasing your",
-                "showcases your",
-                "strong candidate for passing",
-                "Here are the changes",
-                "Changes made:",
-                "Improvements made:",
-                "clear, concise, and professional manner",
-                "Recommended actions",
-                "Recommended action",
-                "Recommendations:",
-                "Next steps:",
-                "Additional recommendations",
-                "Further recommendations",
-                "To further improve",
-                "For additional improvement",
-                "Consider the following",
-                "You may also want to",
-                "It would be beneficial to",
-                "I recommend",
-                "I suggest",
-                "Suggestion:",
-                "Suggestions:"
-            ]
-
-            # Patterns for bullet-pointed commentary (AI describing what it did)
-            commentary_bullet_patterns = [
-                "* Ensured",
-                "* Verified",
-                "* Corrected",
-                "* Removed",
-                "* Maintained",
-                "* Fixed",
-                "* Updated",
-                "* Confirmed",
-                "* Standardized",
-                "- Ensured",
-                "- Verified",
-                "- Corrected",
-                "- Removed",
-                "- Maintained",
-                "- Fixed",
-                "- Updated",
-                "- Confirmed",
-                "- Standardized"
-            ]
+            first_commentary = None
+            # Whether commentary appears after the last section header
+            trailing_commentary = False
 
-            # Common words in AI commentary about changes
-            commentary_action_words = [
-                "ensured", "verified", "corrected", "removed", "maintained",
-                "fixed", "updated", "confirmed", "standardized", "professional tone",
-                "ats-friendly", "parallel structure", "consistent formatting"
-            ]
-
-            # Search backwards to find where commentary starts
-            import re
-            for i in range(len(resume_lines) - 1, -1, -1):
-                line = resume_lines[i].strip()
-                line_lower = line.lower()
-
-                # Check for explicit commentary indicators
-                if any(indicator.lower() in line_lower for indicator in commentary_indicators):
-                    clean_resume_end = i
-                    continue
-
-                # Check for bullet points describing AI's changes
-                if any(line.startswith(pattern) for pattern in commentary_bullet_patterns):
-                    clean_resume_end = i
-                    continue
-
-                # Check for numbered list items (1. , 2. , etc.) with commentary action words
-                if re.match(r'^\d+\.\s+', line):
-                    if any(action_word in line_lower for action_word in commentary_action_words):
-                        clean_resume_end = i
-                        continue
+            for i, line in enumerate(resume_lines):
+                line = line.strip()
 
-                # If we found commentary, keep looking backwards for more
-                if clean_resume_end < len(resume_lines):
-                    continue
+                # Explicit commentary indicators, bullet points describing the AI's
+                # changes, or numbered items (1. , 2. , etc.) with commentary action words
+                if (_COMMENTARY_RE.search(line) or line.startswith(_COMMENTARY_BULLET_PREFIXES)
+                        or (_NUMBERED_ITEM_RE.match(line) and _COMMENTARY_ACTION_RE.search(line))):
+                    if first_commentary is None:
+                        first_commentary = i
+                    trailing_commentary = True
 
-                # Stop if we hit a legitimate resume section header
+                # A legitimate resume section header resets it
                 # (all caps headers like EDUCATION, SKILLS, EXPERIENCE, etc.)
-                if line.isupper() and len(line.split()) <= 3 and len(line) > 2:
-                    break
+                elif line.isupper() and len(line.split()) <= 3 and len(line) > 2:
+                    trailing_commentary = False
+
+            # Once trailing commentary is found, everything from its first occurrence goes
+            clean_resume_end = first_commentary if trailing_commentary else len(resume_lines)
 
             # Clean version without trailing commentary
             download_resume = '\n'.join(resume_lines[:clean_resume_end]).strip()
 
-            # Remove markdown bold formatting (**text**) - not ATS-friendly
-            final_resume_with_commentary = final_resume_with_commentary.replace('**', '')
-            download_resume = download_resume.replace('**', '')
-
             return {
                 "optimized_resume": download_resume,  # For preview (clean version)
                 "download_resume": download_resume,  # For download (clean)
@@ -998,33 +1013,8 @@ DO NOT provide recommendations or suggestions. Only provide the scores."""
             "recommendations": []
         }
 
-        lines = score_text.split('\n')
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            if "KEYWORD_MATCH:" in line:
-                try:
-                    result["keyword_match"] = int(line.split(':')[1].strip())
-                except:
-                    pass
-            elif "FORMAT_SCORE:" in line:
-                try:
-                    result["format_score"] = int(line.split(':')[1].strip())
-                except:
-                    pass
-            elif "SECTION_SCORE:" in line:
-                try:
-                    result["section_score"] = int(line.split(':')[1].strip())
-                except:
-                    pass
-            elif "OVERALL_SCORE:" in line:
-                try:
-                    result["overall_score"] = int(line.split(':')[1].strip())
-                except:
-                    pass
+        for label, score in _ATS_SCORE_RE.findall(score_text):
+            result[label.lower()] = int(score)
 
         return result
 
@@ -0,0 +1,55 @@
+"""
+Shared HTTP Connection Pool
+Keep-alive, HTTP/2 (when h2 is installed) httpx clients handed to the AI SDK
+clients, kept in a module of its own so lightweight callers can share the pool
+without importing every provider SDK.
+Requires httpx; without it the SDKs build their own clients.
+"""
+
+import functools
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 - httpx needs it for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool for the provider clients
+HTTP_MAX_CONNECTIONS = 256
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 128
+HTTP_TIMEOUT = 60.0  # seconds
+
+
+@functools.lru_cache(maxsize=None)
+def shared_http_client():
+    """
+    Keep-alive, HTTP/2 (when h2 is installed) httpx client shared by every
+    sync SDK client, so all providers and keys reuse one connection pool and
+    consecutive calls (e.g. the multi-stage chain) skip the TLS handshake.
+    """
+    if not HTTPX_AVAILABLE:
+        return None
+    return httpx.Client(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS),
+        timeout=httpx.Timeout(HTTP_TIMEOUT),
+    )
+
+
+def async_http_client():
+    """Keep-alive, HTTP/2 (when h2 is installed) httpx client for an async SDK client."""
+    if not HTTPX_AVAILABLE:
+        return None
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS),
+        timeout=httpx.Timeout(HTTP_TIMEOUT),
+    )
@@ -5,6 +5,23 @@ import re
 from typing import Dict, Optional
 
 
+# LinkedIn and GitHub links in every accepted form, in one alternation so a
+# single scan finds them all. Per platform, forms are preferred in order:
+# - labeled: LinkedIn: https://linkedin.com/in/username (or GitHub: ...)
+# - url: https://www.linkedin.com/in/username, https://github.com/username
+# - bare: linkedin.com/in/username, github.com/username
+_LINK_FORMS = ('labeled', 'url', 'bare')
+_LINK_RE = re.compile(
+    "|".join(
+        rf'{platform}[\s:]*(?P<{platform}_labeled>[^\s|,;]+{platform}\.com[^\s|,;]*)'
+        rf'|(?P<{platform}_url>https?://(?:www\.)?{platform}\.com/[^\s|,;]+)'
+        rf'|(?P<{platform}_bare>{platform}\.com/[^\s|,;]+)'
+        for platform in ('linkedin', 'github')
+    ),
+    re.IGNORECASE
+)
+
+
 def extract_social_links(resume_text: str) -> Dict[str, Optional[str]]:
     """
     Extract LinkedIn and GitHub links from resume text.
@@ -15,61 +32,24 @@ def extract_social_links(resume_text: str) -> Dict[str, Optional[str]]:
     Returns:
         Dictionary with 'linkedin' and 'github' keys containing URLs or None
     """
+    # Earliest match of each form ("linkedin_url", ...), from one pass over the text
+    found: Dict[str, str] = {}
+    for match in _LINK_RE.finditer(resume_text):
+        found.setdefault(match.lastgroup, match.group(match.lastgroup))
+    
     links = {
         'linkedin': None,
         'github': None
     }
-    
-    # Common patterns for LinkedIn and GitHub links
-    # Look for URLs in various formats:
-    # - https://linkedin.com/in/username
-    # - https://www.linkedin.com/in/username
-    # - linkedin.com/in/username
-    # - LinkedIn: https://linkedin.com/in/username
-    # - LinkedIn: linkedin.com/in/username
-    # - https://github.com/username
-    # - github.com/username
-    # - GitHub: https://github.com/username
-    
-    # LinkedIn patterns
-    linkedin_patterns = [
-        r'(?:linkedin|LinkedIn|LINKEDIN)[\s:]*([^\s|,;]+linkedin\.com[^\s|,;]*)',
-        r'(https?://(?:www\.)?linkedin\.com/[^\s|,;]+)',
-        r'(linkedin\.com/[^\s|,;]+)',
-    ]
-    
-    # GitHub patterns
-    github_patterns = [
-        r'(?:github|GitHub|GITHUB)[\s:]*([^\s|,;]+github\.com[^\s|,;]*)',
-        r'(https?://(?:www\.)?github\.com/[^\s|,;]+)',
-        r'(github\.com/[^\s|,;]+)',
-    ]
-    
-    # Search for LinkedIn
-    for pattern in linkedin_patterns:
-        match = re.search(pattern, resume_text, re.IGNORECASE)
-        if match:
-            link = match.group(1) if match.lastindex else match.group(0)
-            # Clean up the link
-            link = link.strip().rstrip('.,;|')
-            # Ensure it has http:// or https://
-            if not link.startswith('http'):
-                link = 'https://' + link
-            links['linkedin'] = link
-            break
-    
-    # Search for GitHub
-    for pattern in github_patterns:
-        match = re.search(pattern, resume_text, re.IGNORECASE)
-        if match:
-            link = match.group(1) if match.lastindex else match.group(0)
+    for platform in links:
+        link = next((found[f"{platform}_{form}"] for form in _LINK_FORMS if f"{platform}_{form}" in found), None)
+        if link:
             # Clean up the link
             link = link.strip().rstrip('.,;|')
             # Ensure it has http:// or https://
             if not link.startswith('http'):
                 link = 'https://' + link
-            links['github'] = link
-            break
+            links[platform] = link
     
     return links
 
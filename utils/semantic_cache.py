@@ -0,0 +1,419 @@
+"""
+Semantic Response Cache
+Caches AI provider responses keyed on the embedding of the resume and an exact
+hash of the (whitespace-normalised) resume and job description, so resumes
+re-submitted for the same job are answered locally instead of calling the LLM.
+Off unless SEMANTIC_CACHE=1; requires sentence-transformers and numpy
+(requirements-embeddings.txt), without which every lookup misses.
+With a cache_path, stored entries are appended to it as JSON lines, and the
+file is compacted once evicted entries make up most of it.
+Embeddings are persisted with diskcache when it is installed, so a restarted
+process does not re-encode texts it has seen before.
+"""
+
+import os
+import re
+import json
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+# Response caching is opt-in (SEMANTIC_CACHE=1); embeddings for the local
+# pre-screens are computed either way
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "0") == "1"
+DEFAULT_MAX_ENTRIES = 1000  # per namespace; oldest entries are evicted first
+# cache_path is an append-only log (one JSON line per store); it is rewritten
+# with only the live entries once it holds this many times as many lines
+LOG_COMPACTION_RATIO = 2
+EMBEDDING_CACHE_SIZE = 1024  # recently embedded texts kept in memory (LRU)
+# "onnx" runs the model through ONNX Runtime (optimum[onnxruntime] and
+# sentence-transformers >= 3.2, both in requirements-embeddings.txt); anything
+# else, or a failed load, uses torch.
+# Opt-in because persisted vectors from one backend are only approximately
+# comparable with the other's.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+# int8-quantized export shipped with the model on the Hugging Face Hub
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+# Persistent embedding store (empty disables); ~1.5 KB per text with MiniLM
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.expanduser("~/.cache/resumeopt/embeddings"))
+EMBEDDING_CACHE_SIZE_LIMIT = int(os.getenv("EMBEDDING_CACHE_SIZE_LIMIT", str(256 * 2**20)))  # bytes
+
+
+_models: Dict[str, Any] = {}
+_models_lock = threading.Lock()
+
+
+def _load_embedding_model(model_name: str):
+    """SentenceTransformer on the configured backend, falling back to torch."""
+    if EMBEDDING_BACKEND == "onnx":
+        try:
+            return SentenceTransformer(
+                model_name, backend="onnx", model_kwargs={"file_name": EMBEDDING_ONNX_FILE}
+            )
+        except Exception as e:  # older sentence-transformers, no onnxruntime, or missing export
+            logger.warning(f"ONNX embedding backend unavailable, using torch: {e}")
+    return SentenceTransformer(model_name)
+
+
+def get_embedding_model(model_name: str = DEFAULT_EMBEDDING_MODEL):
+    """Load a SentenceTransformer once per process (it is large) and share it."""
+    model = _models.get(model_name)
+    if model is None:
+        with _models_lock:
+            model = _models.get(model_name)
+            if model is None:
+                model = _models[model_name] = _load_embedding_model(model_name)
+    return model
+
+
+_embedding_store_lock = threading.Lock()
+_embedding_store_instance = None
+
+
+def _embedding_store():
+    """diskcache.Cache holding computed embeddings, or None when persistence is off."""
+    global _embedding_store_instance
+    if not DISKCACHE_AVAILABLE or not EMBEDDING_CACHE_DIR:
+        return None
+    if _embedding_store_instance is None:
+        with _embedding_store_lock:
+            if _embedding_store_instance is None:
+                try:
+                    _embedding_store_instance = diskcache.Cache(
+                        EMBEDDING_CACHE_DIR, size_limit=EMBEDDING_CACHE_SIZE_LIMIT
+                    )
+                except Exception as e:
+                    logger.warning(f"Could not open embedding cache at {EMBEDDING_CACHE_DIR}: {e}")
+                    return None
+    return _embedding_store_instance
+
+
+def _embedding_key(text: str, model_name: str) -> str:
+    """Store key for text's embedding; vectors differ by model and backend."""
+    digest = hashlib.sha256(f"{model_name}\x00{EMBEDDING_BACKEND}\x00".encode())
+    digest.update(text.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def embed_texts(texts: List[str], model_name: str = DEFAULT_EMBEDDING_MODEL):
+    """
+    Normalised embeddings for texts, or None if unavailable.
+
+    Texts embedded before (in this or an earlier process) are read from the
+    persistent store; the rest are encoded in one batch and stored.
+    """
+    if not EMBEDDINGS_AVAILABLE or not texts:
+        return None
+    store = _embedding_store()
+    keys = [_embedding_key(text, model_name) for text in texts] if store is not None else []
+    vectors: List[Any] = [store.get(key) for key in keys] if store is not None else [None] * len(texts)
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        try:
+            encoded = get_embedding_model(model_name).encode(
+                [texts[i] for i in missing], normalize_embeddings=True
+            ).astype(np.float32)
+        except Exception as e:
+            logger.warning(f"Embedding failed: {e}")
+            return None
+        for i, vector in zip(missing, encoded):
+            vectors[i] = vector
+        if store is not None:
+            try:
+                with store.transact():
+                    for i, vector in zip(missing, encoded):
+                        store.set(keys[i], vector)
+            except Exception as e:
+                logger.warning(f"Could not persist embeddings: {e}")
+    return np.stack(vectors)
+
+
+def text_similarity(first: str, second: str, model_name: str = DEFAULT_EMBEDDING_MODEL) -> Optional[float]:
+    """Cosine similarity (clamped to 0-1) of two texts' embeddings, or None if unavailable."""
+    vectors = embed_texts([first, second], model_name)
+    if vectors is None:
+        return None
+    return max(0.0, float(vectors[0] @ vectors[1]))
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def pair_key(resume_text: str, job_description: str, *parts: Any) -> str:
+    """
+    Exact key for entries computed from a resume and a job description.
+
+    The embedding model truncates its input (256 word pieces for MiniLM), so
+    resumes sharing an opening embed alike however their later jobs, skills
+    or education differ; both texts have to match exactly (up to whitespace),
+    or one resume's result is returned for another.
+    """
+    return SemanticCache.exact_key(_WHITESPACE_RE.sub(' ', resume_text).strip(),
+                                   _WHITESPACE_RE.sub(' ', job_description).strip(), *parts)
+
+
+class SemanticCache:
+    """
+    Embedding-keyed response cache.
+
+    Entries live in namespaces (e.g. "analyze", "optimize"). A lookup hits when
+    the cosine similarity to a stored vector is at least the threshold and the
+    entry's exact key (a hash of inputs that must match exactly, such as the
+    suggestion list) is equal. Vectors are normalised, so a flat inner-product
+    search over the namespace matrix gives cosine similarity.
+    """
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        model_name: str = DEFAULT_EMBEDDING_MODEL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        enabled: bool = SEMANTIC_CACHE_ENABLED
+    ):
+        self.enabled = enabled  # when False, lookups miss and nothing is stored
+        self.cache_path = cache_path
+        self.similarity_threshold = similarity_threshold
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._vectors: Dict[str, Any] = {}  # namespace -> (n, dim) matrix
+        self._entries: Dict[str, List[Tuple[str, Any]]] = {}  # namespace -> [(exact_key, value)]
+        self._loaded = False  # cache_path is read on first use, not at construction
+        self._log_lines = 0  # lines in cache_path, live or evicted
+        # sha256(text) -> vector, so re-submitted texts are not embedded again
+        self._embeddings: "OrderedDict[str, Any]" = OrderedDict()
+        self._embedding_hits = 0
+        self._embedding_misses = 0
+
+    def is_available(self) -> bool:
+        """Check if embeddings can be computed."""
+        return EMBEDDINGS_AVAILABLE
+
+    def _get_model(self):
+        """The shared embedding model, loaded on first use."""
+        return get_embedding_model(self.model_name)
+
+    def embed(self, text: str):
+        """Return the normalised embedding for text, or None if unavailable."""
+        vectors = self.embed_many([text])
+        return None if vectors is None else vectors[0]
+
+    @staticmethod
+    def exact_key(*parts: Any) -> str:
+        """Hash inputs that must match exactly for a hit (order-sensitive)."""
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    def embed_many(self, texts: List[str]):
+        """
+        Return normalised embeddings for texts, or None if unavailable.
+
+        Recently embedded texts come from an in-memory LRU keyed by their
+        SHA-256; the rest are encoded in one batch.
+        """
+        if not self.is_available() or not texts:
+            return None
+        keys = [hashlib.sha256(text.encode('utf-8')).hexdigest() for text in texts]
+        vectors: List[Any] = [None] * len(texts)
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._embeddings.get(key)
+                if vector is not None:
+                    self._embeddings.move_to_end(key)
+                    vectors[i] = vector
+            missing = [i for i, vector in enumerate(vectors) if vector is None]
+            self._embedding_hits += len(texts) - len(missing)
+            self._embedding_misses += len(missing)
+
+        if missing:
+            encoded = embed_texts([texts[i] for i in missing], self.model_name)
+            if encoded is None:
+                return None
+            with self._lock:
+                for i, vector in zip(missing, encoded):
+                    vectors[i] = vector
+                    self._embeddings[keys[i]] = vector
+                while len(self._embeddings) > EMBEDDING_CACHE_SIZE:
+                    self._embeddings.popitem(last=False)
+        return np.stack(vectors)
+
+    def lookup(self, namespace: str, text: str, exact_key: str = "") -> Tuple[Optional[Any], Any]:
+        """
+        Find a cached value for text.
+
+        Returns:
+            (value or None, vector) - pass the vector back to store() on a miss
+            so the text is not embedded twice.
+        """
+        if not self.enabled:
+            return None, None
+        vector = self.embed(text)
+        if vector is None:
+            return None, None
+        return self._find(namespace, vector, exact_key), vector
+
+    def lookup_many(self, namespace: str, texts: List[str], exact_keys: List[str]) -> List[Tuple[Optional[Any], Any]]:
+        """lookup() for several texts (each with its own exact key), embedding them in a single batch."""
+        vectors = self.embed_many(texts) if self.enabled else None
+        if vectors is None:
+            return [(None, None)] * len(texts)
+        return [(self._find(namespace, vector, exact_key), vector) for vector, exact_key in zip(vectors, exact_keys)]
+
+    def _find(self, namespace: str, vector, exact_key: str) -> Optional[Any]:
+        """Best stored value at or above the threshold with a matching exact key."""
+        with self._lock:
+            self._ensure_loaded()
+            matrix = self._vectors.get(namespace)
+            if matrix is None or not len(matrix):
+                return None
+            scores = matrix @ vector
+            entries = self._entries[namespace]
+            for index in np.argsort(scores)[::-1]:
+                if scores[index] < self.similarity_threshold:
+                    break
+                key, value = entries[index]
+                if key == exact_key:
+                    return value
+        return None
+
+    def store(self, namespace: str, vector, value: Any, exact_key: str = ""):
+        """Cache value under the vector returned by lookup()."""
+        if vector is None:
+            return
+
+        with self._lock:
+            self._ensure_loaded()
+            matrix = self._vectors.get(namespace)
+            entries = self._entries.setdefault(namespace, [])
+            row = vector.reshape(1, -1)
+            matrix = row if matrix is None else np.vstack([matrix, row])
+            entries.append((exact_key, value))
+            if len(entries) > self.max_entries:
+                matrix = matrix[-self.max_entries:]
+                del entries[:-self.max_entries]
+            self._vectors[namespace] = matrix
+
+            if self.cache_path:
+                self._append({'namespace': namespace, 'key': exact_key, 'vector': row[0].tolist(), 'value': value})
+
+    def clear(self):
+        """Clear all cached entries."""
+        with self._lock:
+            self._loaded = True
+            self._vectors.clear()
+            self._entries.clear()
+            if self.cache_path:
+                self._save()
+
+    def stats(self) -> Dict:
+        """Get cache statistics."""
+        return {
+            'available': self.is_available(),
+            'enabled': self.enabled,
+            'namespaces': {namespace: len(entries) for namespace, entries in self._entries.items()},
+            'similarity_threshold': self.similarity_threshold,
+            'embedding_cache': {
+                'entries': len(self._embeddings),
+                'hits': self._embedding_hits,
+                'misses': self._embedding_misses
+            }
+        }
+
+    def _ensure_loaded(self):
+        """Load persisted entries once (caller holds the lock)."""
+        if not self._loaded:
+            self._loaded = True
+            if self.cache_path and os.path.exists(self.cache_path):
+                self._load()
+
+    @staticmethod
+    def _log_line(item: Dict) -> bytes:
+        """One newline-terminated JSON line of the cache log."""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(item) + b'\n'
+        return json.dumps(item).encode('utf-8') + b'\n'
+
+    def _append(self, item: Dict):
+        """
+        Append one stored entry to cache_path, compacting the log once evicted
+        entries dominate it (caller holds the lock).
+        """
+        live = sum(len(entries) for entries in self._entries.values())
+        if self._log_lines + 1 > LOG_COMPACTION_RATIO * max(live, 1):
+            self._save()
+            return
+        try:
+            with open(self.cache_path, 'ab') as f:
+                f.write(self._log_line(item))
+            self._log_lines += 1
+        except (OSError, TypeError) as e:
+            logger.warning(f"Could not persist semantic cache: {e}")
+
+    def _save(self):
+        """Rewrite cache_path with only the live entries (caller holds the lock)."""
+        try:
+            tmp_path = self.cache_path + '.tmp'
+            lines = 0
+            with open(tmp_path, 'wb') as f:
+                for namespace, entries in self._entries.items():
+                    for i, (key, value) in enumerate(entries):
+                        f.write(self._log_line({'namespace': namespace, 'key': key,
+                                                'vector': self._vectors[namespace][i].tolist(), 'value': value}))
+                        lines += 1
+            os.replace(tmp_path, self.cache_path)
+            self._log_lines = lines
+        except (OSError, TypeError) as e:
+            logger.warning(f"Could not persist semantic cache: {e}")
+
+    def _load(self):
+        """
+        Replay the entries logged by _append() and _save() (caller holds the
+        lock). Unreadable lines, e.g. one cut short by a crash, are dropped by
+        rewriting the log.
+        """
+        logged: Dict[str, List[Tuple[str, List[float], Any]]] = {}
+        unreadable = 0
+        try:
+            with open(self.cache_path, 'rb') as f:
+                for line in f:
+                    self._log_lines += 1
+                    try:
+                        item = orjson.loads(line) if ORJSON_AVAILABLE else json.loads(line)
+                        logged.setdefault(item['namespace'], []).append((item['key'], item['vector'], item['value']))
+                    except (ValueError, KeyError, TypeError):
+                        unreadable += 1
+        except OSError as e:
+            logger.warning(f"Could not load semantic cache from {self.cache_path}: {e}")
+            return
+        for namespace, items in logged.items():
+            items = items[-self.max_entries:]
+            self._vectors[namespace] = np.array([vector for _, vector, _ in items], dtype=np.float32)
+            self._entries[namespace] = [(key, value) for key, _, value in items]
+        if unreadable:
+            logger.warning(f"Dropped {unreadable} unreadable entries from semantic cache {self.cache_path}")
+            self._save()
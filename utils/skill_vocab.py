@@ -0,0 +1,78 @@
+"""
+Skill Vocabulary
+Curated skill terms and a matcher compiled once at import, so skills can be
+matched between resumes and job descriptions locally, without an LLM call.
+"""
+
+import re
+from typing import Set, Tuple
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+
+# Lower-case skill terms. Single letters (C, R) and everyday words (Go, Rest,
+# Spring, Excel) are left out or qualified, since they match ordinary prose.
+SKILLS_VOCAB = frozenset({
+    # Languages
+    'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'golang', 'rust', 'ruby', 'php',
+    'scala', 'kotlin', 'swift', 'objective-c', 'perl', 'matlab', 'bash', 'powershell', 'sql', 'html',
+    'css', 'sass', 'dart', 'elixir', 'haskell', 'julia', 'lua', 'groovy', 'vba', 'solidity',
+    # Frameworks and libraries
+    'react', 'angular', 'vue', 'svelte', 'next.js', 'node.js', 'express.js', 'django', 'flask', 'fastapi',
+    'spring boot', '.net', 'asp.net', 'rails', 'laravel', 'redux', 'jquery', 'graphql',
+    'tensorflow', 'pytorch', 'keras', 'scikit-learn', 'pandas', 'numpy', 'spark', 'pyspark', 'hadoop',
+    'kafka', 'airflow', 'dbt', 'celery', 'hugging face', 'langchain', 'opencv', 'flutter', 'react native',
+    # Data stores
+    'postgresql', 'mysql', 'sqlite', 'oracle', 'sql server', 'mongodb', 'redis', 'cassandra', 'dynamodb',
+    'elasticsearch', 'snowflake', 'bigquery', 'redshift', 'databricks', 'nosql',
+    # Cloud and infrastructure
+    'aws', 'azure', 'gcp', 'google cloud', 'docker', 'kubernetes', 'terraform', 'ansible', 'jenkins',
+    'github actions', 'gitlab ci', 'ci/cd', 'linux', 'unix', 'nginx', 'serverless', 'aws lambda',
+    'microservices', 'rest api', 'restful', 'grpc', 'git', 'prometheus', 'grafana', 'datadog', 'splunk',
+    # Practices and domains
+    'machine learning', 'deep learning', 'nlp', 'natural language processing', 'computer vision',
+    'data science', 'data analysis', 'data engineering', 'etl', 'statistics', 'a/b testing', 'mlops',
+    'devops', 'agile', 'scrum', 'kanban', 'tdd', 'unit testing', 'system design', 'distributed systems',
+    'object-oriented programming', 'cybersecurity', 'penetration testing', 'oauth', 'llm',
+    'generative ai', 'prompt engineering',
+    # Tools and business
+    'microsoft excel', 'tableau', 'power bi', 'looker', 'jira', 'confluence', 'figma', 'salesforce', 'sap',
+    'project management', 'product management', 'stakeholder management', 'seo', 'google analytics',
+})
+
+# Longest first, so "javascript" is preferred over "java" at the same position
+_SKILLS: Tuple[str, ...] = tuple(sorted(SKILLS_VOCAB, key=len, reverse=True))
+
+if HYPERSCAN_AVAILABLE:
+    # One DFA over every skill; boundaries are spelled out since hyperscan has no lookbehind
+    _SKILL_DB = hyperscan.Database()
+    _SKILL_DB.compile(
+        expressions=[(r'(?:^|[^\w+#])%s(?:$|[^\w+#])' % re.escape(skill)).encode() for skill in _SKILLS],
+        ids=list(range(len(_SKILLS))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_SINGLEMATCH]
+        * len(_SKILLS),
+    )
+    SKILL_RE = None
+else:
+    _SKILL_DB = None
+    # \b does not work around "c++", "c#" or ".net", hence the explicit lookarounds
+    SKILL_RE = re.compile(
+        r'(?<![\w+#])(%s)(?![\w+#])' % '|'.join(re.escape(skill) for skill in _SKILLS),
+        re.IGNORECASE,
+    )
+
+
+def find_skills(text: str) -> Set[str]:
+    """Return the vocabulary skills mentioned in text (lower-case)."""
+    if _SKILL_DB is not None:
+        found = set()
+
+        def on_match(pattern_id, start, end, flags, context):
+            found.add(_SKILLS[pattern_id])
+        _SKILL_DB.scan(text.encode('utf-8', 'ignore'), match_event_handler=on_match)
+        return found
+    return {match.lower() for match in SKILL_RE.findall(text)}